@@ -0,0 +1,45 @@
+import random
+import time
+
+from order_book import MatchingEngine, Order, SideType
+
+ORDERS = 100_000
+
+
+def generate_orders(count: int, seed: int = 1):
+    rnd = random.Random(seed)
+    return [
+        Order(
+            price=rnd.randint(90, 110),
+            quantity=rnd.randint(1, 10),
+            side=SideType.BUY if rnd.random() < 0.5 else SideType.SELL,
+        )
+        for _ in range(count)
+    ]
+
+
+def bench_loop(count: int = ORDERS) -> float:
+    orders = generate_orders(count)
+    matching_engine = MatchingEngine()
+    start = time.perf_counter()
+    for order in orders:
+        matching_engine.add_order(order)
+    return count / (time.perf_counter() - start)
+
+
+def bench_batch(count: int = ORDERS) -> float:
+    orders = generate_orders(count)
+    matching_engine = MatchingEngine()
+    start = time.perf_counter()
+    matching_engine.add_orders(orders)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    print("Mode       | Orders/sec")
+    print(f"add_order  | {bench_loop():>10.0f}")
+    print(f"add_orders | {bench_batch():>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
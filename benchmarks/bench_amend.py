@@ -0,0 +1,53 @@
+import time
+
+from benchmarks.generators import amend_flow, quote_book
+from order_book import CancelOrderData, MatchingEngine, ModifyOrderData, Order
+
+QUOTES = [100, 1_000, 10_000]
+AMENDS = 100_000
+
+
+def bench_modify(quotes: int, amends: int = AMENDS) -> float:
+    matching_engine = MatchingEngine()
+    matching_engine.add_orders(quote_book(quotes))
+    messages = amend_flow(amends, quotes)
+
+    modify_order = matching_engine.modify_order
+    start = time.perf_counter()
+    for message in messages:
+        modify_order(message)  # type: ignore
+    return amends / (time.perf_counter() - start)
+
+
+def bench_cancel_add(quotes: int, amends: int = AMENDS) -> float:
+    # the same amends done as a cancel followed by a new order
+    matching_engine = MatchingEngine()
+    live = {order.id: order for order in quote_book(quotes)}  # type: ignore
+    matching_engine.add_orders(list(live.values()))
+    messages = amend_flow(amends, quotes)
+
+    start = time.perf_counter()
+    for message in messages:
+        assert isinstance(message, ModifyOrderData)
+        order = live[message.id]
+        matching_engine.cancel_order(CancelOrderData(id=order.id))
+        replacement = Order(
+            price=order.price if message.price is None else message.price,
+            quantity=order.quantity if message.quantity is None else message.quantity,
+            side=order.side,
+        )
+        matching_engine.add_order(replacement)
+        live[message.id] = replacement
+    return amends / (time.perf_counter() - start)
+
+
+def main():
+    print("Quotes | modify_order ops/sec | cancel + add ops/sec")
+    for quotes in QUOTES:
+        modify_ops = bench_modify(quotes)
+        cancel_add_ops = bench_cancel_add(quotes)
+        print(f"{quotes:>6} | {modify_ops:>20.0f} | {cancel_add_ops:>20.0f}")
+
+
+if __name__ == "__main__":
+    main()
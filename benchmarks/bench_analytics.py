@@ -0,0 +1,75 @@
+import math
+import random
+import time
+
+import numpy as np
+
+from order_book import MatchingEngine, Order, OrderBook, SideType
+
+LEVELS = 1_000
+SIZES = 5_000
+ROUNDS = 5
+MID_PRICE = 10_000
+
+
+def build_book(seed: int = 1) -> MatchingEngine:
+    rnd = random.Random(seed)
+    matching_engine = MatchingEngine()
+    for offset in range(1, LEVELS + 1):
+        for _ in range(3):
+            matching_engine.add_order(
+                Order(MID_PRICE - offset, rnd.randint(1, 20), SideType.BUY)
+            )
+            matching_engine.add_order(
+                Order(MID_PRICE + offset, rnd.randint(1, 20), SideType.SELL)
+            )
+    return matching_engine
+
+
+def walk_vwap(order_book: OrderBook, side: SideType, size: float) -> float:
+    remained = size
+    notional = 0.0
+    for price_level in order_book.best_price_levels(side):
+        quantity = min(remained, price_level.total_quantity)
+        notional += quantity * price_level.price
+        remained -= quantity
+        if remained == 0:
+            return notional / size
+    return math.nan
+
+
+def churn(matching_engine: MatchingEngine, rnd: random.Random):
+    # a few hundred passive changes between two rounds of queries
+    for _ in range(300):
+        side = rnd.choice([SideType.BUY, SideType.SELL])
+        offset = rnd.randint(1, LEVELS)
+        price = MID_PRICE - offset if side == SideType.BUY else MID_PRICE + offset
+        matching_engine.add_order(Order(price, rnd.randint(1, 20), side))
+
+
+def bench(vectorized: bool) -> float:
+    matching_engine = build_book()
+    order_book = matching_engine.order_book
+    analytics = order_book.get_analytics() if vectorized else None
+    sizes = np.random.default_rng(2).uniform(1, LEVELS * 10, SIZES)
+    rnd = random.Random(3)
+    elapsed = 0.0
+    for _ in range(ROUNDS):
+        churn(matching_engine, rnd)
+        start = time.perf_counter()
+        if analytics is None:
+            [walk_vwap(order_book, SideType.SELL, size) for size in sizes]
+        else:
+            analytics.vwap(SideType.SELL, sizes)
+        elapsed += time.perf_counter() - start
+    return elapsed / ROUNDS
+
+
+def main():
+    print(f"VWAP of {SIZES} sizes over {LEVELS} levels, seconds per round")
+    print(f"walk best_price_levels | {bench(False):.6f}")
+    print(f"BookAnalytics.vwap     | {bench(True):.6f}")
+
+
+if __name__ == "__main__":
+    main()
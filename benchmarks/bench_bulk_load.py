@@ -0,0 +1,39 @@
+import sys
+import time
+
+from benchmarks.generators import passive_flow
+from order_book import MatchingEngine, Order
+
+ORDERS = 1_000_000
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else ORDERS
+    # stable sort keeps the arrival order within a price
+    flow = sorted(
+        (
+            (order.price, order.quantity, order.side, order.id)
+            for order in passive_flow(count, width=5_000)
+        ),
+        key=lambda fields: fields[0],
+    )
+
+    orders = [Order(*fields) for fields in flow]
+    start = time.perf_counter()
+    matching_engine = MatchingEngine()
+    for order in orders:
+        matching_engine.add_order(order)
+    add_time = time.perf_counter() - start
+
+    orders = [Order(*fields) for fields in flow]
+    start = time.perf_counter()
+    MatchingEngine().bulk_load(orders)
+    bulk_time = time.perf_counter() - start
+
+    print(f"Resting orders: {count}")
+    print(f"add_order: {add_time:.2f}s")
+    print(f"bulk_load: {bulk_time:.2f}s ({bulk_time / add_time:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import random
+import time
+
+from order_book import MatchingEngine, Order, SideType
+
+DEPTHS = [10, 100, 1_000, 10_000]
+CANCELS = 1_000
+
+
+def bench_cancel(depth: int, cancels: int = CANCELS, seed: int = 1) -> float:
+    rnd = random.Random(seed)
+    matching_engine = MatchingEngine()
+    orders = [Order(price=100, quantity=1, side=SideType.BUY) for _ in range(depth)]
+    for order in orders:
+        matching_engine.add_order(order)
+
+    elapsed = 0
+    for _ in range(cancels):
+        index = rnd.randrange(depth)
+        order = orders[index]
+
+        start = time.perf_counter_ns()
+        matching_engine.cancel_order(order)
+        elapsed += time.perf_counter_ns() - start
+
+        replacement = Order(price=100, quantity=1, side=SideType.BUY)
+        matching_engine.add_order(replacement)
+        orders[index] = replacement
+
+    return elapsed / cancels
+
+
+def main():
+    print("Depth | Cancel latency (ns)")
+    for depth in DEPTHS:
+        print(f"{depth:>5} | {bench_cancel(depth):>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
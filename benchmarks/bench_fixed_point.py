@@ -0,0 +1,58 @@
+import random
+import time
+
+from order_book import MatchingEngine, Order, SideType
+from order_book.fixed_point import FixedPointMatchingEngine
+
+ORDERS = 100_000
+TICK_SIZE = 0.01
+LOT_SIZE = 0.1
+
+
+def generate_flow(count: int, seed: int = 1):
+    rnd = random.Random(seed)
+    for _ in range(count):
+        side = SideType.BUY if rnd.random() < 0.5 else SideType.SELL
+        price = round(100 + rnd.randint(-50, 50) * TICK_SIZE, 2)
+        quantity = round(rnd.randint(1, 20) * LOT_SIZE, 1)
+        yield price, quantity, side
+
+
+def bench(matching_engine: MatchingEngine, count: int = ORDERS) -> float:
+    orders = [
+        Order(price, quantity, side) for price, quantity, side in generate_flow(count)
+    ]
+    start = time.perf_counter()
+    for order in orders:
+        matching_engine.add_order(order)
+    return count / (time.perf_counter() - start)
+
+
+def bench_ints(count: int = ORDERS) -> float:
+    # matching only, orders are converted to ticks/lots before the clock starts
+    converter = FixedPointMatchingEngine(TICK_SIZE, LOT_SIZE)
+    orders = [
+        Order(price, quantity, side) for price, quantity, side in generate_flow(count)
+    ]
+    for order in orders:
+        converter.to_fixed_point(order)
+
+    matching_engine = MatchingEngine()
+    start = time.perf_counter()
+    for order in orders:
+        matching_engine.add_order(order)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    float_ops = bench(MatchingEngine())
+    fixed_ops = bench(FixedPointMatchingEngine(TICK_SIZE, LOT_SIZE))
+    ints_ops = bench_ints()
+    print("Mode                          | Orders/sec")
+    print(f"float                         | {float_ops:>10.0f}")
+    print(f"fixed point                   | {fixed_ops:>10.0f}")
+    print(f"fixed point (no conversion)   | {ints_ops:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import random
+import time
+from typing import Dict, Tuple
+
+from order_book import ID_TYPE, MatchingEngine, Order, OrderType, SideType
+
+OPERATIONS = 100_000
+MID_PRICE = 10_000
+MAKERS = 20
+DISPLAY = 5
+RESERVE = 5_000
+
+
+def makers(display_quantity: bool):
+    # icebergs on the 5 levels of each side next to the mid price
+    for index in range(MAKERS):
+        for side, sign in ((SideType.BUY, -1), (SideType.SELL, 1)):
+            price = MID_PRICE + sign * (1 + index % 5)
+            if display_quantity:
+                yield Order(price, RESERVE, side, display_quantity=DISPLAY)
+            else:
+                yield Order(price, DISPLAY, side)
+
+
+def takers(count: int, seed: int = 1):
+    rnd = random.Random(seed)
+    for _ in range(count):
+        side = SideType.BUY if rnd.random() < 0.5 else SideType.SELL
+        yield Order(0, rnd.randint(1, 10), side, order_type=OrderType.MARKET)
+
+
+def bench_native() -> float:
+    matching_engine = MatchingEngine()
+    for order in makers(display_quantity=True):
+        matching_engine.add_order(order)
+    orders = list(takers(OPERATIONS))
+    start = time.perf_counter()
+    for order in orders:
+        matching_engine.add_order(order)
+    return OPERATIONS / (time.perf_counter() - start)
+
+
+def bench_re_add() -> float:
+    # the filled slices are added back as new orders, what a client of an
+    # engine without reserve quantity has to do
+    matching_engine = MatchingEngine()
+    # id -> (order, reserve) of the shown slices
+    slices: Dict[ID_TYPE, Tuple[Order, float]] = {}
+    for order in makers(display_quantity=False):
+        matching_engine.add_order(order)
+        slices[order.id] = (order, RESERVE - DISPLAY)
+    orders = list(takers(OPERATIONS))
+    start = time.perf_counter()
+    for order in orders:
+        _, trades = matching_engine.add_order(order)
+        for trade in trades[::2]:
+            maker, reserve = slices[trade.order_id]
+            if maker.remained_quantity > 0:
+                continue
+            del slices[maker.id]
+            if reserve > 0:
+                slice_order = Order(maker.price, min(DISPLAY, reserve), maker.side)
+                matching_engine.add_order(slice_order)
+                slices[slice_order.id] = (slice_order, reserve - slice_order.quantity)
+    return OPERATIONS / (time.perf_counter() - start)
+
+
+def main():
+    print("Icebergs | ops/sec")
+    print(f"  native | {bench_native():>7.0f}")
+    print(f"  re-add | {bench_re_add():>7.0f}")
+
+
+if __name__ == "__main__":
+    main()
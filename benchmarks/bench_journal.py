@@ -0,0 +1,61 @@
+import os
+import sys
+import tempfile
+import time
+from typing import Optional
+
+from benchmarks.generators import random_flow
+from order_book import MatchingEngine
+from order_book.journal import Journal, JournaledMatchingEngine
+
+ORDERS = 20_000
+
+SETTINGS = [
+    # name, batch_size, commit_interval, fsync
+    ("fsync every order", 1, None, True),
+    ("group commit 64", 64, None, True),
+    ("group commit 1024", 1024, None, True),
+    ("group commit 1ms", 1_000_000, 0.001, True),
+    ("no fsync", 1024, None, False),
+]
+
+
+def bench(
+    count: int, batch_size: int, commit_interval: Optional[float], fsync: bool
+) -> float:
+    messages = random_flow(count)
+    with tempfile.TemporaryDirectory() as directory:
+        journal = Journal(
+            os.path.join(directory, "journal"),
+            batch_size=batch_size,
+            commit_interval=commit_interval,
+            fsync=fsync,
+        )
+        matching_engine = JournaledMatchingEngine(MatchingEngine(), journal)
+        start = time.perf_counter()
+        for message in messages:
+            matching_engine.add_order(message)
+        matching_engine.close()
+        return count / (time.perf_counter() - start)
+
+
+def bench_no_journal(count: int) -> float:
+    messages = random_flow(count)
+    matching_engine = MatchingEngine()
+    start = time.perf_counter()
+    for message in messages:
+        matching_engine.add_order(message)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else ORDERS
+    print(f"{'setting':<18} | orders/sec")
+    print(f"{'no journal':<18} | {bench_no_journal(count):>10.0f}")
+    for name, batch_size, commit_interval, fsync in SETTINGS:
+        ops = bench(count, batch_size, commit_interval, fsync)
+        print(f"{name:<18} | {ops:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import random
+import sys
+import tracemalloc
+
+from order_book import MatchingEngine, Order, SideType
+
+ORDERS = 1_000_000
+LEVELS = 1_000
+
+
+def bench_memory(count: int = ORDERS, levels: int = LEVELS, seed: int = 1) -> float:
+    rnd = random.Random(seed)
+    matching_engine = MatchingEngine()
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for _ in range(count):
+        # bids below asks, nothing crosses so every order rests
+        if rnd.random() < 0.5:
+            order = Order(price=rnd.randint(1, levels), quantity=1, side=SideType.BUY)
+        else:
+            order = Order(
+                price=levels + rnd.randint(1, levels), quantity=1, side=SideType.SELL
+            )
+        matching_engine.add_order(order)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return (after - before) / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else ORDERS
+    print(f"Resting orders: {count}")
+    print(f"Bytes per resting order: {bench_memory(count):.1f}")
+
+
+if __name__ == "__main__":
+    main()
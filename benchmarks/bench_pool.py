@@ -0,0 +1,47 @@
+import random
+import time
+
+from order_book import MatchingEngine, Order, OrderBook, SideType
+from order_book.pool import BookPool
+
+OPERATIONS = 200_000
+MID_PRICE = 10_000
+
+
+def flicker_flow(count: int, seed: int = 1):
+    # quotes appear at and just inside the touch and are cancelled or hit
+    # shortly after, so levels keep being created and removed
+    rnd = random.Random(seed)
+    for _ in range(count):
+        side = SideType.BUY if rnd.random() < 0.5 else SideType.SELL
+        offset = rnd.randint(0, 3)
+        price = MID_PRICE - offset if side == SideType.BUY else MID_PRICE + 1 + offset
+        yield Order(price=price, quantity=rnd.randint(1, 5), side=side)
+
+
+def bench(pool, count: int = OPERATIONS):
+    matching_engine = MatchingEngine(OrderBook(pool=pool))
+    rnd = random.Random(2)
+    orders = list(flicker_flow(count))
+    live = []
+    start = time.perf_counter()
+    for order in orders:
+        matching_engine.add_order(order)
+        if order.price_level is not None:
+            live.append(order)
+        while len(live) > 8:
+            matching_engine.cancel_order(live.pop(rnd.randrange(len(live))))
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    pool = BookPool()
+    print("Pool     | ops/sec")
+    print(f"none     | {bench(None):>7.0f}")
+    print(f"BookPool | {bench(pool):>7.0f}")
+    for name, stats in pool.stats().items():
+        print(f"{name}: {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import os
+import random
+import sys
+import time
+
+from order_book import Order, SideType
+from order_book.multi_symbol import MultiSymbolMatchingEngine, ShardedMatchingEngine
+
+ORDERS = 200_000
+SYMBOLS = [f"SYM{index}" for index in range(64)]
+BATCH = 5_000
+
+
+def generate_orders(count: int, seed: int = 1):
+    rnd = random.Random(seed)
+    return [
+        Order(
+            price=100 + rnd.randint(-10, 10),
+            quantity=rnd.randint(1, 10),
+            side=SideType.BUY if rnd.random() < 0.5 else SideType.SELL,
+            symbol=rnd.choice(SYMBOLS),
+        )
+        for _ in range(count)
+    ]
+
+
+def bench_single(count: int) -> float:
+    orders = generate_orders(count)
+    matching_engine = MultiSymbolMatchingEngine()
+    start = time.perf_counter()
+    for order in orders:
+        matching_engine.add_order(order)
+    return count / (time.perf_counter() - start)
+
+
+def bench_sharded(count: int, processes: int) -> float:
+    orders = generate_orders(count)
+    with ShardedMatchingEngine(processes) as matching_engine:
+        start = time.perf_counter()
+        for index, order in enumerate(orders, start=1):
+            matching_engine.submit(order)
+            if index % BATCH == 0:
+                matching_engine.send()
+        matching_engine.flush()
+        return count / (time.perf_counter() - start)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else ORDERS
+    print(f"{'processes':<12} | orders/sec")
+    print(f"{'in-process':<12} | {bench_single(count):>10.0f}")
+    processes = 1
+    while processes <= (os.cpu_count() or 1):
+        print(f"{processes:<12} | {bench_sharded(count, processes):>10.0f}")
+        processes *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import sys
+import time
+
+from benchmarks.generators import passive_flow
+from order_book import MatchingEngine, Order
+from order_book.snapshot import dump_snapshot, load_snapshot
+
+ORDERS = 200_000
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else ORDERS
+    flow = [
+        (order.price, order.quantity, order.side, order.id)
+        for order in passive_flow(count, width=5_000)
+    ]
+
+    # replaying from a log has to create the orders as well
+    matching_engine = MatchingEngine()
+    start = time.perf_counter()
+    matching_engine.add_orders(Order(*fields) for fields in flow)
+    replay_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    data = dump_snapshot(matching_engine)
+    dump_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    load_snapshot(data)
+    load_time = time.perf_counter() - start
+
+    print(f"Resting orders: {count}, snapshot size: {len(data) / 1e6:.1f} MB")
+    print(f"replay add_order: {replay_time:.2f}s")
+    print(f"dump snapshot:    {dump_time:.2f}s")
+    print(f"load snapshot:    {load_time:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
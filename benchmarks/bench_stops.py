@@ -0,0 +1,66 @@
+import random
+import time
+
+from order_book import MatchingEngine, Order, OrderType, SideType
+
+OPERATIONS = 100_000
+MID_PRICE = 10_000
+
+
+def flow(count: int, seed: int = 1):
+    # orders around the mid price, about a third of them cross
+    rnd = random.Random(seed)
+    for _ in range(count):
+        side = SideType.BUY if rnd.random() < 0.5 else SideType.SELL
+        price = MID_PRICE + rnd.randint(-5, 5)
+        yield Order(price=price, quantity=rnd.randint(1, 5), side=side)
+
+
+def pending_stops(count: int):
+    # stops far from the traded prices, never triggered during the run
+    for index in range(count):
+        side = SideType.BUY if index % 2 else SideType.SELL
+        offset = 100 + index % 1000
+        stop_price = MID_PRICE + offset if side == SideType.BUY else MID_PRICE - offset
+        yield Order(
+            price=0,
+            quantity=1,
+            side=side,
+            order_type=OrderType.STOP,
+            stop_price=stop_price,
+        )
+
+
+def bench(stops: int) -> float:
+    matching_engine = MatchingEngine()
+    for order in pending_stops(stops):
+        matching_engine.add_order(order)
+    orders = list(flow(OPERATIONS))
+    start = time.perf_counter()
+    for order in orders:
+        matching_engine.add_order(order)
+    return OPERATIONS / (time.perf_counter() - start)
+
+
+def scan_per_trade(stops: int) -> float:
+    # what scanning every pending stop after a trade would cost
+    orders = list(pending_stops(stops))
+    start = time.perf_counter()
+    for _ in range(100):
+        [
+            order
+            for order in orders
+            if (order.side == SideType.BUY and order.stop_price <= MID_PRICE)  # type: ignore
+            or (order.side == SideType.SELL and order.stop_price >= MID_PRICE)  # type: ignore
+        ]
+    return (time.perf_counter() - start) / 100
+
+
+def main():
+    print("Pending stops | ops/sec | scan per trade (s)")
+    for stops in (0, 10_000, 100_000):
+        print(f"{stops:>13} | {bench(stops):>7.0f} | {scan_per_trade(stops):.6f}")
+
+
+if __name__ == "__main__":
+    main()
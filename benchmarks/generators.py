@@ -0,0 +1,128 @@
+import random
+from typing import List, Tuple, Union
+
+from order_book import CancelOrderData, ModifyOrderData, Order, SideType
+
+Message = Union[Order, CancelOrderData, ModifyOrderData]
+
+MID_PRICE = 10_000
+
+
+def _side(rnd: random.Random) -> SideType:
+    return SideType.BUY if rnd.random() < 0.5 else SideType.SELL
+
+
+def passive_flow(count: int, seed: int = 1, width: int = 100) -> List[Message]:
+    # bids below the mid, asks above it: nothing ever crosses
+    rnd = random.Random(seed)
+    messages: List[Message] = []
+    for _ in range(count):
+        side = _side(rnd)
+        offset = rnd.randint(1, width)
+        price = MID_PRICE - offset if side == SideType.BUY else MID_PRICE + offset
+        messages.append(Order(price=price, quantity=rnd.randint(1, 10), side=side))
+    return messages
+
+
+def deep_book(levels: int, orders_per_level: int, side: SideType) -> List[Message]:
+    messages: List[Message] = []
+    for level in range(1, levels + 1):
+        price = MID_PRICE + level if side == SideType.SELL else MID_PRICE - level
+        for _ in range(orders_per_level):
+            messages.append(Order(price=price, quantity=1, side=side))
+    return messages
+
+
+def sweep_flow(count: int, levels: int, orders_per_level: int) -> List[Message]:
+    # run against deep_book(count * levels, orders_per_level, SideType.SELL),
+    # each aggressive buy takes out the next `levels` ask levels
+    messages: List[Message] = []
+    for index in range(1, count + 1):
+        messages.append(
+            Order(
+                price=MID_PRICE + index * levels,
+                quantity=levels * orders_per_level,
+                side=SideType.BUY,
+            )
+        )
+    return messages
+
+
+def cancel_heavy_flow(
+    count: int, seed: int = 1, cancel_ratio: float = 0.8, width: int = 20
+) -> List[Message]:
+    rnd = random.Random(seed)
+    messages: List[Message] = []
+    live: List[Order] = []
+    for _ in range(count):
+        if live and rnd.random() < cancel_ratio:
+            index = rnd.randrange(len(live))
+            live[index], live[-1] = live[-1], live[index]
+            messages.append(CancelOrderData(id=live.pop().id))
+            continue
+        side = _side(rnd)
+        offset = rnd.randint(1, width)
+        price = MID_PRICE - offset if side == SideType.BUY else MID_PRICE + offset
+        order = Order(price=price, quantity=rnd.randint(1, 10), side=side)
+        live.append(order)
+        messages.append(order)
+    return messages
+
+
+def random_flow(count: int, seed: int = 1, width: int = 10) -> List[Message]:
+    # prices uniformly spread over `width` ticks on both sides of the mid, so
+    # incoming orders cross regularly
+    rnd = random.Random(seed)
+    return [
+        Order(
+            price=MID_PRICE + rnd.randint(-width, width),
+            quantity=rnd.randint(1, 10),
+            side=_side(rnd),
+        )
+        for _ in range(count)
+    ]
+
+
+def _quotes(quotes: int, seed: int, width: int) -> List[Tuple[str, SideType, int, int]]:
+    rnd = random.Random(seed)
+    result = []
+    for index in range(quotes):
+        side = SideType.BUY if index % 2 == 0 else SideType.SELL
+        offset = rnd.randint(1, width)
+        price = MID_PRICE - offset if side == SideType.BUY else MID_PRICE + offset
+        result.append((f"mm-{index}", side, price, 10))
+    return result
+
+
+def quote_book(quotes: int, seed: int = 1, width: int = 20) -> List[Message]:
+    # resting quotes of a market maker, amended by amend_flow
+    return [
+        Order(price=price, quantity=quantity, side=side, id=order_id)
+        for order_id, side, price, quantity in _quotes(quotes, seed, width)
+    ]
+
+
+def amend_flow(
+    count: int, quotes: int, seed: int = 1, width: int = 20
+) -> List[Message]:
+    # run against quote_book(quotes, seed, width): mostly size reductions that
+    # keep the queue position, the rest move a quote to a new passive price or
+    # size it back up
+    state = _quotes(quotes, seed, width)
+    rnd = random.Random(seed + 1)
+    messages: List[Message] = []
+    for _ in range(count):
+        index = rnd.randrange(quotes)
+        order_id, side, price, quantity = state[index]
+        if quantity > 1 and rnd.random() < 0.7:
+            quantity -= 1
+            messages.append(ModifyOrderData(id=order_id, quantity=quantity))
+        elif rnd.random() < 0.5:
+            quantity = 10
+            messages.append(ModifyOrderData(id=order_id, quantity=quantity))
+        else:
+            offset = rnd.randint(1, width)
+            price = MID_PRICE - offset if side == SideType.BUY else MID_PRICE + offset
+            messages.append(ModifyOrderData(id=order_id, price=price))
+        state[index] = (order_id, side, price, quantity)
+    return messages
@@ -0,0 +1,151 @@
+import argparse
+import json
+import sys
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from benchmarks.generators import (
+    Message,
+    amend_flow,
+    cancel_heavy_flow,
+    deep_book,
+    passive_flow,
+    quote_book,
+    random_flow,
+    sweep_flow,
+)
+from order_book import MatchingEngine, SideType
+from order_book.histogram import LatencyHistogram
+
+
+class Workload(NamedTuple):
+    name: str
+    # setup messages are applied before the clock starts
+    setup: Callable[[int], List[Message]]
+    flow: Callable[[int], List[Message]]
+
+
+WORKLOADS = [
+    Workload("passive_adds", lambda n: [], lambda n: passive_flow(n)),
+    Workload(
+        "deep_sweep",
+        lambda n: deep_book(max(1, n // 1000) * 100, 10, SideType.SELL),
+        lambda n: sweep_flow(max(1, n // 1000), levels=100, orders_per_level=10),
+    ),
+    Workload(
+        "cancel_heavy",
+        lambda n: passive_flow(n // 10, seed=2, width=20),
+        lambda n: cancel_heavy_flow(n),
+    ),
+    Workload("narrow_prices", lambda n: [], lambda n: random_flow(n, width=5)),
+    Workload("wide_prices", lambda n: [], lambda n: random_flow(n, width=500)),
+    Workload(
+        "amend_heavy",
+        lambda n: quote_book(1000),
+        lambda n: amend_flow(n, quotes=1000),
+    ),
+]
+
+
+def run_workload(
+    workload: Workload,
+    size: int,
+    engine_factory: Callable[[], MatchingEngine] = MatchingEngine,
+) -> Dict[str, float]:
+    matching_engine = engine_factory()
+    matching_engine.add_orders(workload.setup(size))
+    messages = workload.flow(size)
+
+    histogram = LatencyHistogram()
+    record = histogram.record
+    # one message batches through the public path, so attached metrics and
+    # views are kept up to date
+    add_orders = matching_engine.add_orders
+    clock = time.perf_counter_ns
+    trades: list = []
+
+    for message in messages:
+        start = clock()
+        add_orders((message,), trades)
+        record(clock() - start)
+        trades.clear()
+
+    elapsed = histogram.total / 1e9
+    return {
+        "ops": histogram.count,
+        "ops_per_sec": histogram.count / elapsed if elapsed else 0.0,
+        "p50": histogram.percentile(50),
+        "p99": histogram.percentile(99),
+        "p999": histogram.percentile(99.9),
+    }
+
+
+def run_suite(
+    size: int, names: Optional[List[str]] = None
+) -> Dict[str, Dict[str, float]]:
+    return {
+        workload.name: run_workload(workload, size)
+        for workload in WORKLOADS
+        if not names or workload.name in names
+    }
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float,
+) -> List[str]:
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        expected = baseline[name]["ops_per_sec"]
+        if result["ops_per_sec"] < expected * (1 - tolerance):
+            regressions.append(
+                f"{name}: {result['ops_per_sec']:.0f} ops/s, baseline {expected:.0f}"
+            )
+    return regressions
+
+
+def format_results(results: Dict[str, Dict[str, float]]) -> str:
+    header = (
+        f"{'workload':<14} | {'ops':>8} | {'ops/sec':>10} | "
+        f"{'p50 ns':>8} | {'p99 ns':>8} | {'p999 ns':>8}"
+    )
+    lines = [header]
+    for name, result in results.items():
+        lines.append(
+            f"{name:<14} | {result['ops']:>8} | {result['ops_per_sec']:>10.0f} | "
+            f"{result['p50']:>8} | {result['p99']:>8} | {result['p999']:>8}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Matching engine benchmark suite")
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--workload", action="append", help="run only these")
+    parser.add_argument("--save", help="write results as JSON")
+    parser.add_argument("--baseline", help="compare with results saved earlier")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.size, args.workload)
+    print(format_results(results))
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print("REGRESSION", regression)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,70 @@
+import gc
+import math
+from collections import deque
+from contextlib import contextmanager
 from enum import Enum
-from typing import Union, Dict, NamedTuple, Optional, Tuple, List, Generator
+from itertools import groupby
+from operator import attrgetter
+from typing import (
+    Union,
+    Dict,
+    NamedTuple,
+    Optional,
+    Tuple,
+    List,
+    Generator,
+    Iterable,
+    Callable,
+    TYPE_CHECKING,
+    Iterator,
+    Deque,
+)
 from py_simple_trees import AVLTree, AVLNode, TraversalType  # type: ignore
 
-from order_book.double_linked_list import LinkedList
+from order_book.double_linked_list import LinkedList, LinkedNode
+
+if TYPE_CHECKING:
+    from order_book.analytics import BookAnalytics
+    from order_book.depth import CumulativeDepth
+    from order_book.metrics import EngineMetrics
+    from order_book.pool import BookPool
+    from order_book.triggers import TriggerBook
+    from order_book.views import BookViews
 
 ID_TYPE = Union[int, str]
 
 
+@contextmanager
+def gc_paused() -> Iterator[None]:
+    # for bulk construction: the cyclic collector would repeatedly walk the
+    # growing heap while millions of objects are allocated, none of them garbage
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
 class SideType(Enum):
     BUY = "BUY"
     SELL = "SELL"
 
 
+class OrderType(Enum):
+    LIMIT = "LIMIT"
+    MARKET = "MARKET"
+    # immediate or cancel, the remainder is dropped instead of resting
+    IOC = "IOC"
+    # fill or kill, rejected without touching the book unless fully fillable
+    FOK = "FOK"
+    # held until the last trade price reaches stop_price, then a market order
+    STOP = "STOP"
+    # held until the last trade price reaches stop_price, then a limit order
+    STOP_LIMIT = "STOP_LIMIT"
+
+
 class OrderData(NamedTuple):
     id: Optional[ID_TYPE]
     price: float
@@ -19,6 +72,20 @@ class OrderData(NamedTuple):
     side: SideType
 
 
+class CancelOrderData(NamedTuple):
+    id: ID_TYPE
+    symbol: Optional[str] = None
+
+
+class ModifyOrderData(NamedTuple):
+    # None keeps the current price or quantity, quantity is the new total
+    # quantity of the order including what is already filled
+    id: ID_TYPE
+    price: Optional[float] = None
+    quantity: Optional[float] = None
+    symbol: Optional[str] = None
+
+
 class IDGenerator:
     def __init__(self, prefix: Optional[str] = None):
         self.count = 0
@@ -35,18 +102,68 @@ class IDGenerator:
 class Order:
     ID_GENERATOR = IDGenerator(prefix="order")
 
-    def __init__(self, price: float, quantity: float, side: SideType):
-        self.id = self.__class__.ID_GENERATOR.new_id
+    __slots__ = (
+        "id",
+        "price",
+        "remained_quantity",
+        "quantity",
+        "side",
+        "symbol",
+        "price_level",
+        "linked_node",
+        "order_type",
+        "stop_price",
+        "display_quantity",
+        "hidden_quantity",
+    )
+
+    def __init__(
+        self,
+        price: float,
+        quantity: float,
+        side: SideType,
+        id: Optional[ID_TYPE] = None,
+        symbol: Optional[str] = None,
+        order_type: OrderType = OrderType.LIMIT,
+        stop_price: Optional[float] = None,
+        display_quantity: Optional[float] = None,
+    ):
+        self.id = self.__class__.ID_GENERATOR.new_id if id is None else id
+        if display_quantity is not None and display_quantity <= 0:
+            raise ValueError("display_quantity must be positive")
+        if (order_type is OrderType.STOP or order_type is OrderType.STOP_LIMIT) != (
+            stop_price is not None
+        ):
+            raise ValueError("stop_price is required by and only by stop orders")
+        if order_type is OrderType.MARKET:
+            # the price of a market order is ignored, it crosses every level
+            price = math.inf if side == SideType.BUY else -math.inf
         self.price: float = price
         self.remained_quantity: float = quantity
         self.quantity = quantity
         self.side: SideType = side  # 'BUY' 'SELL'
+        self.symbol = symbol
+        self.order_type = order_type
+        # set while a stop order waits for its trigger
+        self.stop_price = stop_price
+        # an iceberg order rests with at most display_quantity shown as its
+        # remained quantity, the rest waits in hidden_quantity
+        self.display_quantity = display_quantity
+        self.hidden_quantity: float = 0
 
         self.price_level: Optional[PriceLevel] = None
+        self.linked_node: Optional[LinkedNode] = None
 
     @property
     def matched_quantity(self):
-        return self.quantity - self.remained_quantity
+        return self.quantity - self.remained_quantity - self.hidden_quantity
+
+    def split_display(self):
+        # shows at most the display quantity, the rest goes to the reserve
+        display_quantity = self.display_quantity
+        if display_quantity is not None and self.remained_quantity > display_quantity:
+            self.hidden_quantity += self.remained_quantity - display_quantity
+            self.remained_quantity = display_quantity
 
     def match_order(self, order) -> bool:
         if self.side == order.side:
@@ -89,6 +206,8 @@ class Order:
 class Trade:
     ID_GENERATOR = IDGenerator(prefix="trade")
 
+    __slots__ = ("id", "order_id", "side", "price", "quantity")
+
     def __init__(
         self, order_id: ID_TYPE, side: SideType, price: float, quantity: float
     ):
@@ -100,32 +219,75 @@ class Trade:
 
 
 class PriceLevel:
+    __slots__ = ("price", "total_quantity", "orders", "pool")
+
     def __init__(self, price: float):
         self.price = price
         self.total_quantity: float = 0
         self.orders = LinkedList[Union[int, str], Order]()
+        # set on levels created by a BookPool, queue nodes then come from it
+        self.pool: Optional["BookPool"] = None
 
     def add_order(self, order: Order):
-        if self.orders.add(order.id, order):
-            self.total_quantity += order.remained_quantity
+        if order.display_quantity is not None:
+            order.split_display()
+        if self.pool is None:
+            order.linked_node = self.orders.add(order.id, order)
+        else:
+            order.linked_node = self.orders.add_tail_node(
+                self.pool.new_node(order.id, order)
+            )
+        self.total_quantity += order.remained_quantity
+        order.price_level = self
+
+    def add_orders(self, orders: List[Order]):
+        nodes = []
+        total_quantity = self.total_quantity
+        for order in orders:
+            if order.display_quantity is not None:
+                order.split_display()
+            order.linked_node = node = LinkedNode(order.id, order)
             order.price_level = self
+            total_quantity += order.remained_quantity
+            nodes.append(node)
+        self.orders.extend(nodes)
+        self.total_quantity = total_quantity
 
     def re_add_order(self, order: Order):
-        if self.orders.add_head(order.id, order):
-            self.total_quantity += order.remained_quantity
-            order.price_level = self
+        if self.pool is None:
+            order.linked_node = self.orders.add_head(order.id, order)
+        else:
+            order.linked_node = self.orders.add_head_node(
+                self.pool.new_node(order.id, order)
+            )
+        self.total_quantity += order.remained_quantity
+        order.price_level = self
 
     def cancel_order(self, order: Order):
-        if self.orders.remove(order.id):
-            self.total_quantity -= order.remained_quantity
+        if order.linked_node is None or order.price_level is not self:
+            return
+        self.orders.remove_node(order.linked_node)
+        if self.pool is not None:
+            self.pool.release_node(order.linked_node)
+        self.total_quantity -= order.remained_quantity
+        order.linked_node = None
+        order.price_level = None
+
+    def reduce_order(self, order: Order, quantity: float):
+        order.remained_quantity -= quantity
+        self.total_quantity -= quantity
 
     def pop_order(self) -> Optional[Order]:
         order_node = self.orders.pop()
         if order_node is None:
             return None
         order = order_node.value
+        if self.pool is not None:
+            self.pool.release_node(order_node)
         if order is not None:
             self.total_quantity -= order.remained_quantity
+            order.linked_node = None
+            order.price_level = None
         return order
 
     def has_no_orders(self):
@@ -150,6 +312,25 @@ class PriceLevelAVLTree(AVLTree[float, PriceLevel, AVLNode]):
             self.root, AVLNode(key=price_level.price, value=price_level)
         )
 
+    def build(self, price_levels: List[PriceLevel]):
+        # price levels must be sorted by price, replaces the whole tree
+        self.root = self._build(price_levels, 0, len(price_levels))
+
+    def _build(
+        self, price_levels: List[PriceLevel], start: int, end: int
+    ) -> Optional[AVLNode]:
+        if start >= end:
+            return None
+        middle = (start + end) // 2
+        price_level = price_levels[middle]
+        node = AVLNode(key=price_level.price, value=price_level)
+        node.left = self._build(price_levels, start, middle)
+        node.right = self._build(price_levels, middle + 1, end)
+        node.left_height = 0 if node.left is None else node.left.height
+        node.right_height = 0 if node.right is None else node.right.height
+        node.height = 1 + max(node.left_height, node.right_height)
+        return node
+
     @property
     def min_price_level(self) -> Optional[PriceLevel]:
         if self.root is None:
@@ -167,32 +348,204 @@ class PriceLevelAVLTree(AVLTree[float, PriceLevel, AVLNode]):
         return self.root.max_node.value
 
 
+class LevelListener:
+    # Notified when the quantity of a price level may have changed (including
+    # new levels) and when a level is removed from the book.
+    def on_level_update(self, side: SideType, price_level: PriceLevel):
+        pass
+
+    def on_level_remove(self, side: SideType, price_level: PriceLevel):
+        pass
+
+
+class OrderListener:
+    # Notified at every change of a resting order: added to a level, reduced
+    # by a fill (quantity is the filled amount), cancelled, put back at the
+    # head of its level after a partial fill, or reduced in place by an amend
+    # (quantity is the removed amount). An iceberg order whose shown slice
+    # was filled is replenished from its reserve and moved to the tail of its
+    # level.
+    def on_order_add(self, order: Order):
+        pass
+
+    def on_order_fill(self, order: Order, quantity: float):
+        pass
+
+    def on_order_cancel(self, order: Order):
+        pass
+
+    def on_order_requeue(self, order: Order):
+        pass
+
+    def on_order_reduce(self, order: Order, quantity: float):
+        pass
+
+    def on_order_replenish(self, order: Order):
+        pass
+
+
 class OrderBook:
-    def __init__(self):
+    def __init__(self, pool: Optional["BookPool"] = None):
+        self.pool = pool
         self.bids_tree = PriceLevelAVLTree()
         self.asks_tree = PriceLevelAVLTree()
-        self.best_bid_price_level = None
-        self.best_ask_price_level = None
-
-        self.price_levels = {}
+        self.best_bid_price_level: Optional[PriceLevel] = None
+        self.best_ask_price_level: Optional[PriceLevel] = None
+        # prices of the best levels, -inf / inf while a side is empty, so
+        # checking whether an order crosses is a single comparison
+        self.best_bid_price = -math.inf
+        self.best_ask_price = math.inf
+        self.last_trade_price: Optional[float] = None
+        # lowest and highest trade prices of the last sweep, None once the
+        # matching engine checked its stops against them
+        self.low_trade_price: Optional[float] = None
+        self.high_trade_price: Optional[float] = None
+
+        self.bid_price_levels: Dict[float, PriceLevel] = {}
+        self.ask_price_levels: Dict[float, PriceLevel] = {}
+        self.level_listeners: List[LevelListener] = []
+        self.order_listeners: List[OrderListener] = []
+        self.cumulative_depth: Optional["CumulativeDepth"] = None
+        self.analytics: Optional["BookAnalytics"] = None
+        # set by EngineMetrics.attach
+        self.metrics: Optional["EngineMetrics"] = None
 
     def add_order(self, order: Order):
         if order.side == SideType.BUY:
-            self.best_bid_price_level = self._add_order(
-                self.bids_tree, self.best_bid_price_level, order
-            )
+            price_level = self.bid_price_levels.get(order.price)
+            if price_level is None:
+                price_level = self._add_new_price_level(
+                    self.bids_tree, self.bid_price_levels, order
+                )
+                if order.price > self.best_bid_price:
+                    self.best_bid_price_level = price_level
+                    self.best_bid_price = order.price
+            else:
+                price_level.add_order(order)
         else:  # order.side == SideType.SELL:
-            self.best_ask_price_level = self._add_order(
-                self.asks_tree, self.best_ask_price_level, order
-            )
+            price_level = self.ask_price_levels.get(order.price)
+            if price_level is None:
+                price_level = self._add_new_price_level(
+                    self.asks_tree, self.ask_price_levels, order
+                )
+                if order.price < self.best_ask_price:
+                    self.best_ask_price_level = price_level
+                    self.best_ask_price = order.price
+            else:
+                price_level.add_order(order)
+        if self.level_listeners and order.price_level is not None:
+            self._level_updated(order.side, order.price_level)
+        if self.order_listeners:
+            for listener in self.order_listeners:
+                listener.on_order_add(order)
 
     def cancel_order(self, order: Order):
         price_level = order.price_level
         if price_level is None:
             return
         price_level.cancel_order(order)
-        if price_level.orders.size == 0:
+        if self.order_listeners:
+            for listener in self.order_listeners:
+                listener.on_order_cancel(order)
+        if price_level.has_no_orders():
             self._remove_price_level(order.side, price_level)
+        elif self.level_listeners:
+            self._level_updated(order.side, price_level)
+
+    def reduce_order(self, order: Order, quantity: float):
+        # the order keeps its place in the queue
+        price_level = order.price_level
+        if price_level is None:
+            return
+        price_level.reduce_order(order, quantity)
+        if self.order_listeners:
+            for listener in self.order_listeners:
+                listener.on_order_reduce(order, quantity)
+        if self.level_listeners:
+            self._level_updated(order.side, price_level)
+
+    def _level_updated(self, side: SideType, price_level: PriceLevel):
+        for listener in self.level_listeners:
+            listener.on_level_update(side, price_level)
+
+    def _level_removed(self, side: SideType, price_level: PriceLevel):
+        for listener in self.level_listeners:
+            listener.on_level_remove(side, price_level)
+
+    def _levels_loaded(self, price_levels: List[PriceLevel]):
+        # bulk loaded levels and orders are counted and announced like those
+        # added one at a time
+        if self.metrics is not None:
+            for price_level in price_levels:
+                self.metrics.level_created(price_level)
+        if self.order_listeners:
+            for price_level in price_levels:
+                for order in price_level.orders.get_all_values():
+                    for listener in self.order_listeners:
+                        listener.on_order_add(order)
+
+    def load_price_levels(self, side: SideType, price_levels: List[PriceLevel]):
+        # bulk load an empty side from price levels sorted by price
+        levels = (
+            self.bid_price_levels if side == SideType.BUY else self.ask_price_levels
+        )
+        for price_level in price_levels:
+            levels[price_level.price] = price_level
+            if self.level_listeners:
+                self._level_updated(side, price_level)
+        self._levels_loaded(price_levels)
+        if side == SideType.BUY:
+            self.bids_tree.build(price_levels)
+            self._set_best_bid(price_levels[-1] if price_levels else None)
+        else:
+            self.asks_tree.build(price_levels)
+            self._set_best_ask(price_levels[0] if price_levels else None)
+
+    def bulk_load(self, orders: Iterable[Order]):
+        # Builds the book from resting orders sorted by ascending price, orders
+        # of one price keep their input order. Sides that receive orders must
+        # be empty and the result must not be crossed.
+        with gc_paused():
+            self._bulk_load(orders)
+
+    def _bulk_load(self, orders: Iterable[Order]):
+        # the input is checked in full before any order or level is touched
+        bids: List[Tuple[float, List[Order]]] = []
+        asks: List[Tuple[float, List[Order]]] = []
+        for (side, price), run in groupby(orders, attrgetter("side", "price")):
+            runs = bids if side == SideType.BUY else asks
+            run_orders = list(run)
+            for order in run_orders:
+                if order.order_type is not OrderType.LIMIT:
+                    raise ValueError("only limit orders can be bulk loaded")
+            if runs and runs[-1][0] == price:
+                runs[-1][1].extend(run_orders)
+                continue
+            if runs and price < runs[-1][0]:
+                raise ValueError("orders must be sorted by price")
+            self.validate_price(price)
+            runs.append((price, run_orders))
+
+        if bids and asks and bids[-1][0] >= asks[0][0]:
+            raise ValueError("bulk loaded orders cross")
+        for side, runs in ((SideType.BUY, bids), (SideType.SELL, asks)):
+            if runs and not self.is_empty(side):
+                raise ValueError(f"the {side.value} side is not empty")
+
+        for side, runs in ((SideType.BUY, bids), (SideType.SELL, asks)):
+            if not runs:
+                continue
+            price_levels = []
+            for price, run_orders in runs:
+                price_level = PriceLevel(price)
+                price_level.add_orders(run_orders)
+                price_levels.append(price_level)
+            self.load_price_levels(side, price_levels)
+
+    def validate_price(self, price: float):
+        # raises ValueError for a price the book cannot rest an order at,
+        # checked before an order that may rest is matched
+        pass
 
     def is_empty_bids(self) -> bool:
         return self.bids_tree.root is None
@@ -200,43 +553,67 @@ class OrderBook:
     def is_empty_asks(self) -> bool:
         return self.asks_tree.root is None
 
+    def can_fill(self, order: Order) -> bool:
+        # the cumulative depth index is built on the first check and then kept
+        # up to date through the level listeners
+        if self.cumulative_depth is None:
+            from order_book.depth import CumulativeDepth
+
+            self.cumulative_depth = CumulativeDepth(self)
+        available = self.cumulative_depth.available_quantity(
+            order.other_side, order.price
+        )
+        return available >= order.remained_quantity
+
+    def get_analytics(self) -> "BookAnalytics":
+        # numpy arrays of both sides, built on the first call and then kept
+        # up to date through the level listeners
+        if self.analytics is None:
+            from order_book.analytics import BookAnalytics
+
+            self.analytics = BookAnalytics(self)
+        return self.analytics
+
     def is_empty(self, side: SideType) -> bool:
         if side == SideType.BUY:
             return self.is_empty_bids()
         else:
             return self.is_empty_asks()
 
+    def _new_price_level(self, price: float) -> PriceLevel:
+        if self.pool is None:
+            price_level = PriceLevel(price)
+        else:
+            price_level = self.pool.new_level(price)
+        if self.metrics is not None:
+            self.metrics.level_created(price_level)
+        return price_level
+
+    def _set_best_bid(self, price_level: Optional[PriceLevel]):
+        self.best_bid_price_level = price_level
+        self.best_bid_price = -math.inf if price_level is None else price_level.price
+
+    def _set_best_ask(self, price_level: Optional[PriceLevel]):
+        self.best_ask_price_level = price_level
+        self.best_ask_price = math.inf if price_level is None else price_level.price
+
     def _add_new_price_level(
         self,
         prices_tree: PriceLevelAVLTree,
-        best_price_level: Optional[PriceLevel],
+        price_levels: Dict[float, PriceLevel],
         order: Order,
     ) -> PriceLevel:
-        price_level = PriceLevel(order.price)
+        price_level = self._new_price_level(order.price)
         price_level.add_order(order)
-        prices_tree.insert(price_level)
-        self.price_levels[order.price] = price_level
-
-        if best_price_level is None:
-            return price_level
-        if order.side == SideType.BUY and best_price_level.price < price_level.price:
-            return price_level
-        if order.side == SideType.SELL and best_price_level.price > price_level.price:
-            return price_level
-        return best_price_level
-
-    def _add_order(
-        self,
-        price_tree: PriceLevelAVLTree,
-        best_price_level: Optional[PriceLevel],
-        order: Order,
-    ) -> Optional[PriceLevel]:
-        if order.price not in self.price_levels:
-            return self._add_new_price_level(price_tree, best_price_level, order)
+        metrics = self.metrics
+        if metrics is None:
+            prices_tree.insert(price_level)
         else:
-            price_level = self.price_levels[order.price]
-            price_level.add_order(order)
-            return best_price_level
+            start = metrics.clock()
+            prices_tree.insert(price_level)
+            metrics.record_tree_insert(metrics.clock() - start)
+        price_levels[order.price] = price_level
+        return price_level
 
     def best_price_levels(self, side: SideType) -> Generator[PriceLevel, None, None]:
         if side == SideType.SELL:
@@ -265,7 +642,14 @@ class OrderBook:
 
             best_match_order = price_level.pop_order()
             while best_match_order is not None:
+                remained_quantity = best_match_order.remained_quantity
                 order, best_match_order = yield best_match_order
+                if self.order_listeners:
+                    filled_quantity = (
+                        remained_quantity - best_match_order.remained_quantity
+                    )
+                    for listener in self.order_listeners:
+                        listener.on_order_fill(best_match_order, filled_quantity)
 
                 if order.remained_quantity == 0:
                     break
@@ -281,6 +665,12 @@ class OrderBook:
                         clear_price_levels.append(price_level)
                 else:
                     price_level.re_add_order(best_match_order)
+                    if self.order_listeners:
+                        for listener in self.order_listeners:
+                            listener.on_order_requeue(best_match_order)
+
+            if self.level_listeners:
+                self._level_updated(order.other_side, price_level)
 
             if order.remained_quantity == 0:
                 break
@@ -291,87 +681,434 @@ class OrderBook:
         if order.remained_quantity > 0:
             self.add_order(order)
 
+    def match_order(
+        self,
+        order: Order,
+        on_fill: Callable[[Order, Order, float, float], None],
+        order_index: Optional[Dict[ID_TYPE, Order]] = None,
+    ):
+        # Same fills as driving best_matched_orders, but the levels are
+        # consumed in place from the cached best price level, and iceberg
+        # orders are replenished. Fully filled orders are dropped from
+        # order_index when one is given. The remainder is left to the caller.
+        other_side = order.other_side
+        is_buy = order.side == SideType.BUY
+        order_listeners = self.order_listeners
+        pool = self.pool
+        first_trade_price = None
+        while order.remained_quantity > 0:
+            if is_buy:
+                price_level = self.best_ask_price_level
+                if price_level is None or order.price < price_level.price:
+                    break
+            else:
+                price_level = self.best_bid_price_level
+                if price_level is None or order.price > price_level.price:
+                    break
+
+            orders = price_level.orders
+            node = orders.head
+            while node is not None:
+                match_order = node.value
+                remained_quantity = match_order.remained_quantity
+                matched_quantity = min(remained_quantity, order.remained_quantity)
+                match_order.remained_quantity -= matched_quantity
+                order.remained_quantity -= matched_quantity
+                on_fill(match_order, order, match_order.price, matched_quantity)
+                if order_listeners:
+                    # reported as a difference so mirrors stay exact on floats
+                    filled_quantity = remained_quantity - match_order.remained_quantity
+                    for listener in order_listeners:
+                        listener.on_order_fill(match_order, filled_quantity)
+
+                if match_order.remained_quantity > 0:
+                    # the order stays at the head of the queue, the total is
+                    # updated as a pop followed by a re-add to keep it exact
+                    price_level.total_quantity -= remained_quantity
+                    price_level.total_quantity += match_order.remained_quantity
+                    if order_listeners:
+                        for listener in order_listeners:
+                            listener.on_order_requeue(match_order)
+                    break
+
+                if match_order.hidden_quantity > 0:
+                    # an iceberg shows a new slice from its reserve, its node
+                    # moves to the tail of the same level and the tree is not
+                    # touched
+                    orders.pop()
+                    orders.add_tail_node(node)
+                    hidden_quantity = match_order.hidden_quantity
+                    display_quantity: float = match_order.display_quantity  # type: ignore
+                    if hidden_quantity > display_quantity:
+                        match_order.hidden_quantity = hidden_quantity - display_quantity
+                        match_order.remained_quantity = display_quantity
+                    else:
+                        match_order.hidden_quantity = 0
+                        match_order.remained_quantity = hidden_quantity
+                    price_level.total_quantity -= remained_quantity
+                    price_level.total_quantity += match_order.remained_quantity
+                    if order_listeners:
+                        for listener in order_listeners:
+                            listener.on_order_replenish(match_order)
+                    if order.remained_quantity == 0:
+                        break
+                    node = orders.head
+                    continue
+
+                orders.pop()
+                if pool is not None:
+                    pool.release_node(node)
+                price_level.total_quantity -= remained_quantity
+                match_order.linked_node = None
+                match_order.price_level = None
+                if order_index is not None:
+                    order_index.pop(match_order.id, None)
+                if order.remained_quantity == 0:
+                    break
+                node = orders.head
+
+            self.last_trade_price = price_level.price
+            if first_trade_price is None:
+                first_trade_price = price_level.price
+            if self.level_listeners:
+                self._level_updated(other_side, price_level)
+            if orders.size == 0:
+                self._remove_price_level(other_side, price_level)
+
+        if first_trade_price is not None:
+            # a sweep trades at prices moving away from the first level
+            if is_buy:
+                self.low_trade_price = first_trade_price
+                self.high_trade_price = self.last_trade_price
+            else:
+                self.low_trade_price = self.last_trade_price
+                self.high_trade_price = first_trade_price
+
     def _remove_price_level(self, side: SideType, price_level: PriceLevel):
-        del self.price_levels[price_level.price]
+        if self.level_listeners:
+            self._level_removed(side, price_level)
         if side == SideType.BUY:
+            del self.bid_price_levels[price_level.price]
             self.bids_tree.remove(price_level)
-            if self.best_bid_price_level == price_level:
-                self.best_bid_price_level = self.bids_tree.max_price_level
+            if self.best_bid_price_level is price_level:
+                self._set_best_bid(self.bids_tree.max_price_level)
         else:
+            del self.ask_price_levels[price_level.price]
             self.asks_tree.remove(price_level)
-            if self.best_ask_price_level == price_level:
-                if self.asks_tree.root is None:
-                    self.best_ask_price_level = None
-                else:
-                    self.best_ask_price_level = self.asks_tree.min_price_level
+            if self.best_ask_price_level is price_level:
+                self._set_best_ask(self.asks_tree.min_price_level)
+        if self.metrics is not None:
+            self.metrics.level_removed(price_level)
+        if self.pool is not None:
+            self.pool.release_level(price_level)
 
 
 class MatchingEngine:
-    def __init__(self, order_book: Optional[OrderBook] = None):
+    def __init__(
+        self,
+        order_book: Optional[OrderBook] = None,
+        trade_sink: Optional["TradeSink"] = None,
+        metrics: Optional["EngineMetrics"] = None,
+        views: Optional["BookViews"] = None,
+    ):
         self.order_book = order_book or OrderBook()
+        # without a sink fills are returned as Trade lists
+        self.trade_sink = trade_sink
+        # operations are only measured when metrics are given
+        self.metrics = metrics
+        if metrics is not None:
+            metrics.attach(self.order_book)
+        # read views are published after each operation when views are given
+        self.views = views
+        if views is not None:
+            views.attach(self.order_book)
 
         self.orders: Dict[Union[int, str], Order] = {}
         self.filled_orders: Dict[int, Order] = {}
+        # pending stop orders, created with the first one
+        self.trigger_book: Optional["TriggerBook"] = None
+        self.triggering = False
+        # when set, triggered stops are appended to it, the owner clears it
+        self.triggered_stops: Optional[List[Order]] = None
 
     def add_order(self, order: Order) -> Tuple[Order, list]:
-        if self.order_book.is_empty(order.other_side) or self._is_unmatched_best_price(
-            order
+        trades: List[Trade] = []
+        if self.metrics is None:
+            self._add_order(order, trades)
+        else:
+            self._measured_add_order(order, trades)
+        if self.views is not None:
+            self.views.publish()
+        return order, trades
+
+    def add_orders(
+        self,
+        orders: Iterable[Union[Order, CancelOrderData, ModifyOrderData]],
+        trades: Optional[List[Trade]] = None,
+    ) -> List[Trade]:
+        # Trades of all orders are appended to one buffer, pass a list to reuse it
+        # across batches.
+        if trades is None:
+            trades = []
+        if self.metrics is None:
+            add_order = self._add_order
+            cancel_order = self._cancel_order
+            modify_order = self._modify_order
+        else:
+            add_order = self._measured_add_order
+            cancel_order = self._measured_cancel_order
+            modify_order = self._measured_modify_order
+        for order in orders:
+            if isinstance(order, CancelOrderData):
+                cancel_order(order)
+            elif isinstance(order, ModifyOrderData):
+                modify_order(order, trades)
+            else:
+                add_order(order, trades)
+        # a batch is published as one operation
+        if self.views is not None:
+            self.views.publish()
+        return trades
+
+    def _add_order(self, order: Order, trades: List[Trade]):
+        order_book = self.order_book
+        if (
+            order.order_type is OrderType.LIMIT
+            or order.order_type is OrderType.STOP_LIMIT
         ):
-            self.order_book.add_order(order)
-            self.orders[order.id] = order
-            return order, []
+            order_book.validate_price(order.price)
+        if order.stop_price is not None:
+            self._add_stop_order(order, trades)
+            return
+        if order.side == SideType.BUY:
+            crossed = order.price >= order_book.best_ask_price
+        else:  # order.side == SideType.SELL
+            crossed = order.price <= order_book.best_bid_price
+        if not crossed:
+            if order.order_type is OrderType.LIMIT:
+                order_book.add_order(order)
+                self.orders[order.id] = order
+            return
 
-        updated_order, trades = self._execute_order(order)
+        if order.order_type is OrderType.FOK and not order_book.can_fill(order):
+            return
 
-        return updated_order, trades
+        self._execute_order(order, trades)
+        if order.price_level is not None:
+            self.orders[order.id] = order
+        if self.trigger_book is not None and not self.triggering:
+            self._trigger_stops(trades)
+
+    def _add_stop_order(self, order: Order, trades: List[Trade]):
+        if self.trigger_book is None:
+            from order_book.triggers import TriggerBook
+
+            self.trigger_book = TriggerBook()
+        self.trigger_book.add(order)
+        self.orders[order.id] = order
+        # a stop the last trade price is already past triggers right away, a
+        # sweep the stops were not checked against predates it
+        if not self.triggering:
+            self.order_book.low_trade_price = self.order_book.high_trade_price = None
+            self._trigger_stops(trades)
+
+    def _trigger_stops(self, trades: List[Trade]):
+        # Stops crossed by the trades of the last sweep are added as market or
+        # limit orders in the order of TriggerBook.release, the stops their
+        # trades trigger in turn are queued behind them. Their trades are
+        # appended to those of the order that started the cascade.
+        trigger_book: "TriggerBook" = self.trigger_book  # type: ignore
+        order_book = self.order_book
+        queue: Deque[Order] = deque()
+        self.triggering = True
+        try:
+            while True:
+                # buys are checked against the highest price of the last sweep
+                # and sells against its lowest, a stop crossed by any of its
+                # trades is released
+                high_price = order_book.high_trade_price
+                if high_price is None:
+                    high_price = low_price = order_book.last_trade_price
+                else:
+                    low_price = order_book.low_trade_price
+                    order_book.low_trade_price = order_book.high_trade_price = None
+                if high_price is not None and trigger_book:
+                    queue.extend(trigger_book.release(high_price, low_price))
+                if not queue:
+                    return
+                order = queue.popleft()
+                del self.orders[order.id]
+                if self.triggered_stops is not None:
+                    self.triggered_stops.append(order)
+                order.stop_price = None
+                if order.order_type is OrderType.STOP:
+                    order.order_type = OrderType.MARKET
+                    order.price = math.inf if order.side == SideType.BUY else -math.inf
+                else:
+                    order.order_type = OrderType.LIMIT
+                # called directly as the order is already in the units of the book
+                MatchingEngine._add_order(self, order, trades)
+        finally:
+            self.triggering = False
+
+    def cancel_order(self, order: Union[Order, CancelOrderData]):
+        if self.metrics is None:
+            self._cancel_order(order)
+        else:
+            self._measured_cancel_order(order)
+        if self.views is not None:
+            self.views.publish()
 
-    def cancel_order(self, order: Order):
+    def _cancel_order(self, order: Union[Order, CancelOrderData]):
         if order.id not in self.orders:
             return
 
-        order = self.orders[order.id]
+        order = self.orders.pop(order.id)
+        if order.stop_price is not None:
+            self.trigger_book.remove(order)  # type: ignore
+        else:
+            self.order_book.cancel_order(order)
+
+    def bulk_load(self, orders: List[Order]):
+        # resting limit orders sorted by price, see OrderBook.bulk_load
+        self.order_book.bulk_load(orders)
+        self.orders.update(zip(map(attrgetter("id"), orders), orders))
+        if self.views is not None:
+            self.views.publish()
+
+    def modify_order(
+        self, modify: ModifyOrderData
+    ) -> Tuple[Optional[Order], List[Trade]]:
+        trades: List[Trade] = []
+        if self.metrics is None:
+            order = self._modify_order(modify, trades)
+        else:
+            order = self._measured_modify_order(modify, trades)
+        if self.views is not None:
+            self.views.publish()
+        return order, trades
+
+    def _modify_order(
+        self, modify: ModifyOrderData, trades: List[Trade]
+    ) -> Optional[Order]:
+        order = self.orders.get(modify.id)
+        if order is None or order.price_level is None:
+            # unknown or filled, or a pending stop
+            return None
+
+        price = order.price if modify.price is None else modify.price
+        quantity = order.quantity if modify.quantity is None else modify.quantity
+        remained_quantity = quantity - order.matched_quantity
+        if remained_quantity <= 0:
+            self._cancel_order(order)
+            return order
+
+        open_quantity = order.remained_quantity + order.hidden_quantity
+        if price == order.price and remained_quantity <= open_quantity:
+            # a quantity down amend keeps the time priority, the reserve of an
+            # iceberg is reduced before its shown slice
+            reduced_quantity = open_quantity - remained_quantity
+            order.quantity = quantity
+            if reduced_quantity >= order.hidden_quantity:
+                reduced_quantity -= order.hidden_quantity
+                order.hidden_quantity = 0
+            else:
+                order.hidden_quantity -= reduced_quantity
+                reduced_quantity = 0
+            if reduced_quantity > 0:
+                self.order_book.reduce_order(order, reduced_quantity)
+            return order
+
+        # a new price or a larger quantity goes to the back of the queue, the
+        # order is moved once and may match at its new price
+        if price != order.price:
+            # a rejected price leaves the order resting as it was
+            self.order_book.validate_price(price)
+        del self.orders[order.id]
         self.order_book.cancel_order(order)
+        order.price = price
+        order.quantity = quantity
+        order.remained_quantity = remained_quantity
+        order.hidden_quantity = 0
+        # called directly as the order is already in the units of the book
+        MatchingEngine._add_order(self, order, trades)
+        return order
+
+    def _measured_add_order(self, order: Order, trades: List[Trade]):
+        metrics: "EngineMetrics" = self.metrics  # type: ignore
+        fills = metrics.fills
+        start = metrics.clock()
+        self._add_order(order, trades)
+        metrics.record_add(metrics.clock() - start, metrics.fills - fills)
+        metrics.poll()
+
+    def _measured_cancel_order(self, order: Union[Order, CancelOrderData]):
+        metrics: "EngineMetrics" = self.metrics  # type: ignore
+        start = metrics.clock()
+        self._cancel_order(order)
+        metrics.record_cancel(metrics.clock() - start)
+        metrics.poll()
+
+    def _measured_modify_order(
+        self, modify: ModifyOrderData, trades: List[Trade]
+    ) -> Optional[Order]:
+        metrics: "EngineMetrics" = self.metrics  # type: ignore
+        fills = metrics.fills
+        start = metrics.clock()
+        order = self._modify_order(modify, trades)
+        metrics.record_modify(metrics.clock() - start, metrics.fills - fills)
+        metrics.poll()
+        return order
 
     def _is_matched_best_price(self, order: Order) -> bool:
         if order.side == SideType.BUY:
-            return order.price >= self.order_book.best_ask_price_level.price
+            return order.price >= self.order_book.best_ask_price
         else:  # order.side == SideType.SELL
-            return order.price <= self.order_book.best_bid_price_level.price
+            return order.price <= self.order_book.best_bid_price
 
     def _is_unmatched_best_price(self, order: Order) -> bool:
         return not self._is_matched_best_price(order)
 
-    def _execute_order(self, order: Order) -> Tuple[Order, List[Trade]]:
-        trades = []
-        try:
-            orders_gen = self.order_book.best_matched_orders(order)
-            match_order = next(orders_gen)
-            while order.remained_quantity > 0 or match_order is not None:
-                matched_quantity = min(
-                    match_order.remained_quantity, order.remained_quantity
-                )
+    def _execute_order(
+        self, order: Order, trades: List[Trade]
+    ) -> Tuple[Order, List[Trade]]:
+        trade_sink = self.trade_sink
+        if trade_sink is not None:
+            self.order_book.match_order(order, trade_sink.on_fill, self.orders)
+            if order.remained_quantity > 0 and order.order_type is OrderType.LIMIT:
+                self.order_book.add_order(order)
+            return order, trades
 
-                match_order.remained_quantity -= matched_quantity
-                trades.append(
-                    Trade(
-                        order_id=match_order.id,
-                        quantity=matched_quantity,
-                        side=match_order.side,
-                        price=match_order.price,
-                    )
+        def on_fill(
+            match_order: Order, order: Order, price: float, matched_quantity: float
+        ):
+            trades.append(
+                Trade(
+                    order_id=match_order.id,
+                    quantity=matched_quantity,
+                    side=match_order.side,
+                    price=price,
                 )
-
-                order.remained_quantity -= matched_quantity
-                trades.append(
-                    Trade(
-                        order_id=order.id,
-                        quantity=matched_quantity,
-                        side=order.side,
-                        price=match_order.price,
-                    )
+            )
+            trades.append(
+                Trade(
+                    order_id=order.id,
+                    quantity=matched_quantity,
+                    side=order.side,
+                    price=price,
                 )
+            )
 
-                match_order = orders_gen.send((order, match_order))
+        self.order_book.match_order(order, on_fill, self.orders)
+        if order.remained_quantity > 0 and order.order_type is OrderType.LIMIT:
+            self.order_book.add_order(order)
+        return order, trades
 
-        except StopIteration:
-            return order, trades
+
+class TradeSink:
+    # Receives every fill instead of the engine building Trade lists, the
+    # fill is made at price for quantity.
+    def on_fill(
+        self, maker_order: Order, taker_order: Order, price: float, quantity: float
+    ):
+        pass
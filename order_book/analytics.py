@@ -0,0 +1,155 @@
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from order_book import LevelListener, OrderBook, PriceLevel, SideType
+
+
+class SideArrays:
+    # One side of a book as contiguous arrays ordered from the best price.
+    # keys are the prices for asks and the negated prices for bids so they
+    # are always ascending and can be searched with np.searchsorted.
+    __slots__ = ("sign", "keys", "prices", "quantities", "cumulative", "notional")
+
+    def __init__(self, side: SideType):
+        self.sign = -1.0 if side == SideType.BUY else 1.0
+        self.keys = np.empty(0)
+        self.prices = np.empty(0)
+        self.quantities = np.empty(0)
+        self.cumulative = np.zeros(1)
+        self.notional = np.zeros(1)
+
+    def apply(self, prices: np.ndarray, quantities: np.ndarray, removed: np.ndarray):
+        keys = self.sign * prices
+        index = np.searchsorted(self.keys, keys)
+        present = index < len(self.keys)
+        present[present] = self.keys[index[present]] == keys[present]
+
+        update = present & ~removed
+        self.quantities[index[update]] = quantities[update]
+
+        delete = index[present & removed]
+        if len(delete):
+            self.keys = np.delete(self.keys, delete)
+            self.prices = np.delete(self.prices, delete)
+            self.quantities = np.delete(self.quantities, delete)
+
+        insert = ~present & ~removed
+        if insert.any():
+            order = np.argsort(keys[insert])
+            keys = keys[insert][order]
+            position = np.searchsorted(self.keys, keys)
+            self.keys = np.insert(self.keys, position, keys)
+            self.prices = np.insert(self.prices, position, prices[insert][order])
+            self.quantities = np.insert(
+                self.quantities, position, quantities[insert][order]
+            )
+
+        # running totals with a leading zero, so the totals of the first n
+        # levels are at index n
+        self.cumulative = np.concatenate(([0.0], np.cumsum(self.quantities)))
+        self.notional = np.concatenate(
+            ([0.0], np.cumsum(self.prices * self.quantities))
+        )
+
+
+class BookAnalytics(LevelListener):
+    # Price and quantity arrays of both sides of a book for vectorized depth,
+    # VWAP and slippage queries. Level changes are collected as they happen
+    # and applied to a side's arrays in one pass when it is queried, so many
+    # queries against the same book share one refresh. Get the instance of
+    # a book with OrderBook.get_analytics().
+    #
+    # The side of a query is the side of the book that is walked: SELL for
+    # the cost of buying, BUY for the cost of selling.
+    def __init__(self, order_book: OrderBook):
+        self.order_book = order_book
+        self.sides = {
+            SideType.BUY: SideArrays(SideType.BUY),
+            SideType.SELL: SideArrays(SideType.SELL),
+        }
+        self.dirty: Dict[SideType, Dict[float, Optional[PriceLevel]]] = {
+            SideType.BUY: {},
+            SideType.SELL: {},
+        }
+        for side in self.sides:
+            for price_level in order_book.best_price_levels(side):
+                self.dirty[side][price_level.price] = price_level
+            self.refresh(side)
+        order_book.level_listeners.append(self)
+
+    def on_level_update(self, side: SideType, price_level: PriceLevel):
+        self.dirty[side][price_level.price] = price_level
+
+    def on_level_remove(self, side: SideType, price_level: PriceLevel):
+        self.dirty[side][price_level.price] = None
+
+    def refresh(self, side: SideType) -> SideArrays:
+        dirty = self.dirty[side]
+        arrays = self.sides[side]
+        if dirty:
+            count = len(dirty)
+            prices = np.fromiter(dirty.keys(), float, count)
+            quantities = np.fromiter(
+                (0 if pl is None else pl.total_quantity for pl in dirty.values()),
+                float,
+                count,
+            )
+            removed = np.fromiter((pl is None for pl in dirty.values()), bool, count)
+            dirty.clear()
+            arrays.apply(prices, quantities, removed)
+        return arrays
+
+    def levels(self, side: SideType) -> Tuple[np.ndarray, np.ndarray]:
+        # prices and quantities from the best price, read only
+        arrays = self.refresh(side)
+        prices = arrays.prices.view()
+        quantities = arrays.quantities.view()
+        prices.flags.writeable = quantities.flags.writeable = False
+        return prices, quantities
+
+    def depth(self, side: SideType, levels: int) -> float:
+        # total quantity of the best levels
+        arrays = self.refresh(side)
+        return float(arrays.cumulative[min(levels, len(arrays.prices))])
+
+    def quantity_within(self, side: SideType, prices: np.ndarray) -> np.ndarray:
+        # total quantity at prices at least as good as each of prices
+        arrays = self.refresh(side)
+        index = np.searchsorted(
+            arrays.keys, arrays.sign * np.asarray(prices, float), side="right"
+        )
+        return arrays.cumulative[index]
+
+    def vwap(self, side: SideType, sizes: np.ndarray) -> np.ndarray:
+        # average price of taking each size from the best price, nan where
+        # the side holds less than the size
+        arrays = self.refresh(side)
+        sizes = np.asarray(sizes, float)
+        cumulative = arrays.cumulative
+        # index of the level that completes each size
+        index = np.searchsorted(cumulative[1:], sizes)
+        available = (index < len(arrays.prices)) & (sizes > 0)
+        index = np.minimum(index, max(len(arrays.prices) - 1, 0))
+        vwap = np.full(len(sizes), np.nan)
+        if len(arrays.prices):
+            notional = (
+                arrays.notional[index]
+                + (sizes - cumulative[index]) * arrays.prices[index]
+            )
+            vwap[available] = notional[available] / sizes[available]
+        return vwap
+
+    def slippage(self, side: SideType, sizes: np.ndarray) -> np.ndarray:
+        # how much worse than the best price each size is filled on average,
+        # in price units, nan where the side holds less than the size
+        vwap = self.vwap(side, sizes)
+        prices = self.sides[side].prices
+        if not len(prices):
+            return vwap
+        return self.sides[side].sign * (vwap - prices[0])
+
+    def close(self):
+        self.order_book.level_listeners.remove(self)
+        if self.order_book.analytics is self:
+            self.order_book.analytics = None
@@ -0,0 +1,78 @@
+import struct
+from typing import Tuple
+
+from order_book import ID_TYPE, OrderType, SideType
+
+INT_ID = 0
+STR_ID = 1
+
+ID_HEADER = struct.Struct("<BH")
+INT_ID_VALUE = struct.Struct("<q")
+
+SIDE_CODES = {SideType.BUY: 0, SideType.SELL: 1}
+SIDES = (SideType.BUY, SideType.SELL)
+# set next to the side code in the flags of an order when its display
+# quantity follows
+DISPLAY_FLAG = 0x08
+SIDE_MASK = 0x07
+
+ORDER_TYPE_CODES = {
+    OrderType.LIMIT: 0,
+    OrderType.MARKET: 1,
+    OrderType.IOC: 2,
+    OrderType.FOK: 3,
+    OrderType.STOP: 4,
+    OrderType.STOP_LIMIT: 5,
+}
+ORDER_TYPES = (
+    OrderType.LIMIT,
+    OrderType.MARKET,
+    OrderType.IOC,
+    OrderType.FOK,
+    OrderType.STOP,
+    OrderType.STOP_LIMIT,
+)
+
+
+def encode_id(buffer: bytearray, order_id: ID_TYPE):
+    if isinstance(order_id, int):
+        buffer += ID_HEADER.pack(INT_ID, INT_ID_VALUE.size)
+        buffer += INT_ID_VALUE.pack(order_id)
+    else:
+        data = order_id.encode()
+        buffer += ID_HEADER.pack(STR_ID, len(data))
+        buffer += data
+
+
+def decode_id(data: bytes, offset: int) -> Tuple[ID_TYPE, int]:
+    kind, size = ID_HEADER.unpack_from(data, offset)
+    offset += ID_HEADER.size
+    if kind == INT_ID:
+        return INT_ID_VALUE.unpack_from(data, offset)[0], offset + size
+    return bytes(data[offset : offset + size]).decode(), offset + size
+
+
+INT_NUMBER = 0
+FLOAT_NUMBER = 1
+
+NUMBER_TYPE = struct.Struct("<B")
+INT_NUMBER_VALUE = struct.Struct("<q")
+FLOAT_NUMBER_VALUE = struct.Struct("<d")
+
+
+def encode_number(buffer: bytearray, value: float):
+    # ints stay ints, so fixed-point books round-trip exactly
+    if isinstance(value, int):
+        buffer += NUMBER_TYPE.pack(INT_NUMBER)
+        buffer += INT_NUMBER_VALUE.pack(value)
+    else:
+        buffer += NUMBER_TYPE.pack(FLOAT_NUMBER)
+        buffer += FLOAT_NUMBER_VALUE.pack(value)
+
+
+def decode_number(data: bytes, offset: int) -> Tuple[float, int]:
+    kind = data[offset]
+    offset += NUMBER_TYPE.size
+    if kind == INT_NUMBER:
+        return INT_NUMBER_VALUE.unpack_from(data, offset)[0], offset + 8
+    return FLOAT_NUMBER_VALUE.unpack_from(data, offset)[0], offset + 8
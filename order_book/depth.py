@@ -0,0 +1,165 @@
+from typing import Dict, Optional
+
+from py_simple_trees import AVLNode, AVLTree  # type: ignore
+
+from order_book import LevelListener, OrderBook, PriceLevel, SideType
+
+
+class DepthNode(AVLNode):
+    def __init__(self, price: float, quantity: float):
+        super().__init__(price)
+        self.quantity = quantity
+        self.depth = quantity
+
+
+def _update(node: DepthNode):
+    left = node.left
+    right = node.right
+    node.left_height = 0 if left is None else left.height
+    node.right_height = 0 if right is None else right.height
+    node.height = 1 + max(node.left_height, node.right_height)
+    node.depth = node.quantity
+    if left is not None:
+        node.depth += left.depth
+    if right is not None:
+        node.depth += right.depth
+
+
+class DepthTree(AVLTree[float, None, DepthNode]):
+    # AVL tree over the prices of one side, every node also keeps the total
+    # quantity of its subtree so the quantity up to a price is one descent.
+    def __init__(self):
+        super().__init__()
+        self.root = None
+
+    def set(self, price: float, quantity: float):
+        self.root = self._set(self.root, price, quantity)
+
+    def _set(
+        self, root: Optional[DepthNode], price: float, quantity: float
+    ) -> DepthNode:
+        if root is None:
+            return DepthNode(price, quantity)
+        if price < root.key:
+            root.left = self._set(root.left, price, quantity)
+        elif price > root.key:
+            root.right = self._set(root.right, price, quantity)
+        else:
+            root.quantity = quantity
+        _update(root)
+        return self._balance(root)
+
+    def discard(self, price: float):
+        self.root = self._discard(self.root, price)
+
+    def _discard(self, root: Optional[DepthNode], price: float) -> Optional[DepthNode]:
+        if root is None:
+            return None
+        if price < root.key:
+            root.left = self._discard(root.left, price)
+        elif price > root.key:
+            root.right = self._discard(root.right, price)
+        else:
+            if root.left is None:
+                return root.right
+            if root.right is None:
+                return root.left
+            successor = root.right
+            while successor.left is not None:
+                successor = successor.left
+            root.key = successor.key
+            root.quantity = successor.quantity
+            root.right = self._discard(root.right, successor.key)
+        _update(root)
+        return self._balance(root)
+
+    def _left_rotate(self, z: DepthNode) -> DepthNode:
+        y = z.right
+        z.right = y.left
+        y.left = z
+        _update(z)
+        _update(y)
+        return y
+
+    def _right_rotate(self, z: DepthNode) -> DepthNode:
+        y = z.left
+        z.left = y.right
+        y.right = z
+        _update(z)
+        _update(y)
+        return y
+
+    def quantity_to(self, price: float) -> float:
+        # total quantity at prices <= price
+        total = 0
+        node = self.root
+        while node is not None:
+            if node.key <= price:
+                total += node.quantity
+                if node.left is not None:
+                    total += node.left.depth
+                node = node.right
+            else:
+                node = node.left
+        return total
+
+    def quantity_from(self, price: float) -> float:
+        # total quantity at prices >= price
+        total = 0
+        node = self.root
+        while node is not None:
+            if node.key >= price:
+                total += node.quantity
+                if node.right is not None:
+                    total += node.right.depth
+                node = node.left
+            else:
+                node = node.right
+        return total
+
+
+class CumulativeDepth(LevelListener):
+    # Cumulative resting quantity of both sides of a book. Level changes are
+    # only collected as they happen, a side's tree is brought up to date when
+    # it is queried.
+    def __init__(self, order_book: OrderBook):
+        self.order_book = order_book
+        self.trees = {SideType.BUY: DepthTree(), SideType.SELL: DepthTree()}
+        self.dirty: Dict[SideType, Dict[float, Optional[PriceLevel]]] = {
+            SideType.BUY: {},
+            SideType.SELL: {},
+        }
+        for side, tree in self.trees.items():
+            for price_level in order_book.best_price_levels(side):
+                tree.set(price_level.price, price_level.total_quantity)
+        order_book.level_listeners.append(self)
+
+    def on_level_update(self, side: SideType, price_level: PriceLevel):
+        self.dirty[side][price_level.price] = price_level
+
+    def on_level_remove(self, side: SideType, price_level: PriceLevel):
+        self.dirty[side][price_level.price] = None
+
+    def flush(self, side: SideType):
+        dirty = self.dirty[side]
+        if not dirty:
+            return
+        tree = self.trees[side]
+        for price, price_level in dirty.items():
+            if price_level is None:
+                tree.discard(price)
+            else:
+                tree.set(price, price_level.total_quantity)
+        dirty.clear()
+
+    def available_quantity(self, side: SideType, price: float) -> float:
+        # resting quantity on side that an order at price would cross
+        self.flush(side)
+        if side == SideType.SELL:
+            return self.trees[side].quantity_to(price)
+        return self.trees[side].quantity_from(price)
+
+    def close(self):
+        self.order_book.level_listeners.remove(self)
+        if self.order_book.cumulative_depth is self:
+            self.order_book.cumulative_depth = None
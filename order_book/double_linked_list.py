@@ -5,6 +5,8 @@ V = TypeVar("V")
 
 
 class LinkedNode(Generic[K, V]):
+    __slots__ = ("key", "value", "next", "prev")
+
     def __init__(self, key: K, value: Union[V, None]):
         self.key: K = key
         self.value: Union[V, None] = value
@@ -13,31 +15,33 @@ class LinkedNode(Generic[K, V]):
 
 
 class LinkedList(Generic[K, V]):
+    __slots__ = ("size", "head", "tail")
+
     def __init__(self):
         self.size = 0
         self.head = None
         self.tail = None
 
-    def _add_first_node(self, node: LinkedNode) -> bool:
+    def _add_first_node(self, node: LinkedNode) -> LinkedNode:
         self.head = self.tail = node
         self.size += 1
-        return True
+        return node
 
-    def _add_head(self, node: LinkedNode):
+    def _add_head(self, node: LinkedNode) -> LinkedNode:
         node.next = self.head
         self.head.prev = node
         self.head = node
         self.size += 1
-        return True
+        return node
 
-    def _add_tail(self, node: LinkedNode):
+    def _add_tail(self, node: LinkedNode) -> LinkedNode:
         node.prev = self.tail
         self.tail.next = node
         self.tail = node
         self.size += 1
-        return True
+        return node
 
-    def add_head(self, key: K, value: V) -> bool:
+    def add_head(self, key: K, value: V) -> LinkedNode[K, V]:
         node = LinkedNode(key, value)
 
         if self.head is None:
@@ -45,7 +49,7 @@ class LinkedList(Generic[K, V]):
 
         return self._add_head(node)
 
-    def add_tail(self, key: K, value: V) -> bool:
+    def add_tail(self, key: K, value: V) -> LinkedNode[K, V]:
         node = LinkedNode(key, value)
 
         if self.tail is None:
@@ -53,9 +57,35 @@ class LinkedList(Generic[K, V]):
 
         return self._add_tail(node)
 
-    def add(self, key: K, value: V) -> bool:
+    def add(self, key: K, value: V) -> LinkedNode[K, V]:
         return self.add_tail(key, value)
 
+    def add_head_node(self, node: LinkedNode[K, V]) -> LinkedNode[K, V]:
+        if self.head is None:
+            return self._add_first_node(node)
+        return self._add_head(node)
+
+    def add_tail_node(self, node: LinkedNode[K, V]) -> LinkedNode[K, V]:
+        if self.tail is None:
+            return self._add_first_node(node)
+        return self._add_tail(node)
+
+    def extend(self, nodes: List[LinkedNode[K, V]]):
+        # links new nodes after the tail in one pass
+        if not nodes:
+            return
+        for previous, node in zip(nodes, nodes[1:]):
+            previous.next = node
+            node.prev = previous
+        first = nodes[0]
+        if self.tail is None:
+            self.head = first
+        else:
+            self.tail.next = first
+            first.prev = self.tail
+        self.tail = nodes[-1]
+        self.size += len(nodes)
+
     def pop(self) -> Optional[LinkedNode]:
         if self.size == 0:
             return None
@@ -70,38 +100,34 @@ class LinkedList(Generic[K, V]):
         if self.size == 0:
             self.tail = None
 
+        node.next = None
         return node
 
     def remove(self, key: K) -> bool:
-        # node = LinkedNode(key, None)
         node = self.find(key)
 
         if node is None:
             return False
 
+        return self.remove_node(node)
+
+    def remove_node(self, node: LinkedNode) -> bool:
+        # the node must belong to this list, no lookup is done
         if self.size == 1:
             self.head = self.tail = None
-            self.size -= 1
-            return True
-
-        if self.head is node:
+        elif self.head is node:
             self.head = node.next
-            if self.head is not None:
-                self.head.prev = None
-            self.size -= 1
-            return True
-
-        if self.tail is node:
+            self.head.prev = None
+        elif self.tail is node:
             self.tail = node.prev
-            if self.tail is not None:
-                self.tail.next = None
-            self.size -= 1
-            return True
-
-        if node.prev is not None:
-            node.prev.next = node.next
-        if node.next is not None:
-            node.next.prev = node.prev
+            self.tail.next = None
+        else:
+            if node.prev is not None:
+                node.prev.next = node.next
+            if node.next is not None:
+                node.next.prev = node.prev
+
+        node.prev = node.next = None
         self.size -= 1
         return True
 
@@ -0,0 +1,140 @@
+from typing import TYPE_CHECKING, List, Optional
+
+from order_book import (
+    MatchingEngine,
+    ModifyOrderData,
+    Order,
+    OrderBook,
+    OrderType,
+    Trade,
+    TradeSink,
+)
+
+if TYPE_CHECKING:
+    from order_book.metrics import EngineMetrics
+    from order_book.views import BookViews
+
+
+class FixedPointConverter:
+    def __init__(self, tick_size: float, lot_size: float):
+        if tick_size <= 0 or lot_size <= 0:
+            raise ValueError("tick_size and lot_size must be positive")
+        self.tick_size = tick_size
+        self.lot_size = lot_size
+
+    @staticmethod
+    def _to_units(value: float, unit: float, name: str) -> int:
+        units = round(value / unit)
+        if abs(units * unit - value) > abs(unit) * 1e-9:
+            raise ValueError(f"{name} {value} is not a multiple of {unit}")
+        return units
+
+    def to_ticks(self, price: float) -> int:
+        return self._to_units(price, self.tick_size, "price")
+
+    def to_lots(self, quantity: float) -> int:
+        return self._to_units(quantity, self.lot_size, "quantity")
+
+    def to_price(self, ticks: int) -> float:
+        return ticks * self.tick_size
+
+    def to_quantity(self, lots: int) -> float:
+        return lots * self.lot_size
+
+
+class FixedPointMatchingEngine(MatchingEngine):
+    # Prices and quantities are converted to integer ticks and lots once when an
+    # order enters the engine, the book only ever sees ints. Submitted orders stay
+    # in ticks/lots, trades are converted back to prices and quantities. A trade
+    # sink receives fills in ticks/lots.
+    def __init__(
+        self,
+        tick_size: float,
+        lot_size: float,
+        order_book: Optional[OrderBook] = None,
+        trade_sink: Optional[TradeSink] = None,
+        metrics: Optional["EngineMetrics"] = None,
+        views: Optional["BookViews"] = None,
+    ):
+        super().__init__(order_book, trade_sink, metrics, views)
+        self.converter = FixedPointConverter(tick_size, lot_size)
+
+    def _add_order(self, order: Order, trades: List[Trade]):
+        self.to_fixed_point(order)
+        start = len(trades)
+        super()._add_order(order, trades)
+        for index in range(start, len(trades)):
+            self.to_floating_point(trades[index])
+
+    def _modify_order(
+        self, modify: ModifyOrderData, trades: List[Trade]
+    ) -> Optional[Order]:
+        converter = self.converter
+        if modify.price is not None:
+            modify = modify._replace(price=converter.to_ticks(modify.price))
+        if modify.quantity is not None:
+            modify = modify._replace(quantity=converter.to_lots(modify.quantity))
+        start = len(trades)
+        order = super()._modify_order(modify, trades)
+        for index in range(start, len(trades)):
+            self.to_floating_point(trades[index])
+        return order
+
+    def bulk_load(self, orders: List[Order]):
+        # converted like submitted orders, a rejected load restores the values
+        # the orders came with
+        values = [
+            (
+                order.price,
+                order.quantity,
+                order.remained_quantity,
+                order.stop_price,
+                order.display_quantity,
+            )
+            for order in orders
+        ]
+        try:
+            for order in orders:
+                self.to_fixed_point(order)
+            super().bulk_load(orders)
+        except ValueError:
+            for order, (
+                price,
+                quantity,
+                remained_quantity,
+                stop_price,
+                display_quantity,
+            ) in zip(orders, values):
+                order.price = price
+                order.quantity = quantity
+                order.remained_quantity = remained_quantity
+                order.stop_price = stop_price
+                order.display_quantity = display_quantity
+            raise
+
+    def to_fixed_point(self, order: Order):
+        # every field is converted before any is assigned, a rejected order is
+        # left as it was submitted
+        converter = self.converter
+        price = order.price
+        if order.order_type is not OrderType.MARKET and (
+            order.order_type is not OrderType.STOP
+        ):
+            price = converter.to_ticks(price)
+        stop_price = order.stop_price
+        if stop_price is not None:
+            stop_price = converter.to_ticks(stop_price)
+        quantity = converter.to_lots(order.quantity)
+        remained_quantity = converter.to_lots(order.remained_quantity)
+        display_quantity = order.display_quantity
+        if display_quantity is not None:
+            display_quantity = converter.to_lots(display_quantity)
+        order.price = price
+        order.stop_price = stop_price
+        order.quantity = quantity
+        order.remained_quantity = remained_quantity
+        order.display_quantity = display_quantity
+
+    def to_floating_point(self, trade: Trade):
+        trade.price = self.converter.to_price(int(trade.price))
+        trade.quantity = self.converter.to_quantity(int(trade.quantity))
@@ -0,0 +1,449 @@
+import argparse
+import asyncio
+import random
+import struct
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from order_book import ID_TYPE, CancelOrderData, MatchingEngine, Order, OrderType
+from order_book.codec import (
+    DISPLAY_FLAG,
+    ORDER_TYPE_CODES,
+    ORDER_TYPES,
+    SIDE_CODES,
+    SIDE_MASK,
+    SIDES,
+    decode_id,
+    decode_number,
+    encode_id,
+    encode_number,
+)
+from order_book.histogram import LatencyHistogram
+
+# Frames are a payload length (u32) followed by the payload, the first payload
+# byte is the message type:
+#   ADD        side (u8), price, quantity, order id     client -> gateway
+#              the order type is in the high nibble of the side byte,
+#              stop orders end with their stop price, then
+#              iceberg orders with their display quantity
+#   CANCEL     order id                                 client -> gateway
+#   ACCEPTED   order id, remained quantity              gateway -> client
+#   CANCELLED  order id                                 gateway -> client
+#   REJECTED   order id                                 gateway -> client
+#   TRADE      side (u8), price, quantity, order id     gateway -> client
+
+ADD = 1
+CANCEL = 2
+ACCEPTED = 3
+CANCELLED = 4
+REJECTED = 5
+TRADE = 6
+
+FRAME_HEADER = struct.Struct("<I")
+MESSAGE_TYPE = struct.Struct("<B")
+SIDE_MESSAGE = struct.Struct("<BB")
+
+MAX_FRAME_SIZE = 1 << 16
+
+
+def _frame(payload: bytearray) -> bytes:
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+def encode_add(order: Order) -> bytes:
+    flags = SIDE_CODES[order.side] | ORDER_TYPE_CODES[order.order_type] << 4
+    if order.display_quantity is not None:
+        flags |= DISPLAY_FLAG
+    payload = bytearray(SIDE_MESSAGE.pack(ADD, flags))
+    encode_number(payload, order.price)
+    encode_number(payload, order.quantity)
+    encode_id(payload, order.id)
+    if order.stop_price is not None:
+        encode_number(payload, order.stop_price)
+    if order.display_quantity is not None:
+        encode_number(payload, order.display_quantity)
+    return _frame(payload)
+
+
+def encode_cancel(order_id: ID_TYPE) -> bytes:
+    payload = bytearray(MESSAGE_TYPE.pack(CANCEL))
+    encode_id(payload, order_id)
+    return _frame(payload)
+
+
+def encode_accepted(order_id: ID_TYPE, remained_quantity: float) -> bytes:
+    payload = bytearray(MESSAGE_TYPE.pack(ACCEPTED))
+    encode_id(payload, order_id)
+    encode_number(payload, remained_quantity)
+    return _frame(payload)
+
+
+def encode_status(message_type: int, order_id: ID_TYPE) -> bytes:
+    payload = bytearray(MESSAGE_TYPE.pack(message_type))
+    encode_id(payload, order_id)
+    return _frame(payload)
+
+
+def encode_trade(order: Order, price: float, quantity: float) -> bytes:
+    payload = bytearray(SIDE_MESSAGE.pack(TRADE, SIDE_CODES[order.side]))
+    encode_number(payload, price)
+    encode_number(payload, quantity)
+    encode_id(payload, order.id)
+    return _frame(payload)
+
+
+def decode_message(payload: bytes) -> tuple:
+    # ADD -> (ADD, Order), TRADE -> (TRADE, order id, side, price, quantity),
+    # ACCEPTED -> (ACCEPTED, order id, remained), others -> (type, order id)
+    message_type = payload[0]
+    if message_type in (ADD, TRADE):
+        side = SIDES[payload[1] & SIDE_MASK]
+        price, offset = decode_number(payload, SIDE_MESSAGE.size)
+        quantity, offset = decode_number(payload, offset)
+        order_id, offset = decode_id(payload, offset)
+        if message_type == ADD:
+            order_type = ORDER_TYPES[payload[1] >> 4]
+            stop_price = None
+            if order_type is OrderType.STOP or order_type is OrderType.STOP_LIMIT:
+                stop_price, offset = decode_number(payload, offset)
+            display_quantity = None
+            if payload[1] & DISPLAY_FLAG:
+                display_quantity, offset = decode_number(payload, offset)
+            return ADD, Order(
+                price=price,
+                quantity=quantity,
+                side=side,
+                id=order_id,
+                order_type=order_type,
+                stop_price=stop_price,
+                display_quantity=display_quantity,
+            )
+        return TRADE, order_id, side, price, quantity
+    order_id, offset = decode_id(payload, MESSAGE_TYPE.size)
+    if message_type == ACCEPTED:
+        remained_quantity, offset = decode_number(payload, offset)
+        return ACCEPTED, order_id, remained_quantity
+    if message_type in (CANCEL, CANCELLED, REJECTED):
+        return message_type, order_id
+    raise ValueError(f"unknown message type {message_type}")
+
+
+def message_id(payload: bytes) -> ID_TYPE:
+    # best effort order id of a payload decode_message rejected, "" when it
+    # cannot be read either
+    try:
+        if payload[0] in (ADD, TRADE):
+            _, offset = decode_number(payload, SIDE_MESSAGE.size)
+            _, offset = decode_number(payload, offset)
+            return decode_id(payload, offset)[0]
+        return decode_id(payload, MESSAGE_TYPE.size)[0]
+    except (ValueError, IndexError, struct.error):
+        return ""
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Optional[bytes]:
+    try:
+        header = await reader.readexactly(FRAME_HEADER.size)
+        (size,) = FRAME_HEADER.unpack(header)
+        if size > MAX_FRAME_SIZE:
+            raise ValueError(f"frame of {size} bytes is too large")
+        return await reader.readexactly(size)
+    except asyncio.IncompleteReadError:
+        return None
+
+
+class Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.output = bytearray()
+
+
+class Gateway:
+    # Readers of all connections put decoded messages on one bounded queue and
+    # a single matching task applies them to the engine in batches. A full
+    # queue stops the readers, which stops reading from the sockets, so TCP
+    # flow control pushes back on the clients. The matching task waits for a
+    # connection whose output buffer is above the transport's high-water mark,
+    # so a slow consumer slows matching down instead of growing memory.
+    def __init__(
+        self,
+        matching_engine: Optional[MatchingEngine] = None,
+        queue_size: int = 10_000,
+        batch_size: int = 256,
+    ):
+        self.matching_engine = matching_engine or MatchingEngine()
+        # stops triggered by an add, their dropped remainders are reported
+        self.matching_engine.triggered_stops = []
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.batch_size = batch_size
+        self.owners: Dict[ID_TYPE, Tuple[Connection, Order]] = {}
+        self.connections: Set[Connection] = set()
+        self.servers: List[asyncio.AbstractServer] = []
+        self.matching_task: Optional[asyncio.Task] = None
+        self.touched: Set[Connection] = set()
+
+    async def start_tcp(self, host: str = "127.0.0.1", port: int = 0):
+        server = await asyncio.start_server(self._serve, host, port)
+        self._started(server)
+        return server
+
+    async def start_unix(self, path: str):
+        server = await asyncio.start_unix_server(self._serve, path)
+        self._started(server)
+        return server
+
+    def _started(self, server: asyncio.AbstractServer):
+        self.servers.append(server)
+        if self.matching_task is None:
+            self.matching_task = asyncio.create_task(self._match())
+
+    async def close(self):
+        for server in self.servers:
+            server.close()
+            await server.wait_closed()
+        for connection in list(self.connections):
+            connection.writer.close()
+        if self.matching_task is not None:
+            self.matching_task.cancel()
+            try:
+                await self.matching_task
+            except asyncio.CancelledError:
+                pass
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        connection = Connection(reader, writer)
+        self.connections.add(connection)
+        try:
+            while True:
+                payload = await read_frame(reader)
+                if payload is None:
+                    break
+                try:
+                    message = decode_message(payload)
+                except (ValueError, IndexError, struct.error):
+                    # a malformed message is rejected, the framing is intact
+                    # so the connection stays open
+                    message = (REJECTED, message_id(payload))
+                await self.queue.put((connection, message))
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            self.connections.discard(connection)
+            writer.close()
+
+    async def _match(self):
+        queue = self.queue
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            for connection, message in batch:
+                self._handle(connection, message)
+
+            touched = list(self.touched)
+            self.touched.clear()
+            for connection in touched:
+                if not connection.output or connection.writer.is_closing():
+                    connection.output.clear()
+                    continue
+                try:
+                    connection.writer.write(connection.output)
+                    connection.output = bytearray()
+                    await connection.writer.drain()
+                except ConnectionError:
+                    # the client went away, its output is dropped and matching
+                    # goes on for the other connections
+                    connection.output.clear()
+                    connection.writer.close()
+
+    def _handle(self, connection: Connection, message: tuple):
+        self.touched.add(connection)
+        message_type = message[0]
+        if message_type == CANCEL:
+            order_id = message[1]
+            owner = self.owners.get(order_id)
+            if owner is None or owner[0] is not connection:
+                connection.output += encode_status(REJECTED, order_id)
+                return
+            del self.owners[order_id]
+            self.matching_engine.cancel_order(CancelOrderData(id=order_id))
+            connection.output += encode_status(CANCELLED, order_id)
+            return
+        if message_type != ADD:
+            connection.output += encode_status(REJECTED, message[1])
+            return
+
+        order = message[1]
+        if order.id in self.owners:
+            connection.output += encode_status(REJECTED, order.id)
+            return
+        self.owners[order.id] = (connection, order)
+        try:
+            order, trades = self.matching_engine.add_order(order)
+        except ValueError:
+            # e.g. a price off the tick grid of a ladder book, nothing matched
+            del self.owners[order.id]
+            connection.output += encode_status(REJECTED, order.id)
+            return
+        connection.output += encode_accepted(
+            order.id, order.remained_quantity + order.hidden_quantity
+        )
+        for trade in trades:
+            owner = self.owners.get(trade.order_id)
+            if owner is None:
+                continue
+            owner_connection, owner_order = owner
+            owner_connection.output += encode_trade(
+                owner_order, trade.price, trade.quantity
+            )
+            self.touched.add(owner_connection)
+        for trade in trades:
+            owner = self.owners.get(trade.order_id)
+            if owner is not None and owner[1].remained_quantity == 0:
+                del self.owners[trade.order_id]
+        self._drop_remainder(order)
+        triggered_stops: List[Order] = self.matching_engine.triggered_stops  # type: ignore
+        if triggered_stops:
+            for stop in triggered_stops:
+                self._drop_remainder(stop)
+            triggered_stops.clear()
+
+    def _drop_remainder(self, order: Order):
+        # the remainder of an immediate order, or of a triggered stop turned
+        # market order, is dropped, not rested, a pending stop waits for its
+        # trigger
+        if (
+            order.price_level is None
+            and order.remained_quantity > 0
+            and order.stop_price is None
+        ):
+            owner = self.owners.pop(order.id, None)
+            if owner is not None:
+                owner[0].output += encode_status(CANCELLED, order.id)
+                self.touched.add(owner[0])
+
+
+class GatewayClient:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect_tcp(cls, host: str, port: int) -> "GatewayClient":
+        return cls(*await asyncio.open_connection(host, port))
+
+    @classmethod
+    async def connect_unix(cls, path: str) -> "GatewayClient":
+        return cls(*await asyncio.open_unix_connection(path))
+
+    async def add_order(self, order: Order):
+        self.writer.write(encode_add(order))
+        await self.writer.drain()
+
+    async def cancel_order(self, order_id: ID_TYPE):
+        self.writer.write(encode_cancel(order_id))
+        await self.writer.drain()
+
+    async def read_message(self) -> Optional[tuple]:
+        payload = await read_frame(self.reader)
+        if payload is None:
+            return None
+        return decode_message(payload)
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+async def run_load(
+    client: GatewayClient,
+    count: int,
+    window: int = 100,
+    seed: int = 1,
+) -> LatencyHistogram:
+    # Sends `count` random orders keeping at most `window` of them unanswered,
+    # and records the time from sending an order to its ACCEPTED reply.
+
+    rnd = random.Random(seed)
+    histogram = LatencyHistogram()
+    sent: Dict[ID_TYPE, int] = {}
+    slots = asyncio.Semaphore(window)
+    prefix = f"load-{id(client)}"
+
+    async def receive():
+        received = 0
+        while received < count:
+            message = await client.read_message()
+            if message is None:
+                break
+            if message[0] in (ACCEPTED, REJECTED):
+                histogram.record(time.perf_counter_ns() - sent.pop(message[1]))
+                received += 1
+                slots.release()
+
+    receiver = asyncio.create_task(receive())
+    for index in range(count):
+        await slots.acquire()
+        order = Order(
+            price=100 + rnd.randint(-5, 5),
+            quantity=rnd.randint(1, 10),
+            side=SIDES[rnd.randrange(2)],
+            id=f"{prefix}-{index}",
+        )
+        sent[order.id] = time.perf_counter_ns()
+        await client.add_order(order)
+    await receiver
+    return histogram
+
+
+async def _serve_forever(args):
+    gateway = Gateway()
+    if args.unix:
+        await gateway.start_unix(args.unix)
+    else:
+        await gateway.start_tcp(args.host, args.port)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await gateway.close()
+
+
+async def _load(args):
+    if args.unix:
+        client = await GatewayClient.connect_unix(args.unix)
+    else:
+        client = await GatewayClient.connect_tcp(args.host, args.port)
+    start = time.perf_counter()
+    histogram = await run_load(client, args.count, args.window)
+    elapsed = time.perf_counter() - start
+    await client.close()
+    print(f"orders: {histogram.count}, {histogram.count / elapsed:.0f} orders/s")
+    print(
+        "latency (us): "
+        f"p50 {histogram.percentile(50) / 1000:.1f} "
+        f"p99 {histogram.percentile(99) / 1000:.1f} "
+        f"p99.9 {histogram.percentile(99.9) / 1000:.1f} "
+        f"max {histogram.max / 1000:.1f}"
+    )
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Order gateway")
+    parser.add_argument("command", choices=["serve", "load"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7001)
+    parser.add_argument("--unix", help="Unix socket path instead of TCP")
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--window", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        asyncio.run(_serve_forever(args))
+    else:
+        asyncio.run(_load(args))
+
+
+if __name__ == "__main__":
+    main()
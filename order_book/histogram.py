@@ -0,0 +1,90 @@
+from typing import Dict, List
+
+
+class LatencyHistogram:
+    # Log-linear buckets in the spirit of HdrHistogram: values below
+    # 2 ** precision_bits are exact, larger values keep precision_bits - 1
+    # significant bits. Memory does not depend on the number of samples.
+    def __init__(self, precision_bits: int = 7, max_bits: int = 48):
+        self.precision_bits = precision_bits
+        self.sub_buckets = 1 << precision_bits
+        self.half_sub_buckets = self.sub_buckets >> 1
+        self.max_value = (1 << max_bits) - 1
+        self.counts: List[int] = [0] * self._index(self.max_value) + [0]
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        if value < self.sub_buckets:
+            return value
+        shift = value.bit_length() - self.precision_bits
+        return (
+            self.sub_buckets
+            + (shift - 1) * self.half_sub_buckets
+            + (value >> shift)
+            - self.half_sub_buckets
+        )
+
+    def _value(self, index: int) -> int:
+        if index < self.sub_buckets:
+            return index
+        shift, sub = divmod(index - self.sub_buckets, self.half_sub_buckets)
+        shift += 1
+        low = (sub + self.half_sub_buckets) << shift
+        return low + (1 << shift) // 2
+
+    def record(self, value: int):
+        if value < 0:
+            value = 0
+        elif value > self.max_value:
+            value = self.max_value
+        self.counts[self._index(value)] += 1
+        if self.count == 0 or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += 1
+        self.total += value
+
+    def merge(self, other: "LatencyHistogram"):
+        if other.count == 0:
+            return
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.min = other.min if self.count == 0 else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.count += other.count
+        self.total += other.total
+
+    def reset(self):
+        self.counts = [0] * len(self.counts)
+        self.count = self.total = self.min = self.max = 0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent: float) -> int:
+        if self.count == 0:
+            return 0
+        rank = max(1, round(self.count * percent / 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(max(self._value(index), self.min), self.max)
+        return self.max
+
+    def summary(self, percents=(50, 99, 99.9)) -> Dict[str, float]:
+        result: Dict[str, float] = {
+            "count": self.count,
+            "min": self.min,
+            "mean": self.mean,
+            "max": self.max,
+        }
+        for percent in percents:
+            result[f"p{percent:g}"] = self.percentile(percent)
+        return result
@@ -0,0 +1,296 @@
+import os
+import struct
+import time
+import zlib
+from typing import Callable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from order_book import (
+    ID_TYPE,
+    CancelOrderData,
+    MatchingEngine,
+    ModifyOrderData,
+    Order,
+    OrderType,
+)
+from order_book.codec import (
+    DISPLAY_FLAG,
+    ORDER_TYPE_CODES,
+    ORDER_TYPES,
+    SIDE_CODES,
+    SIDE_MASK,
+    SIDES,
+    decode_id,
+    decode_number,
+    encode_id,
+    encode_number,
+)
+from order_book.snapshot import read_snapshot, write_snapshot
+
+# Every record is framed as: payload length (u32), crc32 of the payload (u32),
+# payload. Payload: record type (u8), sequence (u64), then
+#   ADD     side and order type (u8, type in the high nibble),
+#           order id generator count (u64), price, quantity, id, then the
+#           stop price of stop orders and the display quantity of iceberg
+#           orders (DISPLAY_FLAG)
+#   CANCEL  id
+#   MODIFY  fields (u8, 1 price, 2 quantity), id, then the price and/or quantity
+# A torn or corrupt record ends the journal, everything after it is dropped.
+
+ADD = 1
+CANCEL = 2
+MODIFY = 3
+
+MODIFY_PRICE = 1
+MODIFY_QUANTITY = 2
+
+FRAME = struct.Struct("<II")
+RECORD_HEADER = struct.Struct("<BQ")
+ADD_HEADER = struct.Struct("<BQ")
+MODIFY_FIELDS = struct.Struct("<B")
+
+
+class JournalRecord(NamedTuple):
+    sequence: int
+    message: Union[Order, CancelOrderData, ModifyOrderData]
+    id_count: int
+
+
+class Journal:
+    # Records are buffered and written with one write and one fsync per group,
+    # a group is committed when it holds batch_size records or when an append
+    # happens commit_interval seconds after the last commit. Callers acknowledge
+    # a message once committed_sequence reaches its sequence.
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 1,
+        commit_interval: Optional[float] = None,
+        fsync: bool = True,
+        sequence: int = 0,
+    ):
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        self.path = path
+        self.batch_size = batch_size
+        self.commit_interval = commit_interval
+        self.fsync = fsync
+        # the handle lives as long as the journal, see close() and __exit__
+        self.file = open(path, "ab")  # noqa: SIM115
+
+        self.sequence = sequence
+        self.committed_sequence = sequence
+        self.commits = 0
+        self.buffer = bytearray()
+        self.pending = 0
+        self.last_commit = time.monotonic()
+        self.commit_listeners: List[Callable[[int], None]] = []
+
+    def append_add(self, order: Order) -> int:
+        payload = bytearray(RECORD_HEADER.pack(ADD, self.sequence + 1))
+        flags = SIDE_CODES[order.side] | ORDER_TYPE_CODES[order.order_type] << 4
+        if order.display_quantity is not None:
+            flags |= DISPLAY_FLAG
+        payload += ADD_HEADER.pack(flags, Order.ID_GENERATOR.count)
+        encode_number(payload, order.price)
+        encode_number(payload, order.quantity)
+        encode_id(payload, order.id)
+        if order.stop_price is not None:
+            encode_number(payload, order.stop_price)
+        if order.display_quantity is not None:
+            encode_number(payload, order.display_quantity)
+        return self._append(payload)
+
+    def append_cancel(self, order_id: ID_TYPE) -> int:
+        payload = bytearray(RECORD_HEADER.pack(CANCEL, self.sequence + 1))
+        encode_id(payload, order_id)
+        return self._append(payload)
+
+    def append_modify(self, modify: ModifyOrderData) -> int:
+        fields = 0
+        if modify.price is not None:
+            fields |= MODIFY_PRICE
+        if modify.quantity is not None:
+            fields |= MODIFY_QUANTITY
+        payload = bytearray(RECORD_HEADER.pack(MODIFY, self.sequence + 1))
+        payload += MODIFY_FIELDS.pack(fields)
+        encode_id(payload, modify.id)
+        if modify.price is not None:
+            encode_number(payload, modify.price)
+        if modify.quantity is not None:
+            encode_number(payload, modify.quantity)
+        return self._append(payload)
+
+    def _append(self, payload: bytearray) -> int:
+        self.sequence += 1
+        self.buffer += FRAME.pack(len(payload), zlib.crc32(payload))
+        self.buffer += payload
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.commit()
+        else:
+            self.poll()
+        return self.sequence
+
+    def poll(self):
+        # commits a group whose time window has passed, call it when idle
+        if (
+            self.pending
+            and self.commit_interval is not None
+            and time.monotonic() - self.last_commit >= self.commit_interval
+        ):
+            self.commit()
+
+    def commit(self):
+        if self.pending:
+            self.file.write(self.buffer)
+            self.file.flush()
+            if self.fsync:
+                os.fsync(self.file.fileno())
+            self.buffer = bytearray()
+            self.pending = 0
+            self.commits += 1
+        self.last_commit = time.monotonic()
+        if self.committed_sequence != self.sequence:
+            self.committed_sequence = self.sequence
+            for listener in self.commit_listeners:
+                listener(self.sequence)
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.commit()
+        self.file.close()
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _decode_record(payload: bytes) -> JournalRecord:
+    record_type, sequence = RECORD_HEADER.unpack_from(payload, 0)
+    offset = RECORD_HEADER.size
+    if record_type == CANCEL:
+        order_id, offset = decode_id(payload, offset)
+        return JournalRecord(sequence, CancelOrderData(id=order_id), 0)
+    if record_type == MODIFY:
+        (fields,) = MODIFY_FIELDS.unpack_from(payload, offset)
+        order_id, offset = decode_id(payload, offset + MODIFY_FIELDS.size)
+        price = quantity = None
+        if fields & MODIFY_PRICE:
+            price, offset = decode_number(payload, offset)
+        if fields & MODIFY_QUANTITY:
+            quantity, offset = decode_number(payload, offset)
+        modify = ModifyOrderData(id=order_id, price=price, quantity=quantity)
+        return JournalRecord(sequence, modify, 0)
+    if record_type != ADD:
+        raise ValueError(f"unknown journal record type {record_type}")
+
+    flags, id_count = ADD_HEADER.unpack_from(payload, offset)
+    offset += ADD_HEADER.size
+    price, offset = decode_number(payload, offset)
+    quantity, offset = decode_number(payload, offset)
+    order_id, offset = decode_id(payload, offset)
+    order_type = ORDER_TYPES[flags >> 4]
+    stop_price = None
+    if order_type is OrderType.STOP or order_type is OrderType.STOP_LIMIT:
+        stop_price, offset = decode_number(payload, offset)
+    display_quantity = None
+    if flags & DISPLAY_FLAG:
+        display_quantity, offset = decode_number(payload, offset)
+    order = Order(
+        price=price,
+        quantity=quantity,
+        side=SIDES[flags & SIDE_MASK],
+        id=order_id,
+        order_type=order_type,
+        stop_price=stop_price,
+        display_quantity=display_quantity,
+    )
+    return JournalRecord(sequence, order, id_count)
+
+
+def read_journal(path: str) -> Iterator[Tuple[JournalRecord, int]]:
+    # yields records with the file offset right after each of them
+    with open(path, "rb") as file:
+        data = file.read()
+    offset = 0
+    while offset + FRAME.size <= len(data):
+        size, checksum = FRAME.unpack_from(data, offset)
+        start = offset + FRAME.size
+        payload = data[start : start + size]
+        if len(payload) < size or zlib.crc32(payload) != checksum:
+            return
+        offset = start + size
+        yield _decode_record(payload), offset
+
+
+def recover(
+    snapshot_path: str,
+    journal_path: str,
+    matching_engine: Optional[MatchingEngine] = None,
+) -> Tuple[MatchingEngine, int]:
+    # Loads the latest snapshot if there is one and replays the journal records
+    # written after it. A torn tail is truncated so the journal can be reopened
+    # for appends. Returns the engine and the last sequence.
+    sequence = 0
+    if os.path.exists(snapshot_path):
+        matching_engine, sequence = read_snapshot(snapshot_path, matching_engine)
+    matching_engine = matching_engine or MatchingEngine()
+
+    if not os.path.exists(journal_path):
+        return matching_engine, sequence
+
+    valid_size = 0
+    for record, valid_size in read_journal(journal_path):
+        if record.sequence <= sequence:
+            continue
+        sequence = record.sequence
+        message = record.message
+        try:
+            if isinstance(message, CancelOrderData):
+                matching_engine.cancel_order(message)
+            elif isinstance(message, ModifyOrderData):
+                matching_engine.modify_order(message)
+            else:
+                if record.id_count > Order.ID_GENERATOR.count:
+                    Order.ID_GENERATOR.count = record.id_count
+                matching_engine.add_order(message)
+        except ValueError:
+            # journaled before the engine rejected it live, a rejected message
+            # leaves the engine as it was
+            continue
+
+    if os.path.getsize(journal_path) > valid_size:
+        with open(journal_path, "r+b") as file:
+            file.truncate(valid_size)
+
+    return matching_engine, sequence
+
+
+class JournaledMatchingEngine:
+    # Journals every add/cancel/modify before it is applied to the engine. The
+    # messages the engine rejects are journaled too, recover() skips them.
+    def __init__(self, matching_engine: MatchingEngine, journal: Journal):
+        self.matching_engine = matching_engine
+        self.journal = journal
+
+    def add_order(self, order: Order) -> Tuple[Order, list]:
+        self.journal.append_add(order)
+        return self.matching_engine.add_order(order)
+
+    def cancel_order(self, order: Union[Order, CancelOrderData]):
+        self.journal.append_cancel(order.id)
+        self.matching_engine.cancel_order(order)
+
+    def modify_order(self, modify: ModifyOrderData) -> Tuple[Optional[Order], list]:
+        self.journal.append_modify(modify)
+        return self.matching_engine.modify_order(modify)
+
+    def checkpoint(self, snapshot_path: str):
+        self.journal.commit()
+        write_snapshot(self.matching_engine, snapshot_path, self.journal.sequence)
+
+    def close(self):
+        self.journal.close()
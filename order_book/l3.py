@@ -0,0 +1,202 @@
+import struct
+from typing import Callable, Dict, Iterator, List, NamedTuple, Tuple
+
+from order_book import ID_TYPE, Order, OrderBook, OrderListener, SideType
+from order_book.codec import SIDE_CODES, SIDES
+
+# Record: action (u8), side (u8), sequence (u64), price (f64), quantity (f64),
+# id kind (u8), then an i64 id or a u16 length and the utf-8 id.
+#   ADD      quantity is the resting quantity, also sent when an iceberg
+#            order filled to zero shows a new slice at the tail of its level
+#   FILL     quantity is the filled amount, the order leaves at zero
+#   CANCEL   quantity is the cancelled remainder
+#   REQUEUE  quantity is the remainder put back at the head of its level
+#   REDUCE   quantity is the amount removed by an amend, the order keeps its
+#            place in the queue
+
+ADD = 1
+FILL = 2
+CANCEL = 3
+REQUEUE = 4
+REDUCE = 5
+
+RECORD = struct.Struct("<BBQddB")
+INT_ID = struct.Struct("<q")
+STR_ID_SIZE = struct.Struct("<H")
+INT_ID_KIND = 0
+STR_ID_KIND = 1
+
+MAX_RECORD_SIZE = RECORD.size + STR_ID_SIZE.size + 0xFFFF
+
+
+class L3Event(NamedTuple):
+    action: int
+    sequence: int
+    side: SideType
+    order_id: ID_TYPE
+    price: float
+    quantity: float
+
+
+class L3RecordWriter(OrderListener):
+    # Packs events straight into a preallocated buffer with pack_into, nothing
+    # is allocated per event for int order ids. `on_flush` receives a
+    # memoryview of the filled part of the buffer, it is only valid during the
+    # call.
+    def __init__(
+        self,
+        order_book: OrderBook,
+        on_flush: Callable[[memoryview], None],
+        buffer_size: int = 1 << 16,
+    ):
+        self.order_book = order_book
+        self.on_flush = on_flush
+        self.buffer = bytearray(max(buffer_size, MAX_RECORD_SIZE))
+        self.view = memoryview(self.buffer)
+        self.offset = 0
+        self.sequence = 0
+        order_book.order_listeners.append(self)
+
+    def _write(self, action: int, order: Order, quantity: float):
+        if self.offset + MAX_RECORD_SIZE > len(self.buffer):
+            self.flush()
+        self.sequence += 1
+        order_id = order.id
+        offset = self.offset
+        if isinstance(order_id, int):
+            RECORD.pack_into(
+                self.buffer,
+                offset,
+                action,
+                SIDE_CODES[order.side],
+                self.sequence,
+                order.price,
+                quantity,
+                INT_ID_KIND,
+            )
+            offset += RECORD.size
+            INT_ID.pack_into(self.buffer, offset, order_id)
+            self.offset = offset + INT_ID.size
+            return
+
+        data = order_id.encode()
+        RECORD.pack_into(
+            self.buffer,
+            offset,
+            action,
+            SIDE_CODES[order.side],
+            self.sequence,
+            order.price,
+            quantity,
+            STR_ID_KIND,
+        )
+        offset += RECORD.size
+        STR_ID_SIZE.pack_into(self.buffer, offset, len(data))
+        offset += STR_ID_SIZE.size
+        self.buffer[offset : offset + len(data)] = data
+        self.offset = offset + len(data)
+
+    def on_order_add(self, order: Order):
+        self._write(ADD, order, order.remained_quantity)
+
+    def on_order_fill(self, order: Order, quantity: float):
+        self._write(FILL, order, quantity)
+
+    def on_order_cancel(self, order: Order):
+        self._write(CANCEL, order, order.remained_quantity)
+
+    def on_order_requeue(self, order: Order):
+        self._write(REQUEUE, order, order.remained_quantity)
+
+    def on_order_reduce(self, order: Order, quantity: float):
+        self._write(REDUCE, order, quantity)
+
+    def on_order_replenish(self, order: Order):
+        self._write(ADD, order, order.remained_quantity)
+
+    def flush(self):
+        if self.offset:
+            self.on_flush(self.view[: self.offset])
+            self.offset = 0
+
+    def close(self):
+        self.flush()
+        self.order_book.order_listeners.remove(self)
+
+
+def read_l3_records(data: bytes) -> Iterator[L3Event]:
+    offset = 0
+    while offset < len(data):
+        action, side_code, sequence, price, quantity, id_kind = RECORD.unpack_from(
+            data, offset
+        )
+        offset += RECORD.size
+        order_id: ID_TYPE
+        if id_kind == INT_ID_KIND:
+            (order_id,) = INT_ID.unpack_from(data, offset)
+            offset += INT_ID.size
+        else:
+            (size,) = STR_ID_SIZE.unpack_from(data, offset)
+            offset += STR_ID_SIZE.size
+            order_id = bytes(data[offset : offset + size]).decode()
+            offset += size
+        yield L3Event(action, sequence, SIDES[side_code], order_id, price, quantity)
+
+
+class L3MirrorBook:
+    # Rebuilds the book from L3 events only, to verify a stream. Each level is
+    # an insertion ordered dict of order id to remained quantity.
+    def __init__(self):
+        self.levels: Dict[SideType, Dict[float, Dict[ID_TYPE, float]]] = {
+            SideType.BUY: {},
+            SideType.SELL: {},
+        }
+        self.orders: Dict[ID_TYPE, Tuple[SideType, float]] = {}
+        self.sequence = 0
+
+    def apply(self, event: L3Event):
+        if event.sequence != self.sequence + 1:
+            raise ValueError(
+                f"expected sequence {self.sequence + 1}, got {event.sequence}"
+            )
+        self.sequence = event.sequence
+        levels = self.levels[event.side]
+
+        if event.action == ADD:
+            levels.setdefault(event.price, {})[event.order_id] = event.quantity
+            self.orders[event.order_id] = (event.side, event.price)
+            return
+
+        queue = levels[event.price]
+        if event.action == FILL:
+            queue[event.order_id] -= event.quantity
+            if queue[event.order_id] == 0:
+                self._remove(levels, queue, event)
+        elif event.action == CANCEL:
+            self._remove(levels, queue, event)
+        elif event.action == REDUCE:
+            queue[event.order_id] -= event.quantity
+        elif event.action == REQUEUE:
+            # the order never left the head of the mirrored queue
+            if queue[event.order_id] != event.quantity:
+                raise ValueError(f"requeued quantity mismatch for {event.order_id}")
+        else:
+            raise ValueError(f"unknown L3 action {event.action}")
+
+    def _remove(self, levels, queue, event: L3Event):
+        del queue[event.order_id]
+        del self.orders[event.order_id]
+        if not queue:
+            del levels[event.price]
+
+    def price_levels(self, side: SideType) -> List[Tuple[float, float, List[ID_TYPE]]]:
+        # best first: price, total quantity, order ids in queue order
+        prices = sorted(self.levels[side], reverse=side == SideType.BUY)
+        return [
+            (
+                price,
+                sum(self.levels[side][price].values()),
+                list(self.levels[side][price]),
+            )
+            for price in prices
+        ]
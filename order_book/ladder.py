@@ -0,0 +1,144 @@
+from typing import TYPE_CHECKING, Generator, List, Optional
+
+from order_book import Order, OrderBook, PriceLevel, SideType
+
+if TYPE_CHECKING:
+    from order_book.pool import BookPool
+
+
+class PriceLadderOrderBook(OrderBook):
+    # Price levels are stored in preallocated arrays indexed by the tick offset
+    # from min_price, the best price of each side is tracked by a cursor index.
+    def __init__(
+        self,
+        min_price: float,
+        max_price: float,
+        tick_size: float,
+        pool: Optional["BookPool"] = None,
+    ):
+        super().__init__(pool)
+        if tick_size <= 0:
+            raise ValueError("tick_size must be positive")
+        if max_price < min_price:
+            raise ValueError("max_price must not be less than min_price")
+
+        self.min_price = min_price
+        self.max_price = max_price
+        self.tick_size = tick_size
+        self.size = round((max_price - min_price) / tick_size) + 1
+
+        self.bid_levels: List[Optional[PriceLevel]] = [None] * self.size
+        self.ask_levels: List[Optional[PriceLevel]] = [None] * self.size
+        self.best_bid_index = -1
+        self.best_ask_index = self.size
+
+    def price_to_index(self, price: float) -> int:
+        offset = (price - self.min_price) / self.tick_size
+        index = round(offset)
+        if abs(offset - index) > 1e-9:
+            raise ValueError(f"price {price} is not a multiple of the tick size")
+        if index < 0 or index >= self.size:
+            raise ValueError(f"price {price} is out of the price band")
+        return index
+
+    def validate_price(self, price: float):
+        self.price_to_index(price)
+
+    def index_to_price(self, index: int) -> float:
+        return self.min_price + index * self.tick_size
+
+    def add_order(self, order: Order):
+        index = self.price_to_index(order.price)
+        if order.side == SideType.BUY:
+            price_level = self.bid_levels[index]
+            if price_level is None:
+                price_level = self._new_price_level(order.price)
+                self.bid_levels[index] = price_level
+                if index > self.best_bid_index:
+                    self.best_bid_index = index
+                    self.best_bid_price_level = price_level
+                    self.best_bid_price = order.price
+        else:  # order.side == SideType.SELL
+            price_level = self.ask_levels[index]
+            if price_level is None:
+                price_level = self._new_price_level(order.price)
+                self.ask_levels[index] = price_level
+                if index < self.best_ask_index:
+                    self.best_ask_index = index
+                    self.best_ask_price_level = price_level
+                    self.best_ask_price = order.price
+        price_level.add_order(order)
+        if self.level_listeners:
+            self._level_updated(order.side, price_level)
+        if self.order_listeners:
+            for listener in self.order_listeners:
+                listener.on_order_add(order)
+
+    def load_price_levels(self, side: SideType, price_levels: List[PriceLevel]):
+        levels = self.bid_levels if side == SideType.BUY else self.ask_levels
+        for price_level in price_levels:
+            levels[self.price_to_index(price_level.price)] = price_level
+            if self.level_listeners:
+                self._level_updated(side, price_level)
+        self._levels_loaded(price_levels)
+        if not price_levels:
+            return
+        if side == SideType.BUY:
+            self._move_best_bid(self.price_to_index(price_levels[-1].price))
+        else:
+            self._move_best_ask(self.price_to_index(price_levels[0].price))
+
+    def is_empty_bids(self) -> bool:
+        return self.best_bid_price_level is None
+
+    def is_empty_asks(self) -> bool:
+        return self.best_ask_price_level is None
+
+    def best_price_levels(self, side: SideType) -> Generator[PriceLevel, None, None]:
+        if side == SideType.SELL:
+            levels = self.ask_levels
+            for index in range(self.best_ask_index, self.size):
+                price_level = levels[index]
+                if price_level is not None:
+                    yield price_level
+        else:  # side == SideType.BUY
+            levels = self.bid_levels
+            for index in range(self.best_bid_index, -1, -1):
+                price_level = levels[index]
+                if price_level is not None:
+                    yield price_level
+
+    def _remove_price_level(self, side: SideType, price_level: PriceLevel):
+        index = self.price_to_index(price_level.price)
+        if side == SideType.BUY:
+            if self.bid_levels[index] is not price_level:
+                return
+            self.bid_levels[index] = None
+            if index == self.best_bid_index:
+                self._move_best_bid(index - 1)
+        else:
+            if self.ask_levels[index] is not price_level:
+                return
+            self.ask_levels[index] = None
+            if index == self.best_ask_index:
+                self._move_best_ask(index + 1)
+        if self.level_listeners:
+            self._level_removed(side, price_level)
+        if self.metrics is not None:
+            self.metrics.level_removed(price_level)
+        if self.pool is not None:
+            self.pool.release_level(price_level)
+
+    def _move_best_bid(self, index: int):
+        levels = self.bid_levels
+        while index >= 0 and levels[index] is None:
+            index -= 1
+        self.best_bid_index = index
+        self._set_best_bid(levels[index] if index >= 0 else None)
+
+    def _move_best_ask(self, index: int):
+        levels = self.ask_levels
+        while index < self.size and levels[index] is None:
+            index += 1
+        self.best_ask_index = index
+        self._set_best_ask(levels[index] if index < self.size else None)
@@ -0,0 +1,135 @@
+from bisect import bisect_left
+from enum import Enum
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from order_book import LevelListener, OrderBook, PriceLevel, SideType
+
+
+class L2Action(Enum):
+    ADD = "ADD"
+    CHANGE = "CHANGE"
+    DELETE = "DELETE"
+
+
+class L2Update(NamedTuple):
+    action: L2Action
+    side: SideType
+    price: float
+    quantity: float
+
+
+class DepthView:
+    # Top `depth` levels of one side, best first, updated from L2 updates.
+    def __init__(self, order_book: OrderBook, side: SideType, depth: int):
+        self.order_book = order_book
+        self.side = side
+        self.depth = depth
+        # sort keys ascend from the best price, bids are stored negated
+        self.keys: List[float] = []
+        self.quantities: List[float] = []
+
+    def _key(self, price: float) -> float:
+        return -price if self.side == SideType.BUY else price
+
+    def levels(self) -> List[Tuple[float, float]]:
+        return [
+            (self._key(key), quantity)
+            for key, quantity in zip(self.keys, self.quantities)
+        ]
+
+    def apply(self, update: L2Update) -> bool:
+        # returns False when a level inside the view was deleted, the view then
+        # has to be refilled from the book with rebuild()
+        key = self._key(update.price)
+        index = bisect_left(self.keys, key)
+        found = index < len(self.keys) and self.keys[index] == key
+
+        if update.action == L2Action.DELETE:
+            if found:
+                del self.keys[index]
+                del self.quantities[index]
+                return False
+            return True
+
+        if found:
+            self.quantities[index] = update.quantity
+        elif index < self.depth:
+            self.keys.insert(index, key)
+            self.quantities.insert(index, update.quantity)
+            if len(self.keys) > self.depth:
+                self.keys.pop()
+                self.quantities.pop()
+        return True
+
+    def rebuild(self):
+        # only the first `depth` levels of the book are visited
+        self.keys = []
+        self.quantities = []
+        for price_level in self.order_book.best_price_levels(self.side):
+            if price_level.has_no_orders():
+                continue
+            self.keys.append(self._key(price_level.price))
+            self.quantities.append(price_level.total_quantity)
+            if len(self.keys) == self.depth:
+                return
+
+
+class L2Feed(LevelListener):
+    # Collects the levels changed by the book and turns them into level add,
+    # change and delete updates on flush(), in O(changed levels).
+    def __init__(self, order_book: OrderBook, depth: int = 10):
+        self.order_book = order_book
+        self.published: Dict[SideType, Dict[float, float]] = {
+            SideType.BUY: {},
+            SideType.SELL: {},
+        }
+        self.dirty: Dict[Tuple[SideType, float], Optional[PriceLevel]] = {}
+        self.depth_views = {
+            SideType.BUY: DepthView(order_book, SideType.BUY, depth),
+            SideType.SELL: DepthView(order_book, SideType.SELL, depth),
+        }
+        order_book.level_listeners.append(self)
+        for side in (SideType.BUY, SideType.SELL):
+            for price_level in order_book.best_price_levels(side):
+                self.on_level_update(side, price_level)
+
+    def on_level_update(self, side: SideType, price_level: PriceLevel):
+        self.dirty[(side, price_level.price)] = price_level
+
+    def on_level_remove(self, side: SideType, price_level: PriceLevel):
+        self.dirty[(side, price_level.price)] = None
+
+    def flush(self) -> List[L2Update]:
+        updates: List[L2Update] = []
+        for (side, price), price_level in self.dirty.items():
+            published = self.published[side]
+            old_quantity = published.get(price)
+            if price_level is None or price_level.has_no_orders():
+                if old_quantity is not None:
+                    del published[price]
+                    updates.append(L2Update(L2Action.DELETE, side, price, 0))
+                continue
+
+            quantity = price_level.total_quantity
+            if old_quantity is None:
+                updates.append(L2Update(L2Action.ADD, side, price, quantity))
+            elif old_quantity != quantity:
+                updates.append(L2Update(L2Action.CHANGE, side, price, quantity))
+            else:
+                continue
+            published[price] = quantity
+        self.dirty.clear()
+
+        stale = set()
+        for update in updates:
+            if not self.depth_views[update.side].apply(update):
+                stale.add(update.side)
+        for side in stale:
+            self.depth_views[side].rebuild()
+        return updates
+
+    def depth(self, side: SideType) -> List[Tuple[float, float]]:
+        return self.depth_views[side].levels()
+
+    def close(self):
+        self.order_book.level_listeners.remove(self)
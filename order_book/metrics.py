@@ -0,0 +1,112 @@
+import json
+import time
+from typing import Callable, Dict, Optional, TextIO
+
+from order_book import Order, OrderBook, OrderListener, PriceLevel
+from order_book.histogram import LatencyHistogram
+
+COUNTERS = (
+    "orders",
+    "cancels",
+    "modifies",
+    "fills",
+    "rested",
+    "levels_created",
+    "levels_removed",
+)
+HISTOGRAMS = ("add_order", "cancel_order", "modify_order", "match_depth", "tree_insert")
+
+
+class EngineMetrics(OrderListener):
+    # Counters and histograms of a MatchingEngine, enabled by passing an
+    # instance as MatchingEngine(metrics=...). Latencies are in clock units
+    # (nanoseconds by default), match_depth is the number of resting orders
+    # filled by one incoming order. Read them with snapshot(), or give an
+    # output and interval and call poll() to dump one JSON line per interval.
+    def __init__(
+        self,
+        clock: Callable[[], int] = time.perf_counter_ns,
+        output: Optional[TextIO] = None,
+        interval: Optional[float] = None,
+    ):
+        self.clock = clock
+        self.output = output
+        self.interval = interval
+        self.last_dump = time.monotonic()
+
+        self.orders = 0
+        self.cancels = 0
+        self.modifies = 0
+        self.fills = 0
+        self.rested = 0
+        self.levels_created = 0
+        self.levels_removed = 0
+        self.histograms = {name: LatencyHistogram() for name in HISTOGRAMS}
+
+    def attach(self, order_book: OrderBook):
+        order_book.metrics = self
+        order_book.order_listeners.append(self)
+
+    def detach(self, order_book: OrderBook):
+        if order_book.metrics is self:
+            order_book.metrics = None
+        order_book.order_listeners.remove(self)
+
+    def on_order_add(self, order: Order):
+        self.rested += 1
+
+    def on_order_fill(self, order: Order, quantity: float):
+        self.fills += 1
+
+    def level_created(self, price_level: PriceLevel):
+        self.levels_created += 1
+
+    def level_removed(self, price_level: PriceLevel):
+        self.levels_removed += 1
+
+    def record_add(self, elapsed: int, fills: int):
+        self.orders += 1
+        self.histograms["add_order"].record(elapsed)
+        if fills:
+            self.histograms["match_depth"].record(fills)
+
+    def record_cancel(self, elapsed: int):
+        self.cancels += 1
+        self.histograms["cancel_order"].record(elapsed)
+
+    def record_modify(self, elapsed: int, fills: int):
+        self.modifies += 1
+        self.histograms["modify_order"].record(elapsed)
+        if fills:
+            self.histograms["match_depth"].record(fills)
+
+    def record_tree_insert(self, elapsed: int):
+        self.histograms["tree_insert"].record(elapsed)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {
+            "counters": {name: getattr(self, name) for name in COUNTERS},
+            **{
+                name: histogram.summary() for name, histogram in self.histograms.items()
+            },
+        }
+
+    def reset(self):
+        for name in COUNTERS:
+            setattr(self, name, 0)
+        for histogram in self.histograms.values():
+            histogram.reset()
+
+    def dump(self, output: TextIO):
+        output.write(json.dumps(self.snapshot()) + "\n")
+        output.flush()
+
+    def poll(self):
+        # dumps to output once the interval has passed, call it when idle too
+        if (
+            self.output is not None
+            and self.interval is not None
+            and time.monotonic() - self.last_dump >= self.interval
+        ):
+            self.last_dump = time.monotonic()
+            self.dump(self.output)
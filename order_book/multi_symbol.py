@@ -0,0 +1,259 @@
+import multiprocessing
+import queue
+import zlib
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from order_book import (
+    ID_TYPE,
+    CancelOrderData,
+    MatchingEngine,
+    ModifyOrderData,
+    Order,
+    SideType,
+)
+
+EngineFactory = Callable[[], MatchingEngine]
+
+ADD = 0
+CANCEL = 1
+MODIFY = 2
+
+
+class MultiSymbolMatchingEngine:
+    # Routes orders to one MatchingEngine per symbol, engines are created on
+    # the first order of a symbol.
+    def __init__(self, engine_factory: EngineFactory = MatchingEngine):
+        self.engine_factory = engine_factory
+        self.engines: Dict[str, MatchingEngine] = {}
+
+    def engine(self, symbol: Optional[str]) -> MatchingEngine:
+        if symbol is None:
+            raise ValueError("order has no symbol")
+        matching_engine = self.engines.get(symbol)
+        if matching_engine is None:
+            matching_engine = self.engines[symbol] = self.engine_factory()
+        return matching_engine
+
+    def add_order(self, order: Order) -> Tuple[Order, list]:
+        return self.engine(order.symbol).add_order(order)
+
+    def cancel_order(self, order: Union[Order, CancelOrderData]):
+        matching_engine = self.engines.get(order.symbol)  # type: ignore
+        if matching_engine is not None:
+            matching_engine.cancel_order(order)
+
+    def modify_order(self, modify: ModifyOrderData) -> Tuple[Optional[Order], list]:
+        matching_engine = self.engines.get(modify.symbol)  # type: ignore
+        if matching_engine is None:
+            return None, []
+        return matching_engine.modify_order(modify)
+
+
+class TradeData(NamedTuple):
+    order_id: ID_TYPE
+    side: SideType
+    price: float
+    quantity: float
+
+
+class ShardResult(NamedTuple):
+    sequence: int
+    symbol: str
+    order_id: ID_TYPE
+    # None for cancels and for modifies of unknown orders
+    remained_quantity: Optional[float]
+    trades: List[TradeData]
+    # set when the engine rejected the message, which then changed nothing
+    error: Optional[str] = None
+
+
+def shard_index(symbol: str, shards: int) -> int:
+    # stable across processes, unlike hash()
+    return zlib.crc32(symbol.encode()) % shards
+
+
+def _handle_message(
+    matching_engine: MultiSymbolMatchingEngine, message: tuple
+) -> ShardResult:
+    if message[0] == ADD:
+        (
+            _,
+            sequence,
+            symbol,
+            order_id,
+            side,
+            price,
+            quantity,
+            order_type,
+            stop_price,
+            display_quantity,
+        ) = message
+        order, trades = matching_engine.add_order(
+            Order(
+                price,
+                quantity,
+                side,
+                id=order_id,
+                symbol=symbol,
+                order_type=order_type,
+                stop_price=stop_price,
+                display_quantity=display_quantity,
+            )
+        )
+        remained_quantity: Optional[float] = order.remained_quantity
+    elif message[0] == MODIFY:
+        _, sequence, symbol, order_id, price, quantity = message
+        modified, trades = matching_engine.modify_order(
+            ModifyOrderData(order_id, price, quantity, symbol)
+        )
+        remained_quantity = None if modified is None else modified.remained_quantity
+    else:
+        _, sequence, symbol, order_id = message
+        matching_engine.cancel_order(CancelOrderData(order_id, symbol))
+        remained_quantity, trades = None, []
+    return ShardResult(
+        sequence,
+        symbol,
+        order_id,
+        remained_quantity,
+        [TradeData(t.order_id, t.side, t.price, t.quantity) for t in trades],
+    )
+
+
+def _run_shard(requests, responses, engine_factory: EngineFactory):
+    matching_engine = MultiSymbolMatchingEngine(engine_factory)
+    while True:
+        batch = requests.get()
+        if batch is None:
+            break
+        results = []
+        for message in batch:
+            try:
+                results.append(_handle_message(matching_engine, message))
+            except ValueError as error:
+                # every message starts with its type, sequence, symbol and id
+                _, sequence, symbol, order_id = message[:4]
+                results.append(
+                    ShardResult(sequence, symbol, order_id, None, [], str(error))
+                )
+        responses.put(results)
+
+
+class ShardedMatchingEngine:
+    # Symbols are assigned to worker processes by a stable hash. Messages are
+    # buffered per shard and sent as one batch per send()/flush(); each shard
+    # handles its batches in order, so the order of messages of a symbol is
+    # preserved.
+    def __init__(
+        self,
+        processes: int,
+        engine_factory: EngineFactory = MatchingEngine,
+        context: Optional[str] = None,
+    ):
+        if processes <= 0:
+            raise ValueError("processes must be positive")
+        mp_context = multiprocessing.get_context(context)
+        self.processes = processes
+        self.requests = [mp_context.Queue() for _ in range(processes)]
+        self.responses = [mp_context.Queue() for _ in range(processes)]
+        self.workers = [
+            mp_context.Process(  # type: ignore
+                target=_run_shard,
+                args=(self.requests[index], self.responses[index], engine_factory),
+                daemon=True,
+            )
+            for index in range(processes)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+        self.batches: List[list] = [[] for _ in range(processes)]
+        self.outstanding = [0] * processes
+        self.sequence = 0
+        # seconds collect() waits on a shard before checking that it is alive
+        self.poll_interval = 0.1
+
+    def submit(self, order: Union[Order, CancelOrderData, ModifyOrderData]) -> int:
+        if order.symbol is None:
+            raise ValueError("order has no symbol")
+        self.sequence += 1
+        batch = self.batches[shard_index(order.symbol, self.processes)]
+        if isinstance(order, CancelOrderData):
+            batch.append((CANCEL, self.sequence, order.symbol, order.id))
+        elif isinstance(order, ModifyOrderData):
+            batch.append(
+                (
+                    MODIFY,
+                    self.sequence,
+                    order.symbol,
+                    order.id,
+                    order.price,
+                    order.quantity,
+                )
+            )
+        else:
+            batch.append(
+                (
+                    ADD,
+                    self.sequence,
+                    order.symbol,
+                    order.id,
+                    order.side,
+                    order.price,
+                    order.quantity,
+                    order.order_type,
+                    order.stop_price,
+                    order.display_quantity,
+                )
+            )
+        return self.sequence
+
+    def send(self):
+        # sends the buffered batches without waiting for their results, so the
+        # caller can build the next batches while the shards work
+        for index, batch in enumerate(self.batches):
+            if batch:
+                self.requests[index].put(batch)
+                self.batches[index] = []
+                self.outstanding[index] += 1
+
+    def collect(self) -> List[ShardResult]:
+        # waits for every sent batch, results come back in submission order
+        results: List[ShardResult] = []
+        for index, outstanding in enumerate(self.outstanding):
+            for _ in range(outstanding):
+                results += self._get_response(index)
+            self.outstanding[index] = 0
+        results.sort(key=lambda result: result.sequence)
+        return results
+
+    def _get_response(self, index: int) -> List[ShardResult]:
+        # polls so a shard whose process died raises instead of blocking forever
+        responses = self.responses[index]
+        worker = self.workers[index]
+        while True:
+            # checked first, results put just before an exit are still read
+            alive = worker.is_alive()
+            try:
+                return responses.get(timeout=self.poll_interval)
+            except queue.Empty:
+                if not alive:
+                    raise RuntimeError(
+                        f"shard {index} exited with code {worker.exitcode}"
+                    ) from None
+
+    def flush(self) -> List[ShardResult]:
+        self.send()
+        return self.collect()
+
+    def close(self):
+        for requests in self.requests:
+            requests.put(None)
+        for worker in self.workers:
+            worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,82 @@
+from typing import Dict, Generic, List, Optional, TypeVar
+
+from order_book import ID_TYPE, Order, PriceLevel
+from order_book.double_linked_list import LinkedNode
+
+T = TypeVar("T")
+
+
+class FreeList(Generic[T]):
+    # Bounded stack of released objects, objects released while it is full
+    # are left to the garbage collector.
+    __slots__ = ("capacity", "items", "hits", "misses", "dropped")
+
+    def __init__(self, capacity: int):
+        if capacity < 0:
+            raise ValueError("capacity must not be negative")
+        self.capacity = capacity
+        self.items: List[T] = []
+        self.hits = 0
+        self.misses = 0
+        self.dropped = 0
+
+    def take(self) -> Optional[T]:
+        if self.items:
+            self.hits += 1
+            return self.items.pop()
+        self.misses += 1
+        return None
+
+    def put(self, item: T):
+        if len(self.items) < self.capacity:
+            self.items.append(item)
+        else:
+            self.dropped += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "dropped": self.dropped,
+            "free": len(self.items),
+        }
+
+
+class BookPool:
+    # Recycles the price levels (with their order queues) removed from a book
+    # and the queue nodes of orders leaving a level, so prices flickering at
+    # the touch stop allocating. Pass one to OrderBook(pool=...).
+    def __init__(self, level_capacity: int = 1024, node_capacity: int = 65536):
+        self.levels: FreeList[PriceLevel] = FreeList(level_capacity)
+        self.nodes: FreeList[LinkedNode] = FreeList(node_capacity)
+
+    def new_level(self, price: float) -> PriceLevel:
+        price_level = self.levels.take()
+        if price_level is None:
+            price_level = PriceLevel(price)
+            price_level.pool = self
+        else:
+            price_level.price = price
+            price_level.total_quantity = 0
+        return price_level
+
+    def release_level(self, price_level: PriceLevel):
+        # the level must be empty and no longer referenced by the book
+        if price_level.pool is self:
+            self.levels.put(price_level)
+
+    def new_node(self, order_id: ID_TYPE, order: Order) -> LinkedNode:
+        node = self.nodes.take()
+        if node is None:
+            return LinkedNode(order_id, order)
+        node.key = order_id
+        node.value = order
+        return node
+
+    def release_node(self, node: LinkedNode):
+        # the node must be unlinked
+        node.key = node.value = None
+        self.nodes.put(node)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {"levels": self.levels.stats(), "nodes": self.nodes.stats()}
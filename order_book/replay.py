@@ -0,0 +1,190 @@
+import argparse
+import gzip
+import json
+import sys
+import time
+from typing import Iterable, Iterator, List, Optional, TextIO, Union
+
+from order_book import (
+    CancelOrderData,
+    MatchingEngine,
+    Order,
+    OrderType,
+    SideType,
+    Trade,
+)
+from order_book.histogram import LatencyHistogram
+
+# One JSON object per line:
+#   {"type": "add", "id": "o-1", "side": "BUY", "price": 100.5, "quantity": 2}
+#   {"type": "add", "side": "SELL", "price": 0, "quantity": 2, "order_type": "IOC"}
+#   {"type": "add", "side": "BUY", "price": 101, "quantity": 1,
+#    "order_type": "STOP_LIMIT", "stop_price": 100}
+#   {"type": "add", "side": "SELL", "price": 102, "quantity": 50,
+#    "display_quantity": 5}
+#   {"type": "cancel", "id": "o-1"}
+
+Message = Union[Order, CancelOrderData]
+
+
+def read_lines(path: str) -> Iterator[str]:
+    if path == "-":
+        yield from sys.stdin
+        return
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt") as file:  # type: ignore
+        yield from file
+
+
+def parse_messages(lines: Iterable[str]) -> Iterator[Message]:
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        data = json.loads(line)
+        message_type = data.get("type", "add")
+        if message_type == "add":
+            yield Order(
+                price=data["price"],
+                quantity=data["quantity"],
+                side=SideType(data["side"].upper()),
+                id=data.get("id"),
+                order_type=OrderType(data.get("order_type", "LIMIT").upper()),
+                stop_price=data.get("stop_price"),
+                display_quantity=data.get("display_quantity"),
+            )
+        elif message_type == "cancel":
+            yield CancelOrderData(id=data["id"])
+        else:
+            raise ValueError(f"line {line_number}: unknown message type {message_type}")
+
+
+def trade_to_json(trade: Trade) -> str:
+    return json.dumps(
+        {
+            "id": trade.id,
+            "order_id": trade.order_id,
+            "side": trade.side.value,
+            "price": trade.price,
+            "quantity": trade.quantity,
+        }
+    )
+
+
+class ReplayReport:
+    def __init__(self):
+        self.adds = 0
+        self.cancels = 0
+        self.trades = 0
+        self.elapsed = 0.0
+        self.latency = LatencyHistogram()
+
+    @property
+    def messages(self) -> int:
+        return self.adds + self.cancels
+
+    @property
+    def throughput(self) -> float:
+        return self.messages / self.elapsed if self.elapsed else 0.0
+
+    def format(self) -> str:
+        latency = self.latency
+        return "\n".join(
+            [
+                f"messages: {self.messages} (adds {self.adds}, cancels {self.cancels})",
+                f"trades: {self.trades}",
+                f"elapsed: {self.elapsed:.3f}s",
+                f"throughput: {self.throughput:.0f} msg/s",
+                " ".join(
+                    [
+                        "latency (ns):",
+                        f"p50 {latency.percentile(50)}",
+                        f"p99 {latency.percentile(99)}",
+                        f"p99.9 {latency.percentile(99.9)}",
+                        f"max {latency.max}",
+                    ]
+                ),
+            ]
+        )
+
+
+def replay(
+    messages: Iterable[Message],
+    matching_engine: Optional[MatchingEngine] = None,
+    trades_output: Optional[TextIO] = None,
+    batch_size: int = 1,
+) -> ReplayReport:
+    # Messages go through MatchingEngine.add_orders batch_size at a time, so
+    # attached metrics and views see them like any other batch. Latency is
+    # recorded per batch, per message with the default size of 1.
+    if batch_size <= 0:
+        raise ValueError("batch_size must be positive")
+    matching_engine = matching_engine or MatchingEngine()
+    report = ReplayReport()
+    record = report.latency.record
+    add_orders = matching_engine.add_orders
+    clock = time.perf_counter_ns
+    trades: List[Trade] = []
+    batch: List[Message] = []
+
+    started = time.perf_counter()
+    for message in messages:
+        if isinstance(message, CancelOrderData):
+            report.cancels += 1
+        else:
+            report.adds += 1
+        batch.append(message)
+        if len(batch) < batch_size:
+            continue
+
+        start = clock()
+        add_orders(batch, trades)
+        record(clock() - start)
+        batch.clear()
+        if trades:
+            _write_trades(report, trades, trades_output)
+
+    if batch:
+        start = clock()
+        add_orders(batch, trades)
+        record(clock() - start)
+        if trades:
+            _write_trades(report, trades, trades_output)
+    report.elapsed = time.perf_counter() - started
+
+    return report
+
+
+def _write_trades(
+    report: ReplayReport, trades: List[Trade], trades_output: Optional[TextIO]
+):
+    report.trades += len(trades)
+    if trades_output is not None:
+        for trade in trades:
+            trades_output.write(trade_to_json(trade))
+            trades_output.write("\n")
+    trades.clear()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Replay a JSONL order flow file")
+    parser.add_argument("path", help="JSONL (or .jsonl.gz) file, - for stdin")
+    parser.add_argument("--trades", help="write the resulting trades as JSONL")
+    parser.add_argument(
+        "--batch-size", type=int, default=1, help="messages per engine call"
+    )
+    args = parser.parse_args(argv)
+
+    messages = parse_messages(read_lines(args.path))
+    if args.trades:
+        with open(args.trades, "w") as trades_output:
+            report = replay(
+                messages, trades_output=trades_output, batch_size=args.batch_size
+            )
+    else:
+        report = replay(messages, batch_size=args.batch_size)
+    print(report.format())
+
+
+if __name__ == "__main__":
+    main()
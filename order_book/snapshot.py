@@ -0,0 +1,320 @@
+import os
+import struct
+from typing import Dict, List, Optional, Tuple
+
+from order_book import (
+    ID_TYPE,
+    IDGenerator,
+    MatchingEngine,
+    Order,
+    OrderType,
+    PriceLevel,
+    SideType,
+    Trade,
+    gc_paused,
+)
+from order_book.codec import (
+    DISPLAY_FLAG,
+    FLOAT_NUMBER,
+    INT_ID,
+    INT_NUMBER,
+    ORDER_TYPE_CODES,
+    ORDER_TYPES,
+    SIDE_CODES,
+    SIDE_MASK,
+    SIDES,
+    STR_ID,
+    decode_id,
+    decode_number,
+    encode_id,
+    encode_number,
+)
+
+# Layout, little endian:
+#   header       magic, version, journal sequence, then the last trade price
+#                of the book: u8 flag, the price if set
+#   generators   Order and Trade id generators: count, prefix
+#   2 x side     BUY then SELL: level count, then per level sorted by price:
+#                price, order count, then the level's orders in FIFO order as
+#                columns: ids (each with its own id header when the level
+#                mixes int and str ids), quantities, remained quantities,
+#                then the side's iceberg orders: count, per order id, display
+#                quantity and hidden quantity
+#   index        MatchingEngine.orders: ids of resting orders missing from it,
+#                then the indexed orders that are not resting, in full: side
+#                and order type (u8, as in an ADD journal record), price, id,
+#                quantities, then the stop price and display quantity if set
+# Version 1 snapshots have only the side in the index flags, versions 1 and 2
+# have no icebergs, versions 1 to 3 have no last trade price.
+
+MAGIC = b"OMES"
+VERSION = 4
+
+HEADER = struct.Struct("<4sBQ")
+COUNT = struct.Struct("<I")
+GENERATOR_COUNT = struct.Struct("<QB")
+FLAG = struct.Struct("<B")
+# a level with both int and str ids stores each id with encode_id
+MIXED_ID = 2
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def _encode_generator(buffer: bytearray, generator: IDGenerator):
+    buffer += GENERATOR_COUNT.pack(generator.count, generator.prefix is not None)
+    if generator.prefix is not None:
+        encode_id(buffer, generator.prefix)
+
+
+def _decode_generator(generator: IDGenerator, data: bytes, offset: int) -> int:
+    count, has_prefix = GENERATOR_COUNT.unpack_from(data, offset)
+    offset += GENERATOR_COUNT.size
+    prefix = None
+    if has_prefix:
+        prefix, offset = decode_id(data, offset)
+    generator.count = count
+    generator.prefix = prefix  # type: ignore
+    return offset
+
+
+def _encode_order(buffer: bytearray, order: Order):
+    encode_id(buffer, order.id)
+    encode_number(buffer, order.quantity)
+    encode_number(buffer, order.remained_quantity)
+
+
+def _decode_order(
+    data: bytes, offset: int, price: float, side: SideType
+) -> Tuple[Order, int]:
+    order_id, offset = decode_id(data, offset)
+    quantity, offset = decode_number(data, offset)
+    remained_quantity, offset = decode_number(data, offset)
+    order = Order(price=price, quantity=quantity, side=side, id=order_id)
+    order.remained_quantity = remained_quantity
+    return order, offset
+
+
+def _encode_level_orders(buffer: bytearray, orders: List[Order]):
+    # orders of a level are stored column by column so they unpack in one call
+    count = len(orders)
+    ids = [order.id for order in orders]
+    numbers = [order.quantity for order in orders]
+    numbers += [order.remained_quantity for order in orders]
+
+    if all(isinstance(order_id, int) for order_id in ids):
+        buffer += FLAG.pack(INT_ID)
+        buffer += struct.pack(f"<{count}q", *ids)
+    elif all(isinstance(order_id, str) for order_id in ids):
+        encoded = [order_id.encode() for order_id in ids]  # type: ignore
+        buffer += FLAG.pack(STR_ID)
+        buffer += struct.pack(f"<{count}H", *map(len, encoded))
+        buffer += b"".join(encoded)
+    else:
+        buffer += FLAG.pack(MIXED_ID)
+        for order_id in ids:
+            encode_id(buffer, order_id)
+
+    if all(isinstance(number, int) for number in numbers):
+        buffer += FLAG.pack(INT_NUMBER)
+        buffer += struct.pack(f"<{2 * count}q", *numbers)
+    else:
+        buffer += FLAG.pack(FLOAT_NUMBER)
+        buffer += struct.pack(f"<{2 * count}d", *numbers)
+
+
+def _decode_level_orders(
+    data: bytes, offset: int, count: int
+) -> Tuple[List[ID_TYPE], Tuple[float, ...], int]:
+    ids: List[ID_TYPE]
+    id_kind = data[offset]
+    offset += FLAG.size
+    if id_kind == INT_ID:
+        ids = list(struct.unpack_from(f"<{count}q", data, offset))
+        offset += 8 * count
+    elif id_kind == MIXED_ID:
+        ids = []
+        for _ in range(count):
+            order_id, offset = decode_id(data, offset)
+            ids.append(order_id)
+    else:
+        lengths = struct.unpack_from(f"<{count}H", data, offset)
+        offset += 2 * count
+        ids = []
+        for length in lengths:
+            ids.append(data[offset : offset + length].decode())
+            offset += length
+
+    number_kind = data[offset]
+    offset += FLAG.size
+    number_format = "q" if number_kind == INT_NUMBER else "d"
+    numbers = struct.unpack_from(f"<{2 * count}{number_format}", data, offset)
+    offset += 16 * count
+    return ids, numbers, offset
+
+
+def dump_snapshot(matching_engine: MatchingEngine, sequence: int = 0) -> bytes:
+    order_book = matching_engine.order_book
+    buffer = bytearray(HEADER.pack(MAGIC, VERSION, sequence))
+    last_trade_price = order_book.last_trade_price
+    buffer += FLAG.pack(last_trade_price is not None)
+    if last_trade_price is not None:
+        encode_number(buffer, last_trade_price)
+    _encode_generator(buffer, Order.ID_GENERATOR)
+    _encode_generator(buffer, Trade.ID_GENERATOR)
+
+    orders = matching_engine.orders
+    unindexed: List[ID_TYPE] = []
+    icebergs: List[Order] = []
+    for side in (SideType.BUY, SideType.SELL):
+        price_levels = list(order_book.best_price_levels(side))
+        if side == SideType.BUY:
+            price_levels.reverse()
+        price_levels = [pl for pl in price_levels if not pl.has_no_orders()]
+
+        buffer += COUNT.pack(len(price_levels))
+        for price_level in price_levels:
+            encode_number(buffer, price_level.price)
+            buffer += COUNT.pack(price_level.orders.size)
+            level_orders = price_level.orders.get_all_values()
+            _encode_level_orders(buffer, level_orders)
+            unindexed += [order.id for order in level_orders if order.id not in orders]
+            icebergs += [
+                order for order in level_orders if order.display_quantity is not None
+            ]
+        buffer += COUNT.pack(len(icebergs))
+        for order in icebergs:
+            encode_id(buffer, order.id)
+            encode_number(buffer, order.display_quantity)  # type: ignore
+            encode_number(buffer, order.hidden_quantity)
+        icebergs.clear()
+
+    buffer += COUNT.pack(len(unindexed))
+    for order_id in unindexed:
+        encode_id(buffer, order_id)
+
+    # pending stops, filled orders are left out
+    not_resting = [
+        order
+        for order in orders.values()
+        if order.price_level is None and order.remained_quantity > 0
+    ]
+    buffer += COUNT.pack(len(not_resting))
+    for order in not_resting:
+        flags = SIDE_CODES[order.side] | ORDER_TYPE_CODES[order.order_type] << 4
+        if order.display_quantity is not None:
+            flags |= DISPLAY_FLAG
+        buffer += FLAG.pack(flags)
+        encode_number(buffer, order.price)
+        _encode_order(buffer, order)
+        if order.stop_price is not None:
+            encode_number(buffer, order.stop_price)
+        if order.display_quantity is not None:
+            encode_number(buffer, order.display_quantity)
+
+    return bytes(buffer)
+
+
+def load_snapshot(
+    data: bytes, matching_engine: Optional[MatchingEngine] = None
+) -> Tuple[MatchingEngine, int]:
+    # Restores into an empty engine and returns it with the journal sequence.
+    # The Order and Trade id generators are restored as well.
+    if len(data) < HEADER.size:
+        raise SnapshotError("snapshot is truncated")
+    magic, version, sequence = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise SnapshotError("not an order book snapshot")
+    if version not in (1, 2, 3, VERSION):
+        raise SnapshotError(f"unsupported snapshot version {version}")
+
+    matching_engine = matching_engine or MatchingEngine()
+    order_book = matching_engine.order_book
+    offset = HEADER.size
+    if version > 3:
+        has_last_trade_price = data[offset]
+        offset += FLAG.size
+        if has_last_trade_price:
+            # restored before the pending stops, which are checked against it
+            order_book.last_trade_price, offset = decode_number(data, offset)
+    offset = _decode_generator(Order.ID_GENERATOR, data, offset)
+    offset = _decode_generator(Trade.ID_GENERATOR, data, offset)
+
+    resting: Dict[ID_TYPE, Order] = {}
+    with gc_paused():
+        for side in (SideType.BUY, SideType.SELL):
+            (level_count,) = COUNT.unpack_from(data, offset)
+            offset += COUNT.size
+            price_levels: List[PriceLevel] = []
+            for _ in range(level_count):
+                price, offset = decode_number(data, offset)
+                (order_count,) = COUNT.unpack_from(data, offset)
+                offset += COUNT.size
+                ids, numbers, offset = _decode_level_orders(data, offset, order_count)
+                level_orders = []
+                for index, order_id in enumerate(ids):
+                    order = Order(price, numbers[index], side, order_id)
+                    order.remained_quantity = numbers[order_count + index]
+                    level_orders.append(order)
+                    resting[order_id] = order
+                price_level = PriceLevel(price)
+                price_level.add_orders(level_orders)
+                price_levels.append(price_level)
+            if version > 2:
+                (iceberg_count,) = COUNT.unpack_from(data, offset)
+                offset += COUNT.size
+                for _ in range(iceberg_count):
+                    order_id, offset = decode_id(data, offset)
+                    order = resting[order_id]
+                    order.display_quantity, offset = decode_number(data, offset)
+                    order.hidden_quantity, offset = decode_number(data, offset)
+            order_book.load_price_levels(side, price_levels)
+
+    (unindexed_count,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    for _ in range(unindexed_count):
+        order_id, offset = decode_id(data, offset)
+        del resting[order_id]
+
+    orders = matching_engine.orders
+    orders.update(resting)
+    (order_count,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    for _ in range(order_count):
+        flags = data[offset]
+        offset += FLAG.size
+        price, offset = decode_number(data, offset)
+        order, offset = _decode_order(data, offset, price, SIDES[flags & SIDE_MASK])
+        order.order_type = ORDER_TYPES[flags >> 4]
+        if (
+            order.order_type is OrderType.STOP
+            or order.order_type is OrderType.STOP_LIMIT
+        ):
+            order.stop_price, offset = decode_number(data, offset)
+        if flags & DISPLAY_FLAG:
+            order.display_quantity, offset = decode_number(data, offset)
+        if order.stop_price is None:
+            orders[order.id] = order
+        else:
+            # back into the trigger book, a stop pending at the last trade
+            # price stays pending
+            matching_engine._add_stop_order(order, [])
+
+    return matching_engine, sequence
+
+
+def write_snapshot(matching_engine: MatchingEngine, path: str, sequence: int = 0):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(dump_snapshot(matching_engine, sequence))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+
+
+def read_snapshot(
+    path: str, matching_engine: Optional[MatchingEngine] = None
+) -> Tuple[MatchingEngine, int]:
+    with open(path, "rb") as file:
+        return load_snapshot(file.read(), matching_engine)
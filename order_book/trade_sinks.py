@@ -0,0 +1,130 @@
+import struct
+from array import array
+from typing import BinaryIO, Callable, Generator, List, Optional, Tuple
+
+from order_book import ID_TYPE, Order, SideType, Trade, TradeSink
+from order_book.codec import SIDE_CODES, SIDES, decode_id, encode_id
+
+FillCallback = Callable[[Order, Order, float, float], None]
+FillRecord = Tuple[ID_TYPE, ID_TYPE, SideType, float, float]
+
+
+class ListTradeSink(TradeSink):
+    # Same trades the engine returns when it has no sink, collected in one list.
+    def __init__(self):
+        self.trades: List[Trade] = []
+
+    def on_fill(
+        self, maker_order: Order, taker_order: Order, price: float, quantity: float
+    ):
+        self.trades.append(
+            Trade(
+                order_id=maker_order.id,
+                quantity=quantity,
+                side=maker_order.side,
+                price=price,
+            )
+        )
+        self.trades.append(
+            Trade(
+                order_id=taker_order.id,
+                quantity=quantity,
+                side=taker_order.side,
+                price=price,
+            )
+        )
+
+
+class CallbackTradeSink(TradeSink):
+    def __init__(self, callback: FillCallback):
+        self.callback = callback
+
+    def on_fill(
+        self, maker_order: Order, taker_order: Order, price: float, quantity: float
+    ):
+        self.callback(maker_order, taker_order, price, quantity)
+
+
+class RingBufferTradeSink(TradeSink):
+    # Fills are written into preallocated columns, the oldest fills are
+    # overwritten once the buffer is full.
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.maker_ids: List[Optional[ID_TYPE]] = [None] * capacity
+        self.taker_ids: List[Optional[ID_TYPE]] = [None] * capacity
+        self.taker_sides = bytearray(capacity)
+        self.prices = array("d", bytes(8 * capacity))
+        self.quantities = array("d", bytes(8 * capacity))
+        self.count = 0
+        self.start = 0
+
+    def on_fill(
+        self, maker_order: Order, taker_order: Order, price: float, quantity: float
+    ):
+        index = self.count % self.capacity
+        self.maker_ids[index] = maker_order.id
+        self.taker_ids[index] = taker_order.id
+        self.taker_sides[index] = SIDE_CODES[taker_order.side]
+        self.prices[index] = price
+        self.quantities[index] = quantity
+        self.count += 1
+
+    @property
+    def dropped(self) -> int:
+        return max(0, self.count - self.capacity - self.start)
+
+    def __len__(self) -> int:
+        return min(self.count - self.start, self.capacity)
+
+    def drain(self) -> Generator[FillRecord, None, None]:
+        start = max(self.start, self.count - self.capacity)
+        end = self.count
+        for position in range(start, end):
+            index = position % self.capacity
+            yield (
+                self.maker_ids[index],  # type: ignore
+                self.taker_ids[index],  # type: ignore
+                SIDES[self.taker_sides[index]],
+                self.prices[index],
+                self.quantities[index],
+            )
+        self.start = end
+
+
+FILL_RECORD = struct.Struct("<Bdd")
+
+
+class BinaryTradeSink(TradeSink):
+    # Record: taker side (u8), price (f64), quantity (f64), maker id, taker id.
+    def __init__(self, stream: BinaryIO, buffer_size: int = 1 << 16):
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self.buffer = bytearray()
+
+    def on_fill(
+        self, maker_order: Order, taker_order: Order, price: float, quantity: float
+    ):
+        buffer = self.buffer
+        buffer += FILL_RECORD.pack(SIDE_CODES[taker_order.side], price, quantity)
+        encode_id(buffer, maker_order.id)
+        encode_id(buffer, taker_order.id)
+        if len(buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.stream.write(self.buffer)
+            self.buffer = bytearray()
+        self.stream.flush()
+
+
+def read_fill_records(data: bytes) -> Generator[FillRecord, None, None]:
+    offset = 0
+    while offset < len(data):
+        side_code, price, quantity = FILL_RECORD.unpack_from(data, offset)
+        offset += FILL_RECORD.size
+        maker_id, offset = decode_id(data, offset)
+        taker_id, offset = decode_id(data, offset)
+        yield maker_id, taker_id, SIDES[side_code], price, quantity
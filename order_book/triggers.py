@@ -0,0 +1,67 @@
+import math
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+
+from order_book import ID_TYPE, Order, SideType
+
+# (trigger key, -sequence, order), the key is the negated stop price for buys
+# and the stop price for sells, so the stops a price crosses are always the
+# tail of a side's list
+Entry = Tuple[float, int, Order]
+
+
+class TriggerBook:
+    # Pending stop orders of both sides kept sorted by stop price. A buy stop
+    # triggers once the last trade price is at or above its stop price, a sell
+    # stop once it is at or below. release() finds the crossed stops with one
+    # bisect per side and cuts them off the tail, O(log n + k).
+    #
+    # Released stops come in a fixed order: buys from the lowest stop price,
+    # then sells from the highest, the ones added first first on a tie.
+    def __init__(self):
+        self.buy_stops: List[Entry] = []
+        self.sell_stops: List[Entry] = []
+        self.entries: Dict[ID_TYPE, Entry] = {}
+        self.sequence = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, order: Order):
+        stop_price: float = order.stop_price  # type: ignore
+        self.sequence += 1
+        entry: Entry
+        if order.side == SideType.BUY:
+            entry = (-stop_price, -self.sequence, order)
+            insort(self.buy_stops, entry)
+        else:
+            entry = (stop_price, -self.sequence, order)
+            insort(self.sell_stops, entry)
+        self.entries[order.id] = entry
+
+    def remove(self, order: Order) -> bool:
+        entry = self.entries.pop(order.id, None)
+        if entry is None:
+            return False
+        stops = self.buy_stops if order.side == SideType.BUY else self.sell_stops
+        del stops[bisect_left(stops, entry)]
+        return True
+
+    def release(
+        self, high_price: float, low_price: Optional[float] = None
+    ) -> List[Order]:
+        # buy stops are checked against high_price and sell stops against
+        # low_price, which defaults to high_price
+        if low_price is None:
+            low_price = high_price
+        released = []
+        for stops, key in ((self.buy_stops, -high_price), (self.sell_stops, low_price)):
+            start = bisect_left(stops, (key, -math.inf))
+            if start == len(stops):
+                continue
+            for entry in reversed(stops[start:]):
+                order = entry[2]
+                del self.entries[order.id]
+                released.append(order)
+            del stops[start:]
+        return released
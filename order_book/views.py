@@ -0,0 +1,127 @@
+from bisect import bisect_left, insort
+from operator import neg
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from order_book import LevelListener, OrderBook, PriceLevel, SideType
+
+Levels = Tuple[Tuple[float, float], ...]
+
+
+class BookView(NamedTuple):
+    # (price, total quantity) of each side from the best price
+    version: int
+    bids: Levels
+    asks: Levels
+
+
+class SideLevels:
+    # Own copy of the level totals of one side, written by the matching thread
+    # only. keys are sorted from the best price: the prices for asks, the
+    # negated prices for bids.
+    __slots__ = ("sign", "keys", "quantities", "dirty")
+
+    def __init__(self, side: SideType):
+        self.sign = -1 if side == SideType.BUY else 1
+        self.keys: List[float] = []
+        self.quantities: Dict[float, float] = {}
+        self.dirty: Dict[float, Optional[PriceLevel]] = {}
+
+    def levels(self, levels: Optional[Levels], depth: Optional[int]) -> Levels:
+        # the levels to publish, the given ones when they did not change
+        dirty = self.dirty
+        if not dirty and levels is not None:
+            return levels
+        keys = self.keys
+        quantities = self.quantities
+        sign = self.sign
+
+        # the side is full and every change is behind the last published
+        # level, the published levels stay as they are
+        hidden = (
+            levels is not None
+            and depth is not None
+            and len(levels) == depth
+            and all(sign * price > sign * levels[-1][0] for price in dirty)
+        )
+        for price, price_level in dirty.items():
+            if price_level is None:
+                if price in quantities:
+                    del quantities[price]
+                    del keys[bisect_left(keys, sign * price)]
+            else:
+                if price not in quantities:
+                    insort(keys, sign * price)
+                quantities[price] = price_level.total_quantity
+        dirty.clear()
+        if hidden:
+            return levels  # type: ignore
+
+        top = keys if depth is None else keys[:depth]
+        prices = top if sign == 1 else list(map(neg, top))
+        new_levels = tuple(zip(prices, map(quantities.__getitem__, prices)))
+        if new_levels == levels:
+            return levels  # type: ignore
+        return new_levels
+
+
+class BookViews(LevelListener):
+    # Publishes an immutable BookView of a book after every engine operation,
+    # enabled by passing an instance as MatchingEngine(views=...). Readers on
+    # other threads take `views.view` and keep using that object, it never
+    # changes and never shows a book in the middle of an operation, so they
+    # need no lock. A new view only copies the sides whose published levels
+    # changed, the other side is shared with the previous version.
+    #
+    # depth limits the levels kept per side (None for all of them), changes
+    # below the published depth do not cause a copy.
+    def __init__(self, depth: Optional[int] = 20):
+        if depth is not None and depth <= 0:
+            raise ValueError("depth must be positive")
+        self.depth = depth
+        self.order_book: Optional[OrderBook] = None
+        self.view = BookView(0, (), ())
+        self.bids = SideLevels(SideType.BUY)
+        self.asks = SideLevels(SideType.SELL)
+
+    def attach(self, order_book: OrderBook):
+        self.order_book = order_book
+        self.bids = SideLevels(SideType.BUY)
+        self.asks = SideLevels(SideType.SELL)
+        for side_levels, side in (
+            (self.bids, SideType.BUY),
+            (self.asks, SideType.SELL),
+        ):
+            for price_level in order_book.best_price_levels(side):
+                side_levels.dirty[price_level.price] = price_level
+        order_book.level_listeners.append(self)
+        self.view = BookView(
+            self.view.version + 1,
+            self.bids.levels(None, self.depth),
+            self.asks.levels(None, self.depth),
+        )
+
+    def detach(self, order_book: OrderBook):
+        order_book.level_listeners.remove(self)
+        if self.order_book is order_book:
+            self.order_book = None
+
+    def on_level_update(self, side: SideType, price_level: PriceLevel):
+        if side == SideType.BUY:
+            self.bids.dirty[price_level.price] = price_level
+        else:
+            self.asks.dirty[price_level.price] = price_level
+
+    def on_level_remove(self, side: SideType, price_level: PriceLevel):
+        if side == SideType.BUY:
+            self.bids.dirty[price_level.price] = None
+        else:
+            self.asks.dirty[price_level.price] = None
+
+    def publish(self) -> BookView:
+        # called by the engine between operations, when the book is consistent
+        view = self.view
+        bids = self.bids.levels(view.bids, self.depth)
+        asks = self.asks.levels(view.asks, self.depth)
+        if bids is not view.bids or asks is not view.asks:
+            self.view = view = BookView(view.version + 1, bids, asks)
+        return view
@@ -0,0 +1,5 @@
+#!/usr/bin/env bash
+
+set -e
+
+python -m benchmarks.suite "$@"
@@ -1,6 +1,6 @@
 from typing import TypeVar, List, Tuple
 
-from order_book import OrderBook, MatchingEngine, PriceLevelAVLTree
+from order_book import OrderBook, MatchingEngine, PriceLevelAVLTree, SideType
 from py_simple_trees import AVLNode, TraversalType
 
 K = TypeVar("K")
@@ -8,6 +8,18 @@ V = TypeVar("V")
 AVLBN = TypeVar("AVLBN", bound=AVLNode)
 
 
+def book_levels(matching_engine: MatchingEngine, side: SideType):
+    # (price, total quantity, order ids in queue order) per level, best first
+    return [
+        (
+            price_level.price,
+            price_level.total_quantity,
+            [order.id for order in price_level.orders.get_all_values()],
+        )
+        for price_level in matching_engine.order_book.best_price_levels(side)
+    ]
+
+
 def check_order_book(inputs, outputs):
     order_book = TestOrderBook()
     matching_engine = TestMatchingEngine(order_book)
@@ -0,0 +1,338 @@
+import math
+import random
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from order_book import (
+    CancelOrderData,
+    MatchingEngine,
+    ModifyOrderData,
+    Order,
+    OrderBook,
+    OrderType,
+    SideType,
+)
+
+TradeTuple = Tuple[object, SideType, float, float]
+
+
+class ReferenceBook:
+    # Naive book to check the engine against: a dict of price -> FIFO list of
+    # [id, shown quantity, hidden quantity, display quantity] per side, the
+    # best price is found by scanning. An iceberg whose shown quantity is
+    # filled shows a new slice at the back of its queue. Pending stops are a
+    # plain list scanned after every trade.
+    def __init__(self):
+        self.levels: Dict[SideType, Dict[float, List[list]]] = {
+            SideType.BUY: {},
+            SideType.SELL: {},
+        }
+        # id -> [side, price, quantity, open quantity, display quantity] of
+        # resting orders
+        self.orders: Dict[object, list] = {}
+        # [id, side, stop price, price, quantity, order type, display quantity]
+        # of pending stops
+        self.stops: List[list] = []
+        self.last_price: Optional[float] = None
+        # trade prices since the stops were last checked
+        self.trade_prices: List[float] = []
+        self.triggering = False
+
+    def best_price(self, side: SideType) -> Optional[float]:
+        levels = self.levels[side]
+        if not levels:
+            return None
+        return max(levels) if side == SideType.BUY else min(levels)
+
+    def crosses(self, side: SideType, price: float, level_price: float) -> bool:
+        if side == SideType.BUY:
+            return price >= level_price
+        return price <= level_price
+
+    def available(self, side: SideType, price: float) -> float:
+        other_side = SideType.SELL if side == SideType.BUY else SideType.BUY
+        return sum(
+            entry[1]
+            for level_price, queue in self.levels[other_side].items()
+            if self.crosses(side, price, level_price)
+            for entry in queue
+        )
+
+    def add(
+        self,
+        order_id,
+        side: SideType,
+        price: float,
+        quantity: float,
+        order_type: OrderType = OrderType.LIMIT,
+        filled: float = 0,
+        stop_price: Optional[float] = None,
+        display: Optional[float] = None,
+    ) -> List[TradeTuple]:
+        trades: List[TradeTuple] = []
+        if stop_price is not None:
+            self.stops.append(
+                [order_id, side, stop_price, price, quantity, order_type, display]
+            )
+            self._trigger(trades)
+            return trades
+        if order_type is OrderType.MARKET:
+            price = math.inf if side == SideType.BUY else -math.inf
+        other_side = SideType.SELL if side == SideType.BUY else SideType.BUY
+        best_price = self.best_price(other_side)
+        if best_price is None or not self.crosses(side, price, best_price):
+            if order_type is OrderType.LIMIT:
+                self._rest(order_id, side, price, filled + quantity, quantity, display)
+            return trades
+        if order_type is OrderType.FOK and self.available(side, price) < quantity:
+            return trades
+
+        remained = quantity
+        while remained > 0:
+            best_price = self.best_price(other_side)
+            if best_price is None or not self.crosses(side, price, best_price):
+                break
+            queue = self.levels[other_side][best_price]
+            entry = queue[0]
+            matched = min(entry[1], remained)
+            entry[1] -= matched
+            remained -= matched
+            self.orders[entry[0]][3] -= matched
+            trades.append((entry[0], other_side, best_price, matched))
+            trades.append((order_id, side, best_price, matched))
+            self.last_price = best_price
+            self.trade_prices.append(best_price)
+            if entry[1] == 0:
+                queue.pop(0)
+                if entry[2] > 0:
+                    entry[1] = min(entry[2], entry[3])
+                    entry[2] -= entry[1]
+                    queue.append(entry)
+                    continue
+                del self.orders[entry[0]]
+                if not queue:
+                    del self.levels[other_side][best_price]
+        if remained > 0 and order_type is OrderType.LIMIT:
+            self._rest(order_id, side, price, filled + quantity, remained, display)
+        self._trigger(trades)
+        return trades
+
+    def _trigger(self, trades: List[TradeTuple]):
+        # crossed stops are queued, buys from the lowest stop price then sells
+        # from the highest, and added one by one as market or limit orders
+        if self.triggering:
+            return
+        self.triggering = True
+        queue: List[list] = []
+        while True:
+            # a stop is crossed by any trade since the last check, or by the
+            # last trade price when there was none
+            prices = self.trade_prices or (
+                [] if self.last_price is None else [self.last_price]
+            )
+            self.trade_prices = []
+            if prices:
+                high, low = max(prices), min(prices)
+                buys = [s for s in self.stops if s[1] == SideType.BUY and s[2] <= high]
+                sells = [s for s in self.stops if s[1] == SideType.SELL and s[2] >= low]
+                crossed = sorted(buys, key=lambda s: s[2]) + sorted(
+                    sells, key=lambda s: -s[2]
+                )
+                self.stops = [s for s in self.stops if s not in crossed]
+                queue.extend(crossed)
+            if not queue:
+                break
+            order_id, side, _, price, quantity, order_type, display = queue.pop(0)
+            if order_type is OrderType.STOP:
+                order_type = OrderType.MARKET
+            else:
+                order_type = OrderType.LIMIT
+            trades.extend(
+                self.add(order_id, side, price, quantity, order_type, display=display)
+            )
+        self.triggering = False
+
+    def _rest(
+        self, order_id, side: SideType, price: float, quantity, remained, display
+    ):
+        shown = remained if display is None else min(remained, display)
+        self.levels[side].setdefault(price, []).append(
+            [order_id, shown, remained - shown, display]
+        )
+        self.orders[order_id] = [side, price, quantity, remained, display]
+
+    def cancel(self, order_id):
+        self.stops = [stop for stop in self.stops if stop[0] != order_id]
+        if order_id not in self.orders:
+            return
+        side, price, _, _, _ = self.orders.pop(order_id)
+        queue = self.levels[side][price]
+        queue[:] = [entry for entry in queue if entry[0] != order_id]
+        if not queue:
+            del self.levels[side][price]
+
+    def modify(self, order_id, price=None, quantity=None) -> List[TradeTuple]:
+        if order_id not in self.orders:
+            return []
+        side, old_price, old_quantity, remained, display = self.orders[order_id]
+        price = old_price if price is None else price
+        quantity = old_quantity if quantity is None else quantity
+        filled = old_quantity - remained
+        new_remained = quantity - filled
+        if new_remained <= 0:
+            self.cancel(order_id)
+            return []
+        if price == old_price and new_remained <= remained:
+            # the hidden quantity is cut first
+            for entry in self.levels[side][price]:
+                if entry[0] == order_id:
+                    entry[2] = max(new_remained - entry[1], 0)
+                    entry[1] = new_remained - entry[2]
+            self.orders[order_id] = [side, price, quantity, new_remained, display]
+            return []
+        self.cancel(order_id)
+        return self.add(
+            order_id, side, price, new_remained, filled=filled, display=display
+        )
+
+    def depth(self, side: SideType) -> List[Tuple[float, float, list]]:
+        levels = self.levels[side]
+        return [
+            (
+                price,
+                sum(entry[1] for entry in levels[price]),
+                [e[0] for e in levels[price]],
+            )
+            for price in sorted(levels, reverse=side == SideType.BUY)
+        ]
+
+
+def engine_depth(order_book: OrderBook, side: SideType):
+    return [
+        (
+            price_level.price,
+            price_level.total_quantity,
+            [order.id for order in price_level.orders.get_all_values()],
+        )
+        for price_level in order_book.best_price_levels(side)
+    ]
+
+
+def check_best_prices(order_book: OrderBook, reference: ReferenceBook):
+    best_bid = reference.best_price(SideType.BUY)
+    best_ask = reference.best_price(SideType.SELL)
+    assert order_book.best_bid_price == (-math.inf if best_bid is None else best_bid)
+    assert order_book.best_ask_price == (math.inf if best_ask is None else best_ask)
+    if best_bid is None:
+        assert order_book.best_bid_price_level is None
+    else:
+        assert order_book.best_bid_price_level.price == best_bid  # type: ignore
+    if best_ask is None:
+        assert order_book.best_ask_price_level is None
+    else:
+        assert order_book.best_ask_price_level.price == best_ask  # type: ignore
+
+
+def check_books(order_book: OrderBook, reference: ReferenceBook):
+    check_best_prices(order_book, reference)
+    for side in (SideType.BUY, SideType.SELL):
+        depth = reference.depth(side)
+        assert engine_depth(order_book, side) == depth
+        if type(order_book) is OrderBook:
+            levels = (
+                order_book.bid_price_levels
+                if side == SideType.BUY
+                else order_book.ask_price_levels
+            )
+            assert sorted(levels) == sorted(price for price, _, _ in depth)
+
+
+def run_differential(
+    matching_engine: MatchingEngine,
+    seed: int,
+    operations: int,
+    check_every: int = 100,
+    min_price: int = 90,
+    max_price: int = 110,
+):
+    # Random adds of every order type including stops and icebergs, cancels
+    # and amends on a narrow price band so levels are created, crossed and
+    # emptied all the time. The best prices are checked after every operation, the whole book
+    # every check_every operations and at the end.
+    rnd = random.Random(seed)
+    reference = ReferenceBook()
+    order_book = matching_engine.order_book
+    order_types = [OrderType.LIMIT] * 16 + [
+        OrderType.IOC,
+        OrderType.IOC,
+        OrderType.FOK,
+        OrderType.MARKET,
+        OrderType.STOP,
+        OrderType.STOP_LIMIT,
+    ]
+    ids: List[int] = []
+    for index in range(operations):
+        action = rnd.random()
+        if ids and action < 0.2:
+            order_id = rnd.choice(ids)
+            matching_engine.cancel_order(CancelOrderData(id=order_id))
+            reference.cancel(order_id)
+        elif ids and action < 0.35:
+            order_id = rnd.choice(ids)
+            price = rnd.randint(min_price, max_price) if rnd.random() < 0.5 else None
+            quantity = rnd.randint(0, 12) if rnd.random() < 0.7 else None
+            _, trades = matching_engine.modify_order(
+                ModifyOrderData(id=order_id, price=price, quantity=quantity)
+            )
+            expected = reference.modify(order_id, price=price, quantity=quantity)
+            assert [
+                (t.order_id, t.side, t.price, t.quantity) for t in trades
+            ] == expected
+        else:
+            side = rnd.choice([SideType.BUY, SideType.SELL])
+            price = rnd.randint(min_price, max_price)
+            quantity = rnd.randint(1, 10)
+            order_type = rnd.choice(order_types)
+            stop_price = None
+            if order_type is OrderType.STOP or order_type is OrderType.STOP_LIMIT:
+                stop_price = rnd.randint(min_price, max_price)
+            display = rnd.randint(1, 4) if rnd.random() < 0.2 else None
+            _, trades = matching_engine.add_order(
+                Order(
+                    price,
+                    quantity,
+                    side,
+                    id=index,
+                    order_type=order_type,
+                    stop_price=stop_price,
+                    display_quantity=display,
+                )
+            )
+            expected = reference.add(
+                index,
+                side,
+                price,
+                quantity,
+                order_type,
+                stop_price=stop_price,
+                display=display,
+            )
+            assert [
+                (t.order_id, t.side, t.price, t.quantity) for t in trades
+            ] == expected
+            ids.append(index)
+            if len(ids) > 2000:
+                ids = ids[-1000:]
+
+        check_best_prices(order_book, reference)
+        if index % check_every == 0:
+            check_books(order_book, reference)
+    check_books(order_book, reference)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    # python -m tests.differential [operations] [seed]
+    operations = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    run_differential(MatchingEngine(), seed, operations, check_every=1000)
+    print(f"{operations} operations match the reference book")
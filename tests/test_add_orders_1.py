@@ -0,0 +1,75 @@
+import random
+
+from order_book import CancelOrderData, MatchingEngine, Order, SideType
+from tests.common import book_levels
+
+
+def generate_flow(seed: int, count: int):
+    rnd = random.Random(seed)
+    orders = []
+    flow = []
+    for _ in range(count):
+        if orders and rnd.random() < 0.25:
+            flow.append(CancelOrderData(id=rnd.choice(orders).id))
+            continue
+        side = rnd.choice([SideType.BUY, SideType.SELL])
+        order = Order(price=rnd.randint(1, 20), quantity=rnd.randint(1, 10), side=side)
+        orders.append(order)
+        flow.append(order)
+    return flow
+
+
+def clone(flow):
+    orders = {}
+    result = []
+    for item in flow:
+        if isinstance(item, CancelOrderData):
+            result.append(item)
+            continue
+        order = Order(price=item.price, quantity=item.quantity, side=item.side)
+        order.id = item.id
+        orders[item.id] = order
+        result.append(order)
+    return result
+
+
+def test_add_orders_same_as_add_order():
+    flow = generate_flow(seed=11, count=2000)
+
+    loop_engine = MatchingEngine()
+    loop_trades = []
+    for item in clone(flow):
+        if isinstance(item, CancelOrderData):
+            loop_engine.cancel_order(item)
+        else:
+            _, trades = loop_engine.add_order(item)
+            loop_trades.extend(trades)
+
+    batch_engine = MatchingEngine()
+    batch_trades = batch_engine.add_orders(clone(flow))
+
+    assert [(t.order_id, t.side, t.price, t.quantity) for t in loop_trades] == [
+        (t.order_id, t.side, t.price, t.quantity) for t in batch_trades
+    ]
+    for side in (SideType.BUY, SideType.SELL):
+        assert book_levels(loop_engine, side) == book_levels(batch_engine, side)
+    assert loop_engine.orders.keys() == batch_engine.orders.keys()
+
+
+def test_add_orders_reuse_buffer():
+    matching_engine = MatchingEngine()
+    trades = []
+    result = matching_engine.add_orders(
+        [
+            Order(price=2, quantity=2, side=SideType.BUY),
+            Order(price=2, quantity=1, side=SideType.SELL),
+        ],
+        trades,
+    )
+    assert result is trades
+    assert len(trades) == 2
+
+    order = Order(price=2, quantity=1, side=SideType.BUY)
+    matching_engine.add_orders([order, CancelOrderData(id=order.id)], trades)
+    assert len(trades) == 2
+    assert matching_engine.order_book.best_bid_price_level.total_quantity == 1
@@ -0,0 +1,123 @@
+import math
+import random
+
+import pytest
+
+from order_book import (
+    CancelOrderData,
+    MatchingEngine,
+    ModifyOrderData,
+    Order,
+    OrderBook,
+    SideType,
+)
+from order_book.ladder import PriceLadderOrderBook
+
+np = pytest.importorskip("numpy")
+
+
+def walk_vwap(order_book: OrderBook, side: SideType, size: float) -> float:
+    remained = size
+    notional = 0.0
+    for price_level in order_book.best_price_levels(side):
+        quantity = min(remained, price_level.total_quantity)
+        notional += quantity * price_level.price
+        remained -= quantity
+        if remained == 0:
+            return notional / size
+    return math.nan
+
+
+def walk_levels(order_book: OrderBook, side: SideType):
+    return [
+        (price_level.price, price_level.total_quantity)
+        for price_level in order_book.best_price_levels(side)
+    ]
+
+
+@pytest.mark.parametrize("ladder", [False, True])
+def test_arrays_follow_the_book(ladder):
+    matching_engine = MatchingEngine(
+        PriceLadderOrderBook(1, 200, 1) if ladder else None
+    )
+    order_book = matching_engine.order_book
+    rnd = random.Random(3)
+    for index in range(20):
+        side = rnd.choice([SideType.BUY, SideType.SELL])
+        price = rnd.randint(95, 99) if side == SideType.BUY else rnd.randint(101, 105)
+        matching_engine.add_order(Order(price, rnd.randint(1, 9), side, id=index))
+    analytics = order_book.get_analytics()
+    assert order_book.get_analytics() is analytics
+
+    ids = list(range(20))
+    for index in range(20, 3000):
+        action = rnd.random()
+        if action < 0.2:
+            matching_engine.cancel_order(CancelOrderData(id=rnd.choice(ids)))
+        elif action < 0.3:
+            matching_engine.modify_order(
+                ModifyOrderData(id=rnd.choice(ids), quantity=rnd.randint(1, 9))
+            )
+        else:
+            side = rnd.choice([SideType.BUY, SideType.SELL])
+            matching_engine.add_order(
+                Order(rnd.randint(90, 110), rnd.randint(1, 9), side, id=index)
+            )
+            ids.append(index)
+        # let changes pile up between some of the refreshes
+        if rnd.random() < 0.1:
+            continue
+
+        for side in (SideType.BUY, SideType.SELL):
+            prices, quantities = analytics.levels(side)
+            assert list(zip(prices.tolist(), quantities.tolist())) == walk_levels(
+                order_book, side
+            )
+            sizes = np.array([1, 5, 17, 40, 1000])
+            expected = [walk_vwap(order_book, side, size) for size in sizes]
+            np.testing.assert_allclose(analytics.vwap(side, sizes), expected)
+
+
+def test_queries():
+    matching_engine = MatchingEngine()
+    for price, quantity in ((101, 2), (102, 3), (104, 5)):
+        matching_engine.add_order(Order(price, quantity, SideType.SELL))
+    for price, quantity in ((99, 4), (97, 1)):
+        matching_engine.add_order(Order(price, quantity, SideType.BUY))
+    analytics = matching_engine.order_book.get_analytics()
+
+    sizes = np.array([0, 1, 2, 5, 10, 11])
+    np.testing.assert_allclose(
+        analytics.vwap(SideType.SELL, sizes),
+        [np.nan, 101, 101, (202 + 306) / 5, (202 + 306 + 520) / 10, np.nan],
+    )
+    np.testing.assert_allclose(
+        analytics.slippage(SideType.SELL, sizes),
+        [np.nan, 0, 0, (202 + 306) / 5 - 101, (202 + 306 + 520) / 10 - 101, np.nan],
+    )
+    np.testing.assert_allclose(
+        analytics.slippage(SideType.BUY, np.array([4, 5])), [0, 99 - (396 + 97) / 5]
+    )
+    assert analytics.depth(SideType.SELL, 2) == 5
+    assert analytics.depth(SideType.BUY, 10) == 5
+    np.testing.assert_array_equal(
+        analytics.quantity_within(SideType.SELL, [100, 101, 103, 200]), [0, 2, 5, 10]
+    )
+    np.testing.assert_array_equal(
+        analytics.quantity_within(SideType.BUY, [100, 99, 97]), [0, 4, 5]
+    )
+
+    prices, _ = analytics.levels(SideType.BUY)
+    with pytest.raises(ValueError):
+        prices[0] = 1
+
+    analytics.close()
+    assert matching_engine.order_book.analytics is None
+    assert matching_engine.order_book.level_listeners == []
+
+
+def test_empty_side():
+    analytics = OrderBook().get_analytics()
+    assert np.isnan(analytics.vwap(SideType.SELL, np.array([1.0]))).all()
+    assert np.isnan(analytics.slippage(SideType.BUY, np.array([1.0]))).all()
+    assert analytics.depth(SideType.BUY, 3) == 0
@@ -0,0 +1,39 @@
+from benchmarks.generators import cancel_heavy_flow, deep_book, sweep_flow
+from benchmarks.suite import compare, run_suite
+from order_book import CancelOrderData, MatchingEngine, SideType
+
+
+def test_run_suite():
+    results = run_suite(size=1000)
+    assert set(results) == {
+        "passive_adds",
+        "deep_sweep",
+        "cancel_heavy",
+        "narrow_prices",
+        "wide_prices",
+        "amend_heavy",
+    }
+    assert all(result["ops"] > 0 for result in results.values())
+
+    baseline = {"passive_adds": {"ops_per_sec": float("inf")}}
+    assert len(compare(results, baseline, tolerance=0.1)) == 1
+
+
+def test_sweep_flow_clears_levels():
+    matching_engine = MatchingEngine()
+    matching_engine.add_orders(deep_book(20, 3, SideType.SELL))
+    trades = matching_engine.add_orders(sweep_flow(2, levels=10, orders_per_level=3))
+    assert len(trades) == 2 * 2 * 10 * 3
+    assert matching_engine.order_book.is_empty_asks()
+    assert matching_engine.order_book.is_empty_bids()
+
+
+def test_cancel_heavy_flow_cancels_live_orders():
+    messages = cancel_heavy_flow(1000, cancel_ratio=0.5)
+    added = set()
+    for message in messages:
+        if isinstance(message, CancelOrderData):
+            assert message.id in added
+            added.remove(message.id)
+        else:
+            added.add(message.id)
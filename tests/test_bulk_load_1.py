@@ -0,0 +1,173 @@
+import random
+
+import pytest
+
+from order_book import MatchingEngine, Order, OrderType, SideType
+from order_book.double_linked_list import LinkedList, LinkedNode
+from order_book.fixed_point import FixedPointMatchingEngine
+from order_book.ladder import PriceLadderOrderBook
+from order_book.market_data import L2Feed
+from tests.common import book_levels
+
+
+def sorted_flow(seed: int, count: int):
+    rnd = random.Random(seed)
+    flow = []
+    for index in range(count):
+        side = rnd.choice([SideType.BUY, SideType.SELL])
+        offset = rnd.randint(1, 30)
+        price = 100 - offset if side == SideType.BUY else 100 + offset
+        flow.append((price, rnd.randint(1, 9), side, index))
+    return sorted(flow, key=lambda fields: fields[0])
+
+
+@pytest.mark.parametrize("ladder", [False, True])
+def test_bulk_load_same_as_add_order(ladder):
+    flow = sorted_flow(seed=1, count=2000)
+
+    loop_engine = MatchingEngine(PriceLadderOrderBook(1, 200, 1) if ladder else None)
+    for fields in flow:
+        loop_engine.add_order(Order(*fields))
+
+    bulk_engine = MatchingEngine(PriceLadderOrderBook(1, 200, 1) if ladder else None)
+    bulk_engine.bulk_load([Order(*fields) for fields in flow])
+
+    for side in (SideType.BUY, SideType.SELL):
+        assert book_levels(bulk_engine, side) == book_levels(loop_engine, side)
+    order_book = bulk_engine.order_book
+    assert order_book.best_bid_price_level.price == 99
+    assert order_book.best_ask_price_level.price == 101
+    assert bulk_engine.orders.keys() == loop_engine.orders.keys()
+
+    # the loaded book cancels and matches like any other
+    bulk_engine.cancel_order(bulk_engine.orders[flow[0][3]])
+    _, trades = bulk_engine.add_order(Order(price=200, quantity=5, side=SideType.BUY))
+    assert trades[0].price == 101
+
+
+def test_bulk_load_notifies_listeners():
+    matching_engine = MatchingEngine()
+    feed = L2Feed(matching_engine.order_book, depth=2)
+    matching_engine.bulk_load(
+        [
+            Order(price=9, quantity=1, side=SideType.BUY),
+            Order(price=10, quantity=2, side=SideType.BUY),
+            Order(price=10, quantity=3, side=SideType.BUY),
+            Order(price=12, quantity=4, side=SideType.SELL),
+        ]
+    )
+    feed.flush()
+    assert feed.depth(SideType.BUY) == [(10, 5), (9, 1)]
+    assert feed.depth(SideType.SELL) == [(12, 4)]
+
+
+def test_bulk_load_errors():
+    matching_engine = MatchingEngine()
+    with pytest.raises(ValueError):
+        matching_engine.bulk_load(
+            [
+                Order(price=10, quantity=1, side=SideType.BUY),
+                Order(price=9, quantity=1, side=SideType.BUY),
+            ]
+        )
+    with pytest.raises(ValueError):
+        matching_engine.bulk_load(
+            [
+                Order(price=10, quantity=1, side=SideType.SELL),
+                Order(price=11, quantity=1, side=SideType.BUY),
+            ]
+        )
+    assert matching_engine.order_book.is_empty_bids()
+    assert matching_engine.order_book.is_empty_asks()
+
+    matching_engine.add_order(Order(price=1, quantity=1, side=SideType.BUY))
+    with pytest.raises(ValueError):
+        matching_engine.bulk_load([Order(price=2, quantity=1, side=SideType.BUY)])
+    matching_engine.bulk_load([Order(price=5, quantity=1, side=SideType.SELL)])
+    assert matching_engine.order_book.best_ask_price_level.price == 5
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"order_type": OrderType.IOC},
+        {"order_type": OrderType.FOK},
+        {"order_type": OrderType.MARKET},
+        {"order_type": OrderType.STOP, "stop_price": 9},
+        {"order_type": OrderType.STOP_LIMIT, "stop_price": 9},
+    ],
+)
+def test_bulk_load_rejects_orders_that_do_not_rest(kwargs):
+    matching_engine = MatchingEngine()
+    with pytest.raises(ValueError):
+        matching_engine.bulk_load(
+            [
+                Order(price=8, quantity=1, side=SideType.BUY),
+                Order(price=10, quantity=1, side=SideType.SELL, **kwargs),
+            ]
+        )
+    assert matching_engine.order_book.is_empty_bids()
+    assert matching_engine.orders == {}
+
+
+@pytest.mark.parametrize("ladder", [False, True])
+def test_bulk_load_leaves_orders_untouched_on_error(ladder):
+    matching_engine = MatchingEngine(PriceLadderOrderBook(1, 10, 1) if ladder else None)
+    iceberg = Order(price=5, quantity=6, side=SideType.BUY, display_quantity=2)
+    inputs = [
+        [iceberg, Order(price=4, quantity=1, side=SideType.BUY)],
+        [iceberg, Order(price=5, quantity=1, side=SideType.SELL)],
+    ]
+    if ladder:
+        inputs.append([iceberg, Order(price=11, quantity=1, side=SideType.SELL)])
+    for orders in inputs:
+        with pytest.raises(ValueError):
+            matching_engine.bulk_load(orders)
+        assert (iceberg.remained_quantity, iceberg.hidden_quantity) == (6, 0)
+        assert iceberg.price_level is None and iceberg.linked_node is None
+    assert matching_engine.order_book.is_empty_bids()
+    assert matching_engine.order_book.is_empty_asks()
+
+
+def test_fixed_point_bulk_load():
+    matching_engine = FixedPointMatchingEngine(tick_size=0.5, lot_size=0.1)
+    orders = [
+        Order(price=99.5, quantity=0.3, side=SideType.BUY, id="b"),
+        Order(
+            price=100.5, quantity=1, side=SideType.SELL, id="s", display_quantity=0.2
+        ),
+    ]
+    matching_engine.bulk_load(orders)
+    assert [(o.price, o.remained_quantity, o.hidden_quantity) for o in orders] == [
+        (199, 3, 0),
+        (201, 2, 8),
+    ]
+    _, trades = matching_engine.add_order(
+        Order(price=100.5, quantity=0.3, side=SideType.BUY)
+    )
+    assert [(t.order_id, t.price, t.quantity) for t in trades[::2]] == [
+        ("s", 100.5, 0.2),
+        ("s", 100.5, pytest.approx(0.1)),
+    ]
+
+    # a rejected load leaves the orders in prices and quantities
+    matching_engine = FixedPointMatchingEngine(tick_size=0.5, lot_size=0.1)
+    orders = [
+        Order(price=99.5, quantity=0.3, side=SideType.BUY),
+        Order(price=100.25, quantity=1, side=SideType.SELL),
+    ]
+    with pytest.raises(ValueError):
+        matching_engine.bulk_load(orders)
+    assert [(o.price, o.quantity) for o in orders] == [(99.5, 0.3), (100.25, 1)]
+    assert matching_engine.order_book.is_empty_bids()
+
+
+def test_linked_list_extend():
+    linked_list: LinkedList = LinkedList()
+    linked_list.add(0, 0)
+    linked_list.extend([LinkedNode(key, key) for key in range(1, 4)])
+    linked_list.extend([])
+    assert linked_list.get_all_values() == [0, 1, 2, 3]
+    assert linked_list.size == 4
+    assert linked_list.tail.prev.key == 2
+    assert linked_list.pop().key == 0
@@ -0,0 +1,85 @@
+import pytest
+
+from order_book import Order, SideType, MatchingEngine
+from order_book.double_linked_list import LinkedList
+from order_book.trade_sinks import ListTradeSink
+
+
+def test_linked_list_add_returns_node():
+    ll = LinkedList[int, int]()
+    node_1 = ll.add(1, 1)
+    node_2 = ll.add_head(2, 2)
+    assert node_1.key == 1
+    assert node_2.key == 2
+    assert ll.head is node_2
+    assert ll.tail is node_1
+
+
+def test_linked_list_remove_node():
+    ll = LinkedList[int, int]()
+    nodes = [ll.add(i, i) for i in range(5)]
+
+    ll.remove_node(nodes[2])
+    assert ll.get_all_values() == [0, 1, 3, 4]
+    ll.remove_node(nodes[0])
+    assert ll.get_all_values() == [1, 3, 4]
+    ll.remove_node(nodes[4])
+    assert ll.get_all_values() == [1, 3]
+    ll.remove_node(nodes[1])
+    ll.remove_node(nodes[3])
+    assert ll.size == 0
+    assert ll.head is None
+    assert ll.tail is None
+
+
+def test_cancel_order_1():
+    matching_engine = MatchingEngine()
+    orders = [Order(price=2, quantity=i + 1, side=SideType.BUY) for i in range(4)]
+    for order in orders:
+        matching_engine.add_order(order)
+
+    price_level = orders[0].price_level
+    assert orders[2].linked_node is not None
+
+    matching_engine.cancel_order(orders[2])
+    assert orders[2].linked_node is None
+    assert orders[2].price_level is None
+    assert price_level.total_quantity == 7
+    assert price_level.orders.get_all_values() == [orders[0], orders[1], orders[3]]
+
+    matching_engine.cancel_order(orders[2])
+    assert price_level.total_quantity == 7
+
+
+def test_cancel_order_2():
+    matching_engine = MatchingEngine()
+    order_buy = Order(price=2, quantity=2, side=SideType.BUY)
+    matching_engine.add_order(order_buy)
+    order_sell = Order(price=2, quantity=3, side=SideType.SELL)
+    matching_engine.add_order(order_sell)
+
+    assert order_buy.price_level is None
+    assert order_sell.remained_quantity == 1
+    assert matching_engine.order_book.best_ask_price_level.total_quantity == 1
+
+    matching_engine.cancel_order(order_buy)
+    matching_engine.cancel_order(order_sell)
+    assert matching_engine.order_book.best_ask_price_level is None
+    assert matching_engine.order_book.is_empty_asks()
+
+
+@pytest.mark.parametrize("trade_sink", [None, ListTradeSink])
+def test_filled_orders_leave_the_index(trade_sink):
+    matching_engine = MatchingEngine(trade_sink=trade_sink and trade_sink())
+    for index in range(10_000):
+        matching_engine.add_order(Order(price=2, quantity=1, side=SideType.BUY))
+        matching_engine.add_order(Order(price=2, quantity=1, side=SideType.SELL))
+    assert matching_engine.orders == {}
+
+    # partly filled makers stay until their last fill
+    maker = Order(price=3, quantity=5, side=SideType.SELL, id="maker")
+    matching_engine.add_order(maker)
+    matching_engine.add_order(Order(price=3, quantity=2, side=SideType.BUY))
+    assert matching_engine.orders == {"maker": maker}
+    matching_engine.add_order(Order(price=4, quantity=4, side=SideType.BUY, id="b"))
+    assert list(matching_engine.orders) == ["b"]
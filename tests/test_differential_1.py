@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+from order_book import MatchingEngine, ModifyOrderData, Order, OrderBook, SideType
+from order_book.ladder import PriceLadderOrderBook
+from order_book.pool import BookPool
+
+from .differential import ReferenceBook, run_differential
+
+# raise it to run millions of operations, or run python -m tests.differential
+OPERATIONS = int(os.environ.get("DIFFERENTIAL_OPERATIONS", "20000"))
+
+ORDER_BOOKS = {
+    "tree": lambda: OrderBook(),
+    "pooled": lambda: OrderBook(pool=BookPool(level_capacity=4, node_capacity=16)),
+    "ladder": lambda: PriceLadderOrderBook(1, 200, 1),
+}
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+@pytest.mark.parametrize("name", sorted(ORDER_BOOKS))
+def test_engine_same_as_reference_book(name, seed):
+    run_differential(MatchingEngine(ORDER_BOOKS[name]()), seed, OPERATIONS)
+
+
+def test_best_price_cache():
+    matching_engine = MatchingEngine()
+    order_book = matching_engine.order_book
+    assert (order_book.best_bid_price, order_book.best_ask_price) == (
+        float("-inf"),
+        float("inf"),
+    )
+    matching_engine.add_order(Order(price=10, quantity=1, side=SideType.BUY, id=1))
+    matching_engine.add_order(Order(price=12, quantity=1, side=SideType.SELL, id=2))
+    matching_engine.add_order(Order(price=11, quantity=1, side=SideType.SELL, id=3))
+    assert (order_book.best_bid_price, order_book.best_ask_price) == (10, 11)
+    assert list(order_book.ask_price_levels) == [12, 11]
+
+    matching_engine.add_order(Order(price=11, quantity=1, side=SideType.BUY, id=4))
+    assert order_book.best_ask_price == 12
+    matching_engine.cancel_order(matching_engine.orders[1])
+    assert order_book.best_bid_price == float("-inf")
+    assert order_book.bid_price_levels == {}
+
+
+def test_filled_order_cannot_be_amended():
+    matching_engine = MatchingEngine()
+    reference = ReferenceBook()
+    matching_engine.add_order(Order(price=10, quantity=1, side=SideType.BUY, id=1))
+    matching_engine.add_order(Order(price=10, quantity=1, side=SideType.SELL, id=2))
+    reference.add(1, SideType.BUY, 10, 1)
+    reference.add(2, SideType.SELL, 10, 1)
+
+    order, trades = matching_engine.modify_order(ModifyOrderData(id=1, quantity=5))
+    assert (order, trades) == (None, [])
+    assert reference.modify(1, quantity=5) == []
+    assert matching_engine.order_book.is_empty_bids()
@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from order_book import Order, SideType
+from order_book.fixed_point import FixedPointConverter, FixedPointMatchingEngine
+
+
+def test_converter():
+    converter = FixedPointConverter(tick_size=0.01, lot_size=0.1)
+    assert converter.to_ticks(100.07) == 10007
+    assert converter.to_lots(0.3) == 3
+    assert converter.to_price(10007) == pytest.approx(100.07)
+    assert converter.to_quantity(3) == pytest.approx(0.3)
+    with pytest.raises(ValueError):
+        converter.to_ticks(100.005)
+    with pytest.raises(ValueError):
+        converter.to_lots(0.15)
+
+
+def test_fixed_point_engine():
+    matching_engine = FixedPointMatchingEngine(tick_size=0.01, lot_size=0.1)
+    order_buy, trades = matching_engine.add_order(
+        Order(price=100.01, quantity=0.3, side=SideType.BUY)
+    )
+    assert trades == []
+    assert order_buy.price == 10001
+    assert order_buy.remained_quantity == 3
+    assert isinstance(order_buy.price, int)
+
+    _, trades = matching_engine.add_order(
+        Order(price=100.0, quantity=0.1, side=SideType.SELL)
+    )
+    assert [(t.price, t.quantity) for t in trades] == [
+        (pytest.approx(100.01), pytest.approx(0.1)),
+        (pytest.approx(100.01), pytest.approx(0.1)),
+    ]
+    assert matching_engine.order_book.best_bid_price_level.price == 10001
+    assert matching_engine.order_book.best_bid_price_level.total_quantity == 2
+
+
+def test_rejected_order_is_not_converted():
+    matching_engine = FixedPointMatchingEngine(tick_size=0.01, lot_size=0.1)
+    order = Order(price=100.01, quantity=0.15, side=SideType.BUY)
+    with pytest.raises(ValueError):
+        matching_engine.add_order(order)
+    assert (order.price, order.quantity, order.remained_quantity) == (
+        100.01,
+        0.15,
+        0.15,
+    )
+    assert matching_engine.order_book.is_empty_bids()
+
+
+def test_fixed_point_no_drift():
+    rnd = random.Random(3)
+    matching_engine = FixedPointMatchingEngine(tick_size=0.01, lot_size=0.1)
+    for _ in range(20):
+        matching_engine.add_order(Order(price=10.0, quantity=1000.0, side=SideType.BUY))
+    for _ in range(2000):
+        quantity = rnd.randint(1, 30) / 10
+        matching_engine.add_order(
+            Order(price=10.0, quantity=quantity, side=SideType.SELL)
+        )
+
+    price_level = matching_engine.order_book.best_bid_price_level
+    remained = sum(
+        order.remained_quantity for order in price_level.orders.get_all_values()
+    )
+    assert price_level.total_quantity == remained
@@ -0,0 +1,201 @@
+import asyncio
+import socket
+import struct
+
+from order_book import MatchingEngine, Order, OrderType, SideType
+from order_book.gateway import (
+    ACCEPTED,
+    CANCELLED,
+    FRAME_HEADER,
+    REJECTED,
+    TRADE,
+    Gateway,
+    GatewayClient,
+    decode_message,
+    encode_add,
+    encode_cancel,
+    run_load,
+)
+from order_book.ladder import PriceLadderOrderBook
+
+
+def test_encode_decode():
+    message_type, order = decode_message(
+        encode_add(Order(price=1.5, quantity=2, side=SideType.SELL, id="x"))[4:]
+    )
+    assert message_type == 1
+    assert (order.id, order.price, order.quantity, order.side) == (
+        "x",
+        1.5,
+        2,
+        SideType.SELL,
+    )
+
+
+async def _exchange():
+    gateway = Gateway()
+    server = await gateway.start_tcp()
+    port = server.sockets[0].getsockname()[1]
+    buyer = await GatewayClient.connect_tcp("127.0.0.1", port)
+    seller = await GatewayClient.connect_tcp("127.0.0.1", port)
+
+    await buyer.add_order(Order(price=10, quantity=3, side=SideType.BUY, id="b-1"))
+    buyer_messages = [await buyer.read_message()]
+    await seller.add_order(Order(price=10, quantity=2, side=SideType.SELL, id="s-1"))
+    seller_messages = [await seller.read_message(), await seller.read_message()]
+    buyer_messages.append(await buyer.read_message())
+
+    await seller.cancel_order("b-1")
+    seller_messages.append(await seller.read_message())
+    await buyer.cancel_order("b-1")
+    buyer_messages.append(await buyer.read_message())
+    await buyer.add_order(Order(price=10, quantity=3, side=SideType.BUY, id="s-1"))
+    buyer_messages.append(await buyer.read_message())
+
+    await buyer.close()
+    await seller.close()
+    await gateway.close()
+    return buyer_messages, seller_messages
+
+
+def test_gateway_exchange():
+    buyer_messages, seller_messages = asyncio.run(_exchange())
+    assert buyer_messages == [
+        (ACCEPTED, "b-1", 3),
+        (TRADE, "b-1", SideType.BUY, 10, 2),
+        (CANCELLED, "b-1"),
+        (ACCEPTED, "s-1", 3),
+    ]
+    assert seller_messages == [
+        (ACCEPTED, "s-1", 0),
+        (TRADE, "s-1", SideType.SELL, 10, 2),
+        (REJECTED, "b-1"),
+    ]
+
+
+async def _malformed():
+    gateway = Gateway(MatchingEngine(PriceLadderOrderBook(1, 100, 1)))
+    server = await gateway.start_tcp()
+    port = server.sockets[0].getsockname()[1]
+    client = await GatewayClient.connect_tcp("127.0.0.1", port)
+
+    frame = bytearray(
+        encode_add(Order(price=10, quantity=1, side=SideType.BUY, id="x"))
+    )
+    frame[5] |= 0x70  # no such order type
+    for payload in (bytes(frame[4:]), b"\x01\x00"):
+        client.writer.write(FRAME_HEADER.pack(len(payload)) + payload)
+    # out of the ladder's price band
+    await client.add_order(Order(price=200, quantity=1, side=SideType.BUY, id="y"))
+    await client.add_order(Order(price=10, quantity=1, side=SideType.BUY, id="z"))
+    messages = [await client.read_message() for _ in range(4)]
+
+    await client.close()
+    await gateway.close()
+    return messages
+
+
+def test_malformed_messages_are_rejected():
+    assert asyncio.run(_malformed()) == [
+        (REJECTED, "x"),
+        (REJECTED, ""),
+        (REJECTED, "y"),
+        (ACCEPTED, "z", 1),
+    ]
+
+
+async def _triggered_stop():
+    gateway = Gateway()
+    server = await gateway.start_tcp()
+    port = server.sockets[0].getsockname()[1]
+    owner = await GatewayClient.connect_tcp("127.0.0.1", port)
+    trader = await GatewayClient.connect_tcp("127.0.0.1", port)
+
+    stop = Order(
+        price=0,
+        quantity=2,
+        side=SideType.BUY,
+        id="stop",
+        order_type=OrderType.STOP,
+        stop_price=10,
+    )
+    await owner.add_order(stop)
+    owner_messages = [await owner.read_message()]
+    await trader.add_order(Order(price=10, quantity=1, side=SideType.SELL, id="s"))
+    await trader.add_order(Order(price=10, quantity=1, side=SideType.BUY, id="b"))
+    trader_messages = [await trader.read_message() for _ in range(4)]
+    # the triggered stop finds no liquidity, its remainder is dropped
+    owner_messages.append(await owner.read_message())
+    owners = dict(gateway.owners)
+
+    await owner.close()
+    await trader.close()
+    await gateway.close()
+    return owner_messages, trader_messages, owners
+
+
+def test_dropped_stop_remainder_is_cancelled():
+    owner_messages, trader_messages, owners = asyncio.run(_triggered_stop())
+    assert owner_messages == [(ACCEPTED, "stop", 2), (CANCELLED, "stop")]
+    assert [message[0] for message in trader_messages] == [
+        ACCEPTED,
+        ACCEPTED,
+        TRADE,
+        TRADE,
+    ]
+    assert owners == {}
+
+
+async def _load(path):
+    gateway = Gateway(queue_size=10, batch_size=8)
+    await gateway.start_unix(path)
+    clients = [await GatewayClient.connect_unix(path) for _ in range(2)]
+    histograms = await asyncio.gather(
+        *(
+            run_load(client, count=300, window=20, seed=i)
+            for i, client in enumerate(clients)
+        )
+    )
+    for client in clients:
+        await client.close()
+    await gateway.close()
+    return histograms
+
+
+def test_gateway_load(tmp_path):
+    histograms = asyncio.run(_load(str(tmp_path / "gateway.sock")))
+    assert [histogram.count for histogram in histograms] == [300, 300]
+
+
+async def _reset_while_backpressured():
+    gateway = Gateway()
+    server = await gateway.start_tcp()
+    port = server.sockets[0].getsockname()[1]
+    flooder = await GatewayClient.connect_tcp("127.0.0.1", port)
+    sock = flooder.writer.get_extra_info("socket")
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    client = await GatewayClient.connect_tcp("127.0.0.1", port)
+
+    # every cancel of an unknown id is answered with a REJECTED the flooder
+    # never reads, until the gateway waits on its transport
+    frame = encode_cancel("x" * 500)
+    while not any(
+        connection.writer.transport.get_write_buffer_size() > 2**16
+        for connection in gateway.connections
+    ):
+        flooder.writer.write(frame * 100)
+        await asyncio.sleep(0.01)
+
+    # a reset instead of a close
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+    flooder.writer.transport.abort()
+    await client.add_order(Order(price=10, quantity=1, side=SideType.BUY, id="b"))
+    message = await asyncio.wait_for(client.read_message(), timeout=5)
+
+    await client.close()
+    await gateway.close()
+    return message
+
+
+def test_reset_while_backpressured():
+    assert asyncio.run(_reset_while_backpressured()) == (ACCEPTED, "b", 1)
@@ -0,0 +1,207 @@
+import random
+
+import pytest
+
+from order_book import (
+    MatchingEngine,
+    ModifyOrderData,
+    Order,
+    OrderBook,
+    OrderType,
+    SideType,
+)
+from order_book.fixed_point import FixedPointMatchingEngine
+from order_book.gateway import decode_message, encode_add
+from order_book.journal import Journal, read_journal
+from order_book.l3 import L3MirrorBook, L3RecordWriter, read_l3_records
+from order_book.pool import BookPool
+from order_book.snapshot import dump_snapshot, load_snapshot
+from order_book.views import BookViews
+
+
+def iceberg(price, quantity, display, side=SideType.SELL, id=None):
+    return Order(price, quantity, side, id=id, display_quantity=display)
+
+
+def queue(matching_engine: MatchingEngine, side: SideType, price):
+    price_levels = (
+        matching_engine.order_book.bid_price_levels
+        if side == SideType.BUY
+        else matching_engine.order_book.ask_price_levels
+    )
+    return [
+        (order.id, order.remained_quantity, order.hidden_quantity)
+        for order in price_levels[price].orders.get_all_values()
+    ]
+
+
+def test_only_the_display_quantity_is_shown():
+    views = BookViews()
+    matching_engine = MatchingEngine(views=views)
+    matching_engine.add_order(iceberg(101, 10, 3, id="ice"))
+    matching_engine.add_order(Order(101, 2, SideType.SELL, id="s"))
+    order_book = matching_engine.order_book
+    assert order_book.best_ask_price_level.total_quantity == 5
+    assert views.view.asks == ((101, 5),)
+    assert queue(matching_engine, SideType.SELL, 101) == [("ice", 3, 7), ("s", 2, 0)]
+    assert matching_engine.orders["ice"].matched_quantity == 0
+
+    with pytest.raises(ValueError):
+        iceberg(101, 10, 0)
+
+
+@pytest.mark.parametrize("pooled", [False, True])
+def test_filled_slice_is_replenished_at_the_tail(pooled):
+    matching_engine = MatchingEngine(OrderBook(BookPool()) if pooled else None)
+    matching_engine.add_order(iceberg(101, 7, 3, id="ice"))
+    matching_engine.add_order(Order(101, 2, SideType.SELL, id="s"))
+    order_book = matching_engine.order_book
+    price_level = order_book.best_ask_price_level
+    node = matching_engine.orders["ice"].linked_node
+
+    _, trades = matching_engine.add_order(Order(101, 4, SideType.BUY, id="b"))
+    assert [(t.order_id, t.quantity) for t in trades] == [
+        ("ice", 3),
+        ("b", 3),
+        ("s", 1),
+        ("b", 1),
+    ]
+    # same level and node, the slice moved behind "s"
+    assert order_book.best_ask_price_level is price_level
+    assert list(order_book.best_price_levels(SideType.SELL)) == [price_level]
+    assert matching_engine.orders["ice"].linked_node is node
+    assert queue(matching_engine, SideType.SELL, 101) == [("s", 1, 0), ("ice", 3, 1)]
+    assert price_level.total_quantity == 4
+
+    # a single iceberg keeps refreshing itself until its reserve runs out
+    _, trades = matching_engine.add_order(Order(101, 10, SideType.BUY, id="b2"))
+    assert [(t.order_id, t.quantity) for t in trades[::2]] == [
+        ("s", 1),
+        ("ice", 3),
+        ("ice", 1),
+    ]
+    assert "ice" not in matching_engine.orders
+    assert order_book.is_empty_asks()
+    assert order_book.best_bid_price_level.total_quantity == 5
+
+
+def test_aggressive_iceberg_rests_its_remainder_as_an_iceberg():
+    matching_engine = MatchingEngine()
+    matching_engine.add_order(Order(100, 2, SideType.SELL, id="s"))
+    matching_engine.add_order(iceberg(100, 10, 3, side=SideType.BUY, id="ice"))
+    assert queue(matching_engine, SideType.BUY, 100) == [("ice", 3, 5)]
+    assert matching_engine.orders["ice"].matched_quantity == 2
+
+
+def test_amend_cuts_the_reserve_first():
+    matching_engine = MatchingEngine()
+    matching_engine.add_order(iceberg(101, 10, 3, id="ice"))
+    matching_engine.add_order(Order(101, 2, SideType.SELL, id="s"))
+    matching_engine.add_order(Order(101, 1, SideType.BUY))
+
+    # 9 open, the reserve goes from 7 to 2 and the order keeps its place
+    matching_engine.modify_order(ModifyOrderData(id="ice", quantity=6))
+    assert queue(matching_engine, SideType.SELL, 101) == [("ice", 2, 3), ("s", 2, 0)]
+    matching_engine.modify_order(ModifyOrderData(id="ice", quantity=2))
+    assert queue(matching_engine, SideType.SELL, 101) == [("ice", 1, 0), ("s", 2, 0)]
+
+    # an increase goes to the back with a fresh display split
+    matching_engine.modify_order(ModifyOrderData(id="ice", quantity=11))
+    assert queue(matching_engine, SideType.SELL, 101) == [("s", 2, 0), ("ice", 3, 7)]
+    assert matching_engine.order_book.best_ask_price_level.total_quantity == 5
+
+
+def test_l3_mirror_follows_replenishment():
+    matching_engine = MatchingEngine()
+    chunks = []
+    writer = L3RecordWriter(
+        matching_engine.order_book, lambda view: chunks.append(bytes(view))
+    )
+    rnd = random.Random(4)
+    for index in range(3000):
+        side = rnd.choice([SideType.BUY, SideType.SELL])
+        display = rnd.randint(1, 3) if rnd.random() < 0.3 else None
+        matching_engine.add_order(
+            Order(
+                rnd.randint(95, 105),
+                rnd.randint(1, 12),
+                side,
+                id=index,
+                display_quantity=display,
+            )
+        )
+    writer.close()
+
+    mirror = L3MirrorBook()
+    for event in read_l3_records(b"".join(chunks)):
+        mirror.apply(event)
+    for side in (SideType.BUY, SideType.SELL):
+        assert mirror.price_levels(side) == [
+            (
+                price_level.price,
+                price_level.total_quantity,
+                [order.id for order in price_level.orders.get_all_values()],
+            )
+            for price_level in matching_engine.order_book.best_price_levels(side)
+        ]
+
+
+def test_snapshot_keeps_icebergs_and_pending_stops():
+    matching_engine = MatchingEngine()
+    matching_engine.add_order(iceberg(101, 10, 3, id="ice"))
+    matching_engine.add_order(Order(101, 1, SideType.BUY))
+    matching_engine.add_order(
+        Order(
+            99,
+            4,
+            SideType.SELL,
+            id="stop",
+            order_type=OrderType.STOP_LIMIT,
+            stop_price=100,
+            display_quantity=2,
+        )
+    )
+
+    restored, _ = load_snapshot(dump_snapshot(matching_engine))
+    order = restored.orders["ice"]
+    assert (order.remained_quantity, order.hidden_quantity) == (2, 7)
+    assert order.display_quantity == 3
+    stop = restored.orders["stop"]
+    assert (stop.order_type, stop.stop_price, stop.display_quantity) == (
+        OrderType.STOP_LIMIT,
+        100,
+        2,
+    )
+
+    # the restored book keeps replenishing, and the stop still triggers
+    _, trades = restored.add_order(Order(101, 4, SideType.BUY))
+    assert [(t.order_id, t.quantity) for t in trades[::2]] == [("ice", 2), ("ice", 2)]
+    restored.add_order(Order(100, 1, SideType.BUY, id="b"))
+    _, trades = restored.add_order(Order(100, 1, SideType.SELL, id="s"))
+    assert [t.order_id for t in trades] == ["b", "s"]
+    assert queue(restored, SideType.SELL, 99) == [("stop", 2, 2)]
+
+
+def test_display_quantity_in_fixed_point_journal_and_gateway(tmp_path):
+    matching_engine = FixedPointMatchingEngine(tick_size=0.5, lot_size=0.1)
+    matching_engine.add_order(iceberg(100.5, 1, 0.3, id="ice"))
+    order = matching_engine.orders["ice"]
+    assert (order.display_quantity, order.remained_quantity, order.hidden_quantity) == (
+        3,
+        3,
+        7,
+    )
+
+    order = iceberg(100.5, 1, 0.3, id="x")
+    _, decoded = decode_message(encode_add(order)[4:])
+    assert (decoded.side, decoded.display_quantity) == (SideType.SELL, 0.3)
+
+    journal = Journal(str(tmp_path / "journal"), fsync=False)
+    journal.append_add(order)
+    journal.append_add(Order(100, 1, SideType.BUY, id="y"))
+    journal.close()
+    records = [record.message for record, _ in read_journal(str(tmp_path / "journal"))]
+    assert [(o.side, o.display_quantity) for o in records] == [
+        (SideType.SELL, 0.3),
+        (SideType.BUY, None),
+    ]
@@ -0,0 +1,134 @@
+import random
+
+import pytest
+
+from order_book import MatchingEngine, ModifyOrderData, Order, SideType
+from order_book.journal import Journal, JournaledMatchingEngine, read_journal, recover
+from order_book.ladder import PriceLadderOrderBook
+
+
+def book_state(matching_engine: MatchingEngine):
+    return [
+        [
+            (price_level.price, [o.id for o in price_level.orders.get_all_values()])
+            for price_level in matching_engine.order_book.best_price_levels(side)
+        ]
+        for side in (SideType.BUY, SideType.SELL)
+    ]
+
+
+def run_flow(engine, seed: int, count: int):
+    rnd = random.Random(seed)
+    orders = []
+    for _ in range(count):
+        if orders and rnd.random() < 0.2:
+            engine.cancel_order(orders.pop(rnd.randrange(len(orders))))
+            continue
+        side = rnd.choice([SideType.BUY, SideType.SELL])
+        order, _ = engine.add_order(
+            Order(price=rnd.randint(1, 30), quantity=rnd.randint(1, 5), side=side)
+        )
+        orders.append(order)
+
+
+def test_group_commit(tmp_path):
+    journal = Journal(str(tmp_path / "journal"), batch_size=3, fsync=False)
+    committed = []
+    journal.commit_listeners.append(committed.append)
+    engine = JournaledMatchingEngine(MatchingEngine(), journal)
+
+    engine.add_order(Order(price=1, quantity=1, side=SideType.BUY))
+    engine.add_order(Order(price=2, quantity=1, side=SideType.BUY))
+    assert journal.committed_sequence == 0
+    assert list(read_journal(journal.path)) == []
+
+    engine.add_order(Order(price=3, quantity=1, side=SideType.BUY))
+    assert journal.committed_sequence == 3
+    assert committed == [3]
+    assert len(list(read_journal(journal.path))) == 3
+
+    engine.close()
+    assert journal.commits == 1
+
+
+def test_commit_interval(tmp_path):
+    journal = Journal(str(tmp_path / "journal"), batch_size=100, commit_interval=0)
+    journal.append_cancel("order-1")
+    assert journal.committed_sequence == 1
+    journal.close()
+
+
+def test_journal_as_context_manager(tmp_path):
+    path = str(tmp_path / "journal")
+    with Journal(path, batch_size=100, fsync=False) as journal:
+        journal.append_cancel("order-1")
+    assert journal.file.closed
+    assert [record.message.id for record, _ in read_journal(path)] == ["order-1"]
+    journal.close()
+
+
+def test_recover_snapshot_and_journal(tmp_path):
+    snapshot_path = str(tmp_path / "snapshot")
+    journal_path = str(tmp_path / "journal")
+
+    journal = Journal(journal_path, batch_size=16)
+    engine = JournaledMatchingEngine(MatchingEngine(), journal)
+    run_flow(engine, seed=1, count=300)
+    engine.checkpoint(snapshot_path)
+    run_flow(engine, seed=2, count=300)
+    engine.close()
+    expected = book_state(engine.matching_engine)
+    order_count = Order.ID_GENERATOR.count
+
+    # torn write at the end of the journal
+    with open(journal_path, "ab") as file:
+        file.write(b"\x10\x00\x00\x00garbage")
+
+    Order.ID_GENERATOR.count = 0
+    recovered, sequence = recover(snapshot_path, journal_path)
+    assert sequence == journal.sequence
+    assert book_state(recovered) == expected
+    assert Order.ID_GENERATOR.count == order_count
+    assert len(list(read_journal(journal_path))) == journal.sequence
+
+    journal = Journal(journal_path, sequence=sequence)
+    journal.append_cancel("order-1")
+    journal.close()
+    _, sequence = recover(snapshot_path, journal_path)
+    assert sequence == journal.sequence
+
+
+def test_recover_without_snapshot(tmp_path):
+    journal_path = str(tmp_path / "journal")
+    journal = Journal(journal_path, fsync=False)
+    engine = JournaledMatchingEngine(MatchingEngine(), journal)
+    run_flow(engine, seed=3, count=200)
+    engine.close()
+
+    recovered, sequence = recover(str(tmp_path / "missing"), journal_path)
+    assert sequence == 200
+    assert book_state(recovered) == book_state(engine.matching_engine)
+
+
+def test_recover_skips_rejected_messages(tmp_path):
+    journal_path = str(tmp_path / "journal")
+    journal = Journal(journal_path, fsync=False)
+    engine = JournaledMatchingEngine(
+        MatchingEngine(PriceLadderOrderBook(1, 10, 1)), journal
+    )
+    engine.add_order(Order(price=5, quantity=1, side=SideType.BUY, id="a"))
+    with pytest.raises(ValueError):
+        engine.add_order(Order(price=50, quantity=1, side=SideType.BUY, id="b"))
+    with pytest.raises(ValueError):
+        engine.modify_order(ModifyOrderData("a", price=0))
+    engine.add_order(Order(price=6, quantity=1, side=SideType.BUY, id="c"))
+    engine.close()
+
+    recovered, sequence = recover(
+        str(tmp_path / "missing"),
+        journal_path,
+        MatchingEngine(PriceLadderOrderBook(1, 10, 1)),
+    )
+    assert sequence == 4
+    assert book_state(recovered) == book_state(engine.matching_engine)
+    assert book_state(recovered)[0] == [(6, ["c"]), (5, ["a"])]
@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+from order_book import MatchingEngine, Order, SideType
+from order_book.l3 import (
+    ADD,
+    CANCEL,
+    FILL,
+    REQUEUE,
+    L3MirrorBook,
+    L3RecordWriter,
+    read_l3_records,
+)
+from order_book.ladder import PriceLadderOrderBook
+from tests.common import book_levels
+
+
+def test_l3_events():
+    matching_engine = MatchingEngine()
+    chunks = []
+    writer = L3RecordWriter(
+        matching_engine.order_book, lambda view: chunks.append(bytes(view))
+    )
+
+    maker_1 = Order(price=10, quantity=2, side=SideType.BUY, id=1)
+    maker_2 = Order(price=10, quantity=3, side=SideType.BUY, id="m-2")
+    matching_engine.add_order(maker_1)
+    matching_engine.add_order(maker_2)
+    matching_engine.add_order(Order(price=10, quantity=3, side=SideType.SELL, id=3))
+    matching_engine.cancel_order(maker_2)
+    writer.close()
+
+    events = [
+        (event.action, event.order_id, event.quantity)
+        for event in read_l3_records(b"".join(chunks))
+    ]
+    assert events == [
+        (ADD, 1, 2),
+        (ADD, "m-2", 3),
+        (FILL, 1, 2),
+        (FILL, "m-2", 1),
+        (REQUEUE, "m-2", 2),
+        (CANCEL, "m-2", 2),
+    ]
+    assert matching_engine.order_book.order_listeners == []
+
+
+@pytest.mark.parametrize("ladder", [False, True])
+def test_l3_mirror_book(ladder):
+    rnd = random.Random(12)
+    order_book = PriceLadderOrderBook(1, 20, 1) if ladder else None
+    matching_engine = MatchingEngine(order_book)
+    mirror = L3MirrorBook()
+
+    def apply(view):
+        for event in read_l3_records(view):
+            mirror.apply(event)
+
+    writer = L3RecordWriter(matching_engine.order_book, apply, buffer_size=256)
+
+    orders = []
+    for index in range(3000):
+        if orders and rnd.random() < 0.3:
+            matching_engine.cancel_order(orders.pop(rnd.randrange(len(orders))))
+        else:
+            order, _ = matching_engine.add_order(
+                Order(
+                    price=rnd.randint(1, 20),
+                    quantity=rnd.randint(1, 6),
+                    side=rnd.choice([SideType.BUY, SideType.SELL]),
+                    id=index if index % 2 else f"o-{index}",
+                )
+            )
+            orders.append(order)
+
+        if index % 100 == 0:
+            writer.flush()
+            for side in (SideType.BUY, SideType.SELL):
+                assert mirror.price_levels(side) == book_levels(matching_engine, side)
+
+    writer.flush()
+    for side in (SideType.BUY, SideType.SELL):
+        assert mirror.price_levels(side) == book_levels(matching_engine, side)
@@ -0,0 +1,122 @@
+import random
+
+import pytest
+
+from order_book import (
+    MatchingEngine,
+    ModifyOrderData,
+    Order,
+    OrderBook,
+    OrderType,
+    SideType,
+)
+from order_book.ladder import PriceLadderOrderBook
+
+
+def book_levels(order_book: OrderBook, side: SideType):
+    return [
+        (price_level.price, price_level.total_quantity)
+        for price_level in order_book.best_price_levels(side)
+        if not price_level.has_no_orders()
+    ]
+
+
+def test_ladder_add_order_1():
+    order_book = PriceLadderOrderBook(min_price=1, max_price=10, tick_size=1)
+    matching_engine = MatchingEngine(order_book)
+    inputs = [
+        Order(price=1, quantity=3, side=SideType.BUY),
+        Order(price=2, quantity=2, side=SideType.BUY),
+        Order(price=3, quantity=1, side=SideType.BUY),
+        Order(price=4, quantity=1, side=SideType.SELL),
+        Order(price=5, quantity=2, side=SideType.SELL),
+        Order(price=6, quantity=3, side=SideType.SELL),
+        Order(price=1, quantity=5, side=SideType.SELL),
+    ]
+    for order in inputs:
+        matching_engine.add_order(order)
+
+    assert book_levels(order_book, SideType.SELL) == [(4, 1), (5, 2), (6, 3)]
+    assert book_levels(order_book, SideType.BUY) == [(1, 1)]
+    assert order_book.best_bid_price_level.price == 1
+    assert order_book.best_ask_price_level.price == 4
+
+
+def test_ladder_price_band():
+    order_book = PriceLadderOrderBook(min_price=1, max_price=2, tick_size=0.5)
+    assert order_book.size == 3
+    assert order_book.price_to_index(1.5) == 1
+    with pytest.raises(ValueError):
+        order_book.add_order(Order(price=2.5, quantity=1, side=SideType.BUY))
+    with pytest.raises(ValueError):
+        order_book.add_order(Order(price=1.25, quantity=1, side=SideType.BUY))
+
+
+def test_ladder_rejects_before_matching():
+    matching_engine = MatchingEngine(PriceLadderOrderBook(1, 10, 1))
+    maker = Order(price=5, quantity=1, side=SideType.SELL)
+    matching_engine.add_order(maker)
+    for price in (11, 5.5):
+        with pytest.raises(ValueError):
+            matching_engine.add_order(Order(price=price, quantity=2, side=SideType.BUY))
+    assert maker.remained_quantity == 1
+    assert book_levels(matching_engine.order_book, SideType.SELL) == [(5, 1)]
+
+    # orders that never rest are not checked
+    _, trades = matching_engine.add_order(
+        Order(price=11, quantity=2, side=SideType.BUY, order_type=OrderType.IOC)
+    )
+    assert len(trades) == 2
+
+
+def test_ladder_rejected_amend_keeps_the_order():
+    matching_engine = MatchingEngine(PriceLadderOrderBook(1, 10, 1))
+    matching_engine.add_order(Order(price=5, quantity=1, side=SideType.BUY, id="b-1"))
+    matching_engine.add_order(Order(price=5, quantity=2, side=SideType.BUY, id="b-2"))
+    for price in (11, 4.5):
+        with pytest.raises(ValueError):
+            matching_engine.modify_order(
+                ModifyOrderData("b-1", price=price, quantity=3)
+            )
+    order = matching_engine.orders["b-1"]
+    assert (order.price, order.quantity, order.remained_quantity) == (5, 1, 1)
+    price_level = next(matching_engine.order_book.best_price_levels(SideType.BUY))
+    assert [o.id for o in price_level.orders.get_all_values()] == ["b-1", "b-2"]
+    assert book_levels(matching_engine.order_book, SideType.BUY) == [(5, 3)]
+
+    matching_engine.modify_order(ModifyOrderData("b-1", price=4))
+    assert book_levels(matching_engine.order_book, SideType.BUY) == [(5, 2), (4, 1)]
+
+
+def test_ladder_same_as_tree_book():
+    rnd = random.Random(7)
+    tree_engine = MatchingEngine()
+    ladder_engine = MatchingEngine(PriceLadderOrderBook(1, 50, 1))
+    tree_orders = []
+    ladder_orders = []
+
+    for _ in range(3000):
+        if tree_orders and rnd.random() < 0.3:
+            index = rnd.randrange(len(tree_orders))
+            tree_engine.cancel_order(tree_orders.pop(index))
+            ladder_engine.cancel_order(ladder_orders.pop(index))
+            continue
+
+        side = rnd.choice([SideType.BUY, SideType.SELL])
+        price = rnd.randint(1, 50)
+        quantity = rnd.randint(1, 10)
+        tree_order, tree_trades = tree_engine.add_order(Order(price, quantity, side))
+        ladder_order, ladder_trades = ladder_engine.add_order(
+            Order(price, quantity, side)
+        )
+        tree_orders.append(tree_order)
+        ladder_orders.append(ladder_order)
+
+        assert [(t.price, t.quantity) for t in tree_trades] == [
+            (t.price, t.quantity) for t in ladder_trades
+        ]
+
+        for side in (SideType.BUY, SideType.SELL):
+            assert book_levels(tree_engine.order_book, side) == book_levels(
+                ladder_engine.order_book, side
+            )
@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from order_book import MatchingEngine, Order, SideType
+from order_book.ladder import PriceLadderOrderBook
+from order_book.market_data import L2Action, L2Feed, L2Update
+
+
+def book_depth(matching_engine: MatchingEngine, side: SideType, depth: int):
+    return [
+        (price_level.price, price_level.total_quantity)
+        for price_level in matching_engine.order_book.best_price_levels(side)
+        if not price_level.has_no_orders()
+    ][:depth]
+
+
+def test_l2_updates():
+    matching_engine = MatchingEngine()
+    feed = L2Feed(matching_engine.order_book, depth=2)
+
+    matching_engine.add_order(Order(price=10, quantity=2, side=SideType.BUY))
+    matching_engine.add_order(Order(price=10, quantity=1, side=SideType.BUY))
+    matching_engine.add_order(Order(price=9, quantity=5, side=SideType.BUY))
+    assert feed.flush() == [
+        L2Update(L2Action.ADD, SideType.BUY, 10, 3),
+        L2Update(L2Action.ADD, SideType.BUY, 9, 5),
+    ]
+
+    matching_engine.add_order(Order(price=8, quantity=1, side=SideType.BUY))
+    assert feed.flush() == [L2Update(L2Action.ADD, SideType.BUY, 8, 1)]
+    assert feed.depth(SideType.BUY) == [(10, 3), (9, 5)]
+
+    matching_engine.add_order(Order(price=10, quantity=4, side=SideType.SELL))
+    assert feed.flush() == [
+        L2Update(L2Action.DELETE, SideType.BUY, 10, 0),
+        L2Update(L2Action.ADD, SideType.SELL, 10, 1),
+    ]
+    assert feed.depth(SideType.BUY) == [(9, 5), (8, 1)]
+    assert feed.depth(SideType.SELL) == [(10, 1)]
+    assert feed.flush() == []
+
+
+@pytest.mark.parametrize("ladder", [False, True])
+def test_depth_view_matches_book(ladder):
+    rnd = random.Random(9)
+    order_book = PriceLadderOrderBook(1, 30, 1) if ladder else None
+    matching_engine = MatchingEngine(order_book)
+    matching_engine.add_order(Order(price=15, quantity=5, side=SideType.BUY))
+    feed = L2Feed(matching_engine.order_book, depth=5)
+    mirror = {SideType.BUY: {}, SideType.SELL: {}}
+    feed.flush()
+    mirror[SideType.BUY][15] = 5
+
+    orders = []
+    for _ in range(3000):
+        if orders and rnd.random() < 0.3:
+            matching_engine.cancel_order(orders.pop(rnd.randrange(len(orders))))
+        else:
+            side = rnd.choice([SideType.BUY, SideType.SELL])
+            order, _ = matching_engine.add_order(
+                Order(price=rnd.randint(1, 30), quantity=rnd.randint(1, 5), side=side)
+            )
+            orders.append(order)
+
+        for update in feed.flush():
+            if update.action == L2Action.DELETE:
+                del mirror[update.side][update.price]
+            else:
+                mirror[update.side][update.price] = update.quantity
+
+        for side in (SideType.BUY, SideType.SELL):
+            assert feed.depth(side) == book_depth(matching_engine, side, 5)
+            assert sorted(mirror[side].items()) == sorted(
+                book_depth(matching_engine, side, 1000)
+            )
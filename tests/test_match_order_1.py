@@ -0,0 +1,147 @@
+import random
+
+import pytest
+
+from order_book import (
+    CancelOrderData,
+    MatchingEngine,
+    Order,
+    OrderListener,
+    SideType,
+    Trade,
+)
+from order_book.ladder import PriceLadderOrderBook
+from order_book.market_data import L2Feed
+
+
+class GeneratorMatchingEngine(MatchingEngine):
+    # reference engine driving the best_matched_orders generator
+    def _execute_order(self, order, trades):
+        try:
+            orders_gen = self.order_book.best_matched_orders(order)
+            match_order = next(orders_gen)
+            while order.remained_quantity > 0 or match_order is not None:
+                matched_quantity = min(
+                    match_order.remained_quantity, order.remained_quantity
+                )
+                match_order.remained_quantity -= matched_quantity
+                order.remained_quantity -= matched_quantity
+                if match_order.remained_quantity == 0:
+                    self.orders.pop(match_order.id, None)
+                trades.append(
+                    Trade(
+                        order_id=match_order.id,
+                        quantity=matched_quantity,
+                        side=match_order.side,
+                        price=match_order.price,
+                    )
+                )
+                trades.append(
+                    Trade(
+                        order_id=order.id,
+                        quantity=matched_quantity,
+                        side=order.side,
+                        price=match_order.price,
+                    )
+                )
+                match_order = orders_gen.send((order, match_order))
+        except StopIteration:
+            return order, trades
+
+
+class Recorder(OrderListener):
+    def __init__(self):
+        self.events = []
+
+    def on_order_add(self, order):
+        self.events.append(("add", order.id))
+
+    def on_order_fill(self, order, quantity):
+        self.events.append(("fill", order.id, quantity))
+
+    def on_order_cancel(self, order):
+        self.events.append(("cancel", order.id))
+
+    def on_order_requeue(self, order):
+        self.events.append(("requeue", order.id))
+
+
+def generate_flow(seed: int, count: int):
+    rnd = random.Random(seed)
+    ids = []
+    flow = []
+    for index in range(count):
+        if ids and rnd.random() < 0.2:
+            flow.append(("cancel", rnd.choice(ids)))
+            continue
+        side = rnd.choice([SideType.BUY, SideType.SELL])
+        price = rnd.randint(90, 110)
+        if rnd.random() < 0.05:
+            # sweep through many levels
+            price = 200 if side == SideType.BUY else 1
+        quantity = rnd.randint(1, 50) / 10
+        ids.append(index)
+        flow.append(("add", index, price, quantity, side))
+    return flow
+
+
+def run(matching_engine: MatchingEngine, flow):
+    recorder = Recorder()
+    matching_engine.order_book.order_listeners.append(recorder)
+    feed = L2Feed(matching_engine.order_book, depth=5)
+    updates = []
+    trades = []
+    for item in flow:
+        if item[0] == "cancel":
+            matching_engine.cancel_order(CancelOrderData(id=item[1]))
+        else:
+            _, index, price, quantity, side = item
+            _, order_trades = matching_engine.add_order(
+                Order(price=price, quantity=quantity, side=side, id=index)
+            )
+            trades.extend(
+                (t.order_id, t.side, t.price, t.quantity) for t in order_trades
+            )
+        updates.append(feed.flush())
+    levels = {
+        side: [
+            (
+                price_level.price,
+                price_level.total_quantity,
+                [order.id for order in price_level.orders.get_all_values()],
+            )
+            for price_level in matching_engine.order_book.best_price_levels(side)
+        ]
+        for side in (SideType.BUY, SideType.SELL)
+    }
+    return trades, levels, recorder.events, updates, sorted(matching_engine.orders)
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_match_order_same_as_generator(seed):
+    flow = generate_flow(seed, 3000)
+    assert run(MatchingEngine(), flow) == run(GeneratorMatchingEngine(), flow)
+
+
+def test_match_order_ladder_same_as_generator():
+    flow = generate_flow(4, 3000)
+    assert run(MatchingEngine(PriceLadderOrderBook(1, 200, 1)), flow) == run(
+        GeneratorMatchingEngine(PriceLadderOrderBook(1, 200, 1)), flow
+    )
+
+
+def test_match_order_sweep():
+    matching_engine = MatchingEngine()
+    for price in range(1, 301):
+        matching_engine.add_order(Order(price=price, quantity=1, side=SideType.SELL))
+
+    order, trades = matching_engine.add_order(
+        Order(price=250, quantity=300, side=SideType.BUY)
+    )
+    assert len(trades) == 500
+    assert trades[-1].price == 250
+    assert order.remained_quantity == 50
+    order_book = matching_engine.order_book
+    assert order_book.best_bid_price_level.price == 250
+    assert order_book.best_ask_price_level.price == 251
+    assert order_book.asks_tree.min_price_level.price == 251
@@ -0,0 +1,131 @@
+import io
+import json
+import random
+
+from order_book import (
+    CancelOrderData,
+    MatchingEngine,
+    ModifyOrderData,
+    Order,
+    SideType,
+)
+from order_book.ladder import PriceLadderOrderBook
+from order_book.metrics import EngineMetrics
+
+
+def generate_flow(seed: int, count: int):
+    rnd = random.Random(seed)
+    flow = []
+    for index in range(count):
+        action = rnd.random()
+        if index and action < 0.2:
+            flow.append(CancelOrderData(id=rnd.randrange(index)))
+        elif index and action < 0.3:
+            flow.append(
+                ModifyOrderData(id=rnd.randrange(index), price=rnd.randint(1, 20))
+            )
+        else:
+            side = rnd.choice([SideType.BUY, SideType.SELL])
+            flow.append([rnd.randint(1, 20), rnd.randint(1, 9), side, index])
+    return flow
+
+
+def run(matching_engine: MatchingEngine, flow, batch: bool):
+    messages = [Order(*item) if isinstance(item, list) else item for item in flow]
+    if batch:
+        trades = matching_engine.add_orders(messages)
+    else:
+        trades = []
+        for message in messages:
+            if isinstance(message, CancelOrderData):
+                matching_engine.cancel_order(message)
+            elif isinstance(message, ModifyOrderData):
+                trades.extend(matching_engine.modify_order(message)[1])
+            else:
+                trades.extend(matching_engine.add_order(message)[1])
+    return [(t.order_id, t.price, t.quantity) for t in trades], [
+        [
+            (price_level.price, price_level.total_quantity)
+            for price_level in matching_engine.order_book.best_price_levels(side)
+        ]
+        for side in (SideType.BUY, SideType.SELL)
+    ]
+
+
+def test_metrics_do_not_change_results():
+    flow = generate_flow(seed=4, count=3000)
+    for batch in (False, True):
+        metrics = EngineMetrics()
+        assert run(MatchingEngine(metrics=metrics), flow, batch) == run(
+            MatchingEngine(), flow, batch
+        )
+        counters = metrics.snapshot()["counters"]
+        assert counters["orders"] == sum(isinstance(item, list) for item in flow)
+        assert counters["cancels"] == sum(
+            isinstance(item, CancelOrderData) for item in flow
+        )
+        assert counters["fills"] > 0
+        assert counters["levels_created"] >= counters["levels_removed"] > 0
+
+
+def test_counters_and_histograms():
+    ticks = iter(range(0, 1000, 10))
+    metrics = EngineMetrics(clock=lambda: next(ticks))
+    matching_engine = MatchingEngine(PriceLadderOrderBook(1, 20, 1), metrics=metrics)
+    for price in (10, 11):
+        matching_engine.add_order(Order(price=price, quantity=1, side=SideType.SELL))
+    matching_engine.add_order(Order(price=11, quantity=3, side=SideType.BUY, id="b"))
+    matching_engine.cancel_order(CancelOrderData(id="b"))
+
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"] == {
+        "orders": 3,
+        "cancels": 1,
+        "modifies": 0,
+        "fills": 2,
+        "rested": 3,
+        "levels_created": 3,
+        "levels_removed": 3,
+    }
+    assert snapshot["add_order"]["count"] == 3
+    assert snapshot["add_order"]["max"] == 10
+    assert snapshot["match_depth"]["max"] == 2
+    assert snapshot["cancel_order"]["count"] == 1
+
+    metrics.reset()
+    assert metrics.snapshot()["counters"]["orders"] == 0
+    metrics.detach(matching_engine.order_book)
+    assert matching_engine.order_book.metrics is None
+    assert matching_engine.order_book.order_listeners == []
+
+
+def test_bulk_loaded_levels_are_counted():
+    for order_book in (None, PriceLadderOrderBook(1, 20, 1)):
+        metrics = EngineMetrics()
+        matching_engine = MatchingEngine(order_book, metrics=metrics)
+        matching_engine.bulk_load(
+            [
+                Order(price=10, quantity=1, side=SideType.SELL),
+                Order(price=11, quantity=1, side=SideType.SELL),
+            ]
+        )
+        matching_engine.add_order(Order(price=11, quantity=2, side=SideType.BUY))
+        counters = metrics.snapshot()["counters"]
+        assert (
+            counters["rested"],
+            counters["levels_created"],
+            counters["levels_removed"],
+        ) == (2, 2, 2)
+
+
+def test_periodic_dump():
+    output = io.StringIO()
+    metrics = EngineMetrics(output=output, interval=0)
+    matching_engine = MatchingEngine(metrics=metrics)
+    matching_engine.add_order(Order(price=1, quantity=1, side=SideType.BUY))
+    matching_engine.add_order(Order(price=1, quantity=1, side=SideType.SELL))
+
+    lines = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert len(lines) == 2
+    assert lines[-1]["counters"]["fills"] == 1
+    assert lines[-1]["tree_insert"]["count"] == 1
@@ -0,0 +1,138 @@
+import random
+
+import pytest
+
+from order_book import MatchingEngine, ModifyOrderData, Order, SideType
+from order_book.fixed_point import FixedPointMatchingEngine
+from order_book.journal import Journal, JournaledMatchingEngine, recover
+from order_book.l3 import L3MirrorBook, L3RecordWriter, read_l3_records
+from tests.common import book_levels
+
+
+def bids_engine():
+    matching_engine = MatchingEngine()
+    for order_id in ("b-1", "b-2", "b-3"):
+        matching_engine.add_order(
+            Order(price=10, quantity=5, side=SideType.BUY, id=order_id)
+        )
+    return matching_engine
+
+
+def test_quantity_down_keeps_priority():
+    matching_engine = bids_engine()
+    order, trades = matching_engine.modify_order(ModifyOrderData(id="b-1", quantity=2))
+    assert trades == []
+    assert (order.quantity, order.remained_quantity) == (2, 2)
+    assert book_levels(matching_engine, SideType.BUY) == [
+        (10, 12, ["b-1", "b-2", "b-3"])
+    ]
+
+    _, trades = matching_engine.add_order(
+        Order(price=10, quantity=3, side=SideType.SELL)
+    )
+    assert [(t.order_id, t.quantity) for t in trades[::2]] == [("b-1", 2), ("b-2", 1)]
+
+
+def test_quantity_up_loses_priority():
+    matching_engine = bids_engine()
+    matching_engine.modify_order(ModifyOrderData(id="b-1", quantity=6))
+    assert book_levels(matching_engine, SideType.BUY) == [
+        (10, 16, ["b-2", "b-3", "b-1"])
+    ]
+
+
+def test_price_change_matches():
+    matching_engine = bids_engine()
+    matching_engine.add_order(Order(price=12, quantity=3, side=SideType.SELL, id="a"))
+
+    order, trades = matching_engine.modify_order(ModifyOrderData(id="b-2", price=12))
+    assert [(t.order_id, t.price, t.quantity) for t in trades] == [
+        ("a", 12, 3),
+        ("b-2", 12, 3),
+    ]
+    assert order.remained_quantity == 2
+    assert book_levels(matching_engine, SideType.BUY) == [
+        (12, 2, ["b-2"]),
+        (10, 10, ["b-1", "b-3"]),
+    ]
+    assert matching_engine.order_book.is_empty_asks()
+    assert matching_engine.orders["b-2"] is order
+
+
+def test_quantity_below_filled_cancels():
+    matching_engine = bids_engine()
+    matching_engine.add_order(Order(price=10, quantity=3, side=SideType.SELL))
+    order, _ = matching_engine.modify_order(ModifyOrderData(id="b-1", quantity=3))
+    assert order.price_level is None
+    assert "b-1" not in matching_engine.orders
+    assert matching_engine.modify_order(ModifyOrderData(id="b-1", quantity=1)) == (
+        None,
+        [],
+    )
+
+
+def test_fixed_point_modify():
+    matching_engine = FixedPointMatchingEngine(tick_size=0.01, lot_size=0.1)
+    matching_engine.add_order(Order(price=1.0, quantity=0.5, side=SideType.BUY, id=1))
+    matching_engine.add_order(Order(price=1.02, quantity=0.2, side=SideType.SELL))
+
+    order, _ = matching_engine.modify_order(ModifyOrderData(id=1, quantity=0.3))
+    assert order.remained_quantity == 3
+    _, trades = matching_engine.modify_order(ModifyOrderData(id=1, price=1.02))
+    assert [(t.price, t.quantity) for t in trades] == [
+        (pytest.approx(1.02), pytest.approx(0.2)),
+        (pytest.approx(1.02), pytest.approx(0.2)),
+    ]
+    assert order.price == 102
+    assert order.remained_quantity == 1
+
+
+def run_flow(engine, seed: int, count: int):
+    rnd = random.Random(seed)
+    orders = []
+    for index in range(count):
+        if orders and rnd.random() < 0.4:
+            order = rnd.choice(orders)
+            if rnd.random() < 0.5:
+                modify = ModifyOrderData(id=order.id, quantity=rnd.randint(0, 8))
+            else:
+                modify = ModifyOrderData(id=order.id, price=rnd.randint(1, 20))
+            engine.modify_order(modify)
+            continue
+        order, _ = engine.add_order(
+            Order(
+                price=rnd.randint(1, 20),
+                quantity=rnd.randint(1, 6),
+                side=rnd.choice([SideType.BUY, SideType.SELL]),
+                id=f"o-{seed}-{index}",
+            )
+        )
+        orders.append(order)
+
+
+def test_l3_mirror_with_modify():
+    matching_engine = MatchingEngine()
+    mirror = L3MirrorBook()
+
+    def apply(view):
+        for event in read_l3_records(view):
+            mirror.apply(event)
+
+    writer = L3RecordWriter(matching_engine.order_book, apply, buffer_size=256)
+    run_flow(matching_engine, seed=1, count=3000)
+    writer.flush()
+    for side in (SideType.BUY, SideType.SELL):
+        assert mirror.price_levels(side) == book_levels(matching_engine, side)
+
+
+def test_journal_modify(tmp_path):
+    journal_path = str(tmp_path / "journal")
+    engine = JournaledMatchingEngine(
+        MatchingEngine(), Journal(journal_path, fsync=False)
+    )
+    run_flow(engine, seed=2, count=1000)
+    engine.close()
+
+    recovered, _ = recover(str(tmp_path / "missing"), journal_path)
+    for side in (SideType.BUY, SideType.SELL):
+        assert book_levels(recovered, side) == book_levels(engine.matching_engine, side)
@@ -0,0 +1,182 @@
+import random
+
+import pytest
+
+from order_book import CancelOrderData, ModifyOrderData, Order, OrderType, SideType
+from order_book.fixed_point import FixedPointMatchingEngine
+from order_book.multi_symbol import (
+    MultiSymbolMatchingEngine,
+    ShardedMatchingEngine,
+    shard_index,
+)
+
+SYMBOLS = ["AAA", "BBB", "CCC", "DDD", "EEE"]
+
+
+def generate_flow(seed: int, count: int):
+    rnd = random.Random(seed)
+    flow = []
+    orders = []
+    for _ in range(count):
+        if orders and rnd.random() < 0.2:
+            order = orders.pop(rnd.randrange(len(orders)))
+            flow.append(CancelOrderData(id=order.id, symbol=order.symbol))
+            continue
+        order = Order(
+            price=rnd.randint(1, 10),
+            quantity=rnd.randint(1, 5),
+            side=rnd.choice([SideType.BUY, SideType.SELL]),
+            symbol=rnd.choice(SYMBOLS),
+        )
+        orders.append(order)
+        flow.append(order)
+    return flow
+
+
+def test_multi_symbol_engine():
+    matching_engine = MultiSymbolMatchingEngine()
+    matching_engine.add_order(Order(price=1, quantity=1, side=SideType.BUY, symbol="A"))
+    _, trades = matching_engine.add_order(
+        Order(price=1, quantity=1, side=SideType.SELL, symbol="B")
+    )
+    assert trades == []
+    assert set(matching_engine.engines) == {"A", "B"}
+
+    with pytest.raises(ValueError):
+        matching_engine.add_order(Order(price=1, quantity=1, side=SideType.BUY))
+
+
+def test_sharded_engine_same_as_single_process():
+    flow = generate_flow(seed=4, count=600)
+
+    expected = []
+    local_engine = MultiSymbolMatchingEngine()
+    for message in flow:
+        if isinstance(message, CancelOrderData):
+            local_engine.cancel_order(message)
+            expected.append((message.id, None, []))
+            continue
+        clone = Order(
+            message.price, message.quantity, message.side, message.id, message.symbol
+        )
+        order, trades = local_engine.add_order(clone)
+        expected.append(
+            (
+                order.id,
+                order.remained_quantity,
+                [(t.order_id, t.side, t.price, t.quantity) for t in trades],
+            )
+        )
+
+    with ShardedMatchingEngine(processes=2) as sharded_engine:
+        results = []
+        for index, message in enumerate(flow):
+            sharded_engine.submit(message)
+            if index % 100 == 99:
+                results += sharded_engine.flush()
+        results += sharded_engine.flush()
+
+    assert [result.sequence for result in results] == list(range(1, len(flow) + 1))
+    assert [
+        (r.order_id, r.remained_quantity, [tuple(t) for t in r.trades]) for r in results
+    ] == expected
+
+
+def test_shard_index_is_stable():
+    assert shard_index("AAA", 4) == shard_index("AAA", 4)
+    assert {shard_index(symbol, 2) for symbol in SYMBOLS} == {0, 1}
+
+
+def test_sharded_engine_keeps_order_types():
+    def order(price, quantity, side, id, **kwargs):
+        return Order(price, quantity, side, id=id, symbol="AAA", **kwargs)
+
+    flow = [
+        order(10, 5, SideType.SELL, "ice", display_quantity=2),
+        order(11, 3, SideType.SELL, "s"),
+        order(9, 4, SideType.BUY, "b"),
+        order(10, 4, SideType.BUY, "ioc", order_type=OrderType.IOC),
+        order(11, 9, SideType.BUY, "fok", order_type=OrderType.FOK),
+        order(0, 2, SideType.SELL, "stop", order_type=OrderType.STOP, stop_price=10),
+        order(
+            12,
+            2,
+            SideType.BUY,
+            "stop-limit",
+            order_type=OrderType.STOP_LIMIT,
+            stop_price=11,
+        ),
+        ModifyOrderData("b", price=10, quantity=6, symbol="AAA"),
+        ModifyOrderData("missing", quantity=1, symbol="AAA"),
+        order(0, 3, SideType.BUY, "market", order_type=OrderType.MARKET),
+    ]
+
+    local_engine = MultiSymbolMatchingEngine()
+    expected = []
+    for message in flow:
+        if isinstance(message, ModifyOrderData):
+            modified, trades = local_engine.modify_order(message)
+            remained = None if modified is None else modified.remained_quantity
+        else:
+            clone = Order(
+                message.price,
+                message.quantity,
+                message.side,
+                message.id,
+                message.symbol,
+                message.order_type,
+                message.stop_price,
+                message.display_quantity,
+            )
+            added, trades = local_engine.add_order(clone)
+            remained = added.remained_quantity
+        expected.append(
+            (remained, [(t.order_id, t.side, t.price, t.quantity) for t in trades])
+        )
+
+    with ShardedMatchingEngine(processes=1) as sharded_engine:
+        for message in flow:
+            sharded_engine.submit(message)
+        results = sharded_engine.flush()
+    assert [
+        (r.remained_quantity, [tuple(t) for t in r.trades]) for r in results
+    ] == expected
+
+    # nothing rests at an infinite price and the IOC remainder is dropped
+    order_book = local_engine.engines["AAA"].order_book
+    assert set(order_book.bid_price_levels) | set(order_book.ask_price_levels) <= {
+        9,
+        10,
+        11,
+        12,
+    }
+    assert "ioc" not in local_engine.engines["AAA"].orders
+
+
+def cent_engine():
+    return FixedPointMatchingEngine(tick_size=0.01, lot_size=1)
+
+
+def test_sharded_engine_rejects_without_losing_the_shard():
+    with ShardedMatchingEngine(processes=1, engine_factory=cent_engine) as engine:
+        engine.submit(Order(100.01, 2, SideType.SELL, id="s", symbol="AAA"))
+        engine.submit(Order(100.005, 1, SideType.BUY, id="bad", symbol="AAA"))
+        engine.submit(Order(100.01, 1, SideType.BUY, id="b", symbol="AAA"))
+        results = engine.flush()
+    assert [(r.order_id, r.error is None) for r in results] == [
+        ("s", True),
+        ("bad", False),
+        ("b", True),
+    ]
+    assert "100.005" in results[1].error  # type: ignore
+    assert [t.order_id for t in results[2].trades] == ["s", "b"]
+
+
+def test_collect_raises_for_a_dead_shard():
+    engine = ShardedMatchingEngine(processes=1)
+    engine.workers[0].terminate()
+    engine.workers[0].join()
+    engine.submit(Order(1, 1, SideType.BUY, symbol="AAA"))
+    with pytest.raises(RuntimeError):
+        engine.flush()
+    engine.close()
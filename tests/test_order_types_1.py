@@ -0,0 +1,151 @@
+import math
+import random
+
+from order_book import MatchingEngine, Order, OrderType, SideType
+from order_book.depth import CumulativeDepth, DepthTree
+from order_book.gateway import decode_message, encode_add
+from order_book.journal import Journal, read_journal
+from order_book.ladder import PriceLadderOrderBook
+
+
+def book_levels(matching_engine: MatchingEngine, side: SideType):
+    return [
+        (price_level.price, price_level.total_quantity)
+        for price_level in matching_engine.order_book.best_price_levels(side)
+    ]
+
+
+def asks_engine(order_book=None):
+    matching_engine = MatchingEngine(order_book)
+    for price in (10, 11, 12):
+        matching_engine.add_order(
+            Order(price=price, quantity=2, side=SideType.SELL, id=f"a-{price}")
+        )
+    return matching_engine
+
+
+def test_ioc():
+    matching_engine = asks_engine()
+    order, trades = matching_engine.add_order(
+        Order(price=11, quantity=5, side=SideType.BUY, order_type=OrderType.IOC)
+    )
+    assert [(t.order_id, t.quantity) for t in trades[::2]] == [("a-10", 2), ("a-11", 2)]
+    assert order.remained_quantity == 1
+    assert order.price_level is None
+    assert order.id not in matching_engine.orders
+    assert matching_engine.order_book.is_empty_bids()
+
+    order, trades = matching_engine.add_order(
+        Order(price=11, quantity=1, side=SideType.BUY, order_type=OrderType.IOC)
+    )
+    assert trades == []
+    assert matching_engine.order_book.is_empty_bids()
+
+
+def test_market():
+    order = Order(price=0, quantity=1, side=SideType.SELL, order_type=OrderType.MARKET)
+    assert order.price == -math.inf
+
+    matching_engine = asks_engine(PriceLadderOrderBook(1, 20, 1))
+    order, trades = matching_engine.add_order(
+        Order(price=0, quantity=7, side=SideType.BUY, order_type=OrderType.MARKET)
+    )
+    assert [t.price for t in trades[::2]] == [10, 11, 12]
+    assert order.remained_quantity == 1
+    assert matching_engine.order_book.is_empty_asks()
+    assert matching_engine.order_book.is_empty_bids()
+
+
+def test_fok():
+    matching_engine = asks_engine()
+    before = book_levels(matching_engine, SideType.SELL)
+
+    order, trades = matching_engine.add_order(
+        Order(price=11, quantity=5, side=SideType.BUY, order_type=OrderType.FOK)
+    )
+    assert trades == []
+    assert order.remained_quantity == 5
+    assert book_levels(matching_engine, SideType.SELL) == before
+
+    order, trades = matching_engine.add_order(
+        Order(price=12, quantity=5, side=SideType.BUY, order_type=OrderType.FOK)
+    )
+    assert order.remained_quantity == 0
+    assert book_levels(matching_engine, SideType.SELL) == [(12, 1)]
+
+    # the depth index follows later changes of the book
+    matching_engine.add_order(Order(price=11, quantity=3, side=SideType.SELL))
+    order, trades = matching_engine.add_order(
+        Order(price=12, quantity=4, side=SideType.BUY, order_type=OrderType.FOK)
+    )
+    assert order.remained_quantity == 0
+    assert matching_engine.order_book.is_empty_asks()
+
+
+def test_depth_tree():
+    rnd = random.Random(5)
+    tree = DepthTree()
+    levels = {}
+    for _ in range(3000):
+        price = rnd.randint(1, 200)
+        if rnd.random() < 0.4:
+            tree.discard(price)
+            levels.pop(price, None)
+        else:
+            quantity = rnd.randint(1, 50)
+            tree.set(price, quantity)
+            levels[price] = quantity
+        limit = rnd.randint(0, 201)
+        assert tree.quantity_to(limit) == sum(
+            q for p, q in levels.items() if p <= limit
+        )
+        assert tree.quantity_from(limit) == sum(
+            q for p, q in levels.items() if p >= limit
+        )
+    assert tree.root is None or tree.root.height <= 1.45 * math.log2(len(levels) + 2)
+
+
+def test_cumulative_depth_follows_book():
+    rnd = random.Random(7)
+    matching_engine = MatchingEngine()
+    depth = CumulativeDepth(matching_engine.order_book)
+    orders = []
+    for _ in range(2000):
+        if orders and rnd.random() < 0.3:
+            matching_engine.cancel_order(orders.pop(rnd.randrange(len(orders))))
+        else:
+            side = rnd.choice([SideType.BUY, SideType.SELL])
+            order, _ = matching_engine.add_order(
+                Order(price=rnd.randint(1, 40), quantity=rnd.randint(1, 9), side=side)
+            )
+            orders.append(order)
+        price = rnd.randint(0, 41)
+        assert depth.available_quantity(SideType.SELL, price) == sum(
+            q for p, q in book_levels(matching_engine, SideType.SELL) if p <= price
+        )
+        assert depth.available_quantity(SideType.BUY, price) == sum(
+            q for p, q in book_levels(matching_engine, SideType.BUY) if p >= price
+        )
+    depth.close()
+    assert depth not in matching_engine.order_book.level_listeners
+
+
+def test_order_type_encoding(tmp_path):
+    _, order = decode_message(
+        encode_add(
+            Order(price=3, quantity=2, side=SideType.SELL, order_type=OrderType.FOK)
+        )[4:]
+    )
+    assert (order.side, order.order_type) == (SideType.SELL, OrderType.FOK)
+
+    journal = Journal(str(tmp_path / "journal"), fsync=False)
+    journal.append_add(
+        Order(price=0, quantity=2, side=SideType.BUY, order_type=OrderType.MARKET)
+    )
+    journal.append_add(Order(price=5, quantity=2, side=SideType.SELL))
+    journal.close()
+    orders = [record.message for record, _ in read_journal(journal.path)]
+    assert [(o.side, o.order_type, o.price) for o in orders] == [
+        (SideType.BUY, OrderType.MARKET, math.inf),
+        (SideType.SELL, OrderType.LIMIT, 5),
+    ]
@@ -0,0 +1,95 @@
+import random
+
+import pytest
+
+from order_book import (
+    CancelOrderData,
+    MatchingEngine,
+    ModifyOrderData,
+    Order,
+    OrderBook,
+    OrderType,
+    SideType,
+)
+from order_book.ladder import PriceLadderOrderBook
+from order_book.pool import BookPool, FreeList
+from tests.common import book_levels
+
+
+def run(matching_engine: MatchingEngine, seed: int, count: int):
+    rnd = random.Random(seed)
+    ids = []
+    trades = []
+    for index in range(count):
+        action = rnd.random()
+        if ids and action < 0.25:
+            matching_engine.cancel_order(CancelOrderData(id=rnd.choice(ids)))
+            continue
+        if ids and action < 0.35:
+            _, order_trades = matching_engine.modify_order(
+                ModifyOrderData(id=rnd.choice(ids), quantity=rnd.randint(0, 6))
+            )
+        else:
+            order_type = OrderType.IOC if action > 0.95 else OrderType.LIMIT
+            _, order_trades = matching_engine.add_order(
+                Order(
+                    price=rnd.randint(95, 105),
+                    quantity=rnd.randint(1, 6),
+                    side=rnd.choice([SideType.BUY, SideType.SELL]),
+                    id=index,
+                    order_type=order_type,
+                )
+            )
+            ids.append(index)
+        trades.extend((t.order_id, t.price, t.quantity) for t in order_trades)
+    return trades, [book_levels(matching_engine, side) for side in SideType]
+
+
+@pytest.mark.parametrize("ladder", [False, True])
+def test_pooled_book_same_as_unpooled(ladder):
+    def order_book(pool=None):
+        if ladder:
+            return PriceLadderOrderBook(1, 200, 1, pool=pool)
+        return OrderBook(pool=pool)
+
+    pool = BookPool(level_capacity=4, node_capacity=16)
+    assert run(MatchingEngine(order_book(pool)), 1, 5000) == run(
+        MatchingEngine(order_book()), 1, 5000
+    )
+    stats = pool.stats()
+    assert stats["levels"]["hits"] > 0
+    assert stats["nodes"]["hits"] > 0
+    assert stats["nodes"]["free"] <= 16
+    assert all(node.value is None for node in pool.nodes.items)
+
+
+def test_flickering_level_is_reused():
+    pool = BookPool()
+    matching_engine = MatchingEngine(OrderBook(pool=pool))
+    matching_engine.add_order(Order(price=9, quantity=1, side=SideType.BUY))
+
+    order = Order(price=10, quantity=1, side=SideType.BUY)
+    matching_engine.add_order(order)
+    price_level = order.price_level
+    node = order.linked_node
+    matching_engine.cancel_order(order)
+    assert pool.levels.items == [price_level]
+    assert pool.nodes.items == [node]
+
+    order = Order(price=11, quantity=2, side=SideType.BUY)
+    matching_engine.add_order(order)
+    assert order.price_level is price_level
+    assert order.linked_node is node
+    assert matching_engine.order_book.best_bid_price_level is price_level
+    assert (price_level.price, price_level.total_quantity) == (11, 2)
+    assert pool.stats()["levels"] == {"hits": 1, "misses": 2, "dropped": 0, "free": 0}
+
+
+def test_free_list_is_bounded():
+    free_list: FreeList[int] = FreeList(2)
+    for item in range(3):
+        free_list.put(item)
+    assert free_list.take() == 1
+    assert free_list.stats() == {"hits": 1, "misses": 0, "dropped": 1, "free": 1}
+    with pytest.raises(ValueError):
+        FreeList(-1)
@@ -0,0 +1,102 @@
+import gzip
+import io
+import json
+
+import pytest
+
+from order_book import CancelOrderData, MatchingEngine, SideType
+from order_book.histogram import LatencyHistogram
+from order_book.replay import main, parse_messages, read_lines, replay
+from order_book.views import BookViews
+
+LINES = [
+    {"type": "add", "id": "b-1", "side": "BUY", "price": 10, "quantity": 3},
+    {"type": "add", "id": "b-2", "side": "BUY", "price": 11, "quantity": 1},
+    {"type": "cancel", "id": "b-1"},
+    {"type": "add", "id": "s-1", "side": "SELL", "price": 9, "quantity": 2},
+]
+
+
+def write_lines(path, lines, compress=False):
+    text = "\n".join(json.dumps(line) for line in lines) + "\n"
+    if compress:
+        with gzip.open(path, "wt") as file:
+            file.write(text)
+    else:
+        path.write_text(text)
+
+
+def test_histogram():
+    histogram = LatencyHistogram()
+    for value in range(1, 101):
+        histogram.record(value)
+    assert histogram.count == 100
+    assert histogram.percentile(50) == 50
+    assert histogram.percentile(99) == 99
+    assert histogram.min == 1
+    assert histogram.max == 100
+
+    histogram.record(1_000_000)
+    assert histogram.percentile(100) == 1_000_000
+    assert abs(histogram._value(histogram._index(1_000_000)) - 1_000_000) < 20_000
+
+
+def test_parse_messages():
+    messages = list(parse_messages(json.dumps(line) for line in LINES))
+    assert messages[0].id == "b-1"
+    assert messages[0].side == SideType.BUY
+    assert messages[2] == CancelOrderData(id="b-1")
+
+    with pytest.raises(ValueError):
+        list(parse_messages(['{"type": "modify", "id": 1}']))
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_replay_file(tmp_path, compress):
+    path = tmp_path / ("flow.jsonl.gz" if compress else "flow.jsonl")
+    write_lines(path, LINES, compress)
+
+    matching_engine = MatchingEngine()
+    trades_output = io.StringIO()
+    report = replay(
+        parse_messages(read_lines(str(path))), matching_engine, trades_output
+    )
+
+    assert report.adds == 3
+    assert report.cancels == 1
+    assert report.trades == 2
+    assert report.latency.count == 4
+    trades = [json.loads(line) for line in trades_output.getvalue().splitlines()]
+    assert [(t["order_id"], t["price"], t["quantity"]) for t in trades] == [
+        ("b-2", 11, 1),
+        ("s-1", 11, 1),
+    ]
+    assert matching_engine.order_book.best_ask_price_level.total_quantity == 1
+    assert matching_engine.order_book.is_empty_bids()
+
+
+@pytest.mark.parametrize("batch_size", [1, 3, 10])
+def test_replay_in_batches_publishes_views(batch_size):
+    views = BookViews()
+    matching_engine = MatchingEngine(views=views)
+    messages = parse_messages(json.dumps(line) for line in LINES)
+    report = replay(messages, matching_engine, batch_size=batch_size)
+
+    assert (report.adds, report.cancels, report.trades) == (3, 1, 2)
+    assert report.latency.count == -(-len(LINES) // batch_size)
+    assert views.view.asks == ((9, 1),)
+    assert views.view.bids == ()
+
+    with pytest.raises(ValueError):
+        replay([], batch_size=0)
+
+
+def test_replay_main(tmp_path, capsys):
+    path = tmp_path / "flow.jsonl"
+    write_lines(path, LINES)
+    trades_path = tmp_path / "trades.jsonl"
+
+    main([str(path), "--trades", str(trades_path)])
+
+    assert "messages: 4" in capsys.readouterr().out
+    assert len(trades_path.read_text().splitlines()) == 2
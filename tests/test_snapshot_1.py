@@ -0,0 +1,129 @@
+import random
+
+import pytest
+
+from order_book import CancelOrderData, MatchingEngine, Order, SideType, Trade
+from order_book.ladder import PriceLadderOrderBook
+from order_book.snapshot import (
+    SnapshotError,
+    dump_snapshot,
+    load_snapshot,
+    read_snapshot,
+    write_snapshot,
+)
+
+
+def fill_engine(matching_engine: MatchingEngine, seed: int, count: int):
+    rnd = random.Random(seed)
+    orders = []
+    for _ in range(count):
+        if orders and rnd.random() < 0.2:
+            matching_engine.cancel_order(orders.pop(rnd.randrange(len(orders))))
+            continue
+        side = rnd.choice([SideType.BUY, SideType.SELL])
+        order, _ = matching_engine.add_order(
+            Order(price=rnd.randint(1, 40), quantity=rnd.randint(1, 10), side=side)
+        )
+        orders.append(order)
+
+
+def book_state(matching_engine: MatchingEngine):
+    return [
+        [
+            (
+                price_level.price,
+                price_level.total_quantity,
+                [
+                    (order.id, order.quantity, order.remained_quantity)
+                    for order in price_level.orders.get_all_values()
+                ],
+            )
+            for price_level in matching_engine.order_book.best_price_levels(side)
+        ]
+        for side in (SideType.BUY, SideType.SELL)
+    ]
+
+
+def tree_height(node):
+    if node is None:
+        return 0
+    left, right = tree_height(node.left), tree_height(node.right)
+    assert abs(left - right) <= 1
+    assert node.height == 1 + max(left, right)
+    return node.height
+
+
+def test_snapshot_round_trip():
+    matching_engine = MatchingEngine()
+    fill_engine(matching_engine, seed=5, count=2000)
+    data = dump_snapshot(matching_engine, sequence=42)
+    order_count = Order.ID_GENERATOR.count
+    trade_count = Trade.ID_GENERATOR.count
+
+    Order.ID_GENERATOR.count = 0
+    restored, sequence = load_snapshot(data)
+
+    assert sequence == 42
+    assert Order.ID_GENERATOR.count == order_count
+    assert Trade.ID_GENERATOR.count == trade_count
+    assert book_state(restored) == book_state(matching_engine)
+    assert restored.orders.keys() == matching_engine.orders.keys()
+    order_book = restored.order_book
+    assert order_book.best_bid_price_level.price == max(
+        pl.price for pl in matching_engine.order_book.best_price_levels(SideType.BUY)
+    )
+    tree_height(order_book.bids_tree.root)
+    tree_height(order_book.asks_tree.root)
+
+    for engine in (matching_engine, restored):
+        Order.ID_GENERATOR.count = order_count
+        fill_engine(engine, seed=6, count=500)
+    assert book_state(restored) == book_state(matching_engine)
+
+
+def test_snapshot_ladder_book(tmp_path):
+    matching_engine = MatchingEngine(PriceLadderOrderBook(1, 40, 1))
+    fill_engine(matching_engine, seed=8, count=500)
+    path = str(tmp_path / "book.snapshot")
+    write_snapshot(matching_engine, path)
+
+    restored, _ = read_snapshot(path, MatchingEngine(PriceLadderOrderBook(1, 40, 1)))
+    assert book_state(restored) == book_state(matching_engine)
+    assert (
+        restored.order_book.best_ask_price_level.price
+        == matching_engine.order_book.best_ask_price_level.price
+    )
+
+
+def test_snapshot_invalid():
+    with pytest.raises(SnapshotError):
+        load_snapshot(b"nope")
+    with pytest.raises(SnapshotError):
+        load_snapshot(b"XXXX" + bytes(9))
+
+
+def test_snapshot_mixed_ids():
+    matching_engine = MatchingEngine()
+    for order_id in (7, "a", 8, "7"):
+        matching_engine.add_order(
+            Order(price=10, quantity=1, side=SideType.BUY, id=order_id)
+        )
+    restored, _ = load_snapshot(dump_snapshot(matching_engine))
+    assert book_state(restored) == book_state(matching_engine)
+    assert list(restored.orders) == [7, "a", 8, "7"]
+
+    restored.cancel_order(CancelOrderData(id=7))
+    assert [
+        order.id
+        for order in restored.order_book.best_bid_price_level.orders.get_all_values()
+    ] == ["a", 8, "7"]
+
+
+def test_snapshot_size_does_not_grow_with_fills():
+    matching_engine = MatchingEngine()
+    sizes = []
+    for _ in range(1000):
+        matching_engine.add_order(Order(price=10, quantity=1, side=SideType.BUY))
+        matching_engine.add_order(Order(price=10, quantity=1, side=SideType.SELL))
+        sizes.append(len(dump_snapshot(matching_engine)))
+    assert sizes[-1] == sizes[0]
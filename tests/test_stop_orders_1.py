@@ -0,0 +1,278 @@
+import random
+
+import pytest
+
+from order_book import (
+    CancelOrderData,
+    MatchingEngine,
+    Order,
+    OrderType,
+    SideType,
+)
+from order_book.fixed_point import FixedPointMatchingEngine
+from order_book.gateway import decode_message, encode_add
+from order_book.journal import Journal, read_journal
+from order_book.snapshot import HEADER, MAGIC, dump_snapshot, load_snapshot
+from order_book.triggers import TriggerBook
+
+
+def stop(side: SideType, stop_price, quantity=1, price=0, id=None, limit=False):
+    return Order(
+        price=price,
+        quantity=quantity,
+        side=side,
+        id=id,
+        order_type=OrderType.STOP_LIMIT if limit else OrderType.STOP,
+        stop_price=stop_price,
+    )
+
+
+def trade(matching_engine: MatchingEngine, price, quantity=1):
+    # one trade at price between two fresh orders
+    matching_engine.add_order(Order(price, quantity, SideType.SELL))
+    _, trades = matching_engine.add_order(Order(price, quantity, SideType.BUY))
+    return trades
+
+
+def test_buy_stop_triggers_at_or_above_stop_price():
+    matching_engine = MatchingEngine()
+    for price in (101, 102, 103):
+        matching_engine.add_order(Order(price, 1, SideType.SELL, id=f"s{price}"))
+    matching_engine.add_order(stop(SideType.BUY, 101, quantity=2, id="stop"))
+    assert matching_engine.trigger_book is not None
+    assert len(matching_engine.trigger_book) == 1
+
+    # a trade below the stop price leaves it waiting
+    trade(matching_engine, 99)
+    assert len(matching_engine.trigger_book) == 1
+
+    # the buy lifting 101 triggers the stop, which takes 102 and 103
+    _, trades = matching_engine.add_order(Order(101, 1, SideType.BUY, id="b"))
+    assert [(t.order_id, t.price) for t in trades] == [
+        ("s101", 101),
+        ("b", 101),
+        ("s102", 102),
+        ("stop", 102),
+        ("s103", 103),
+        ("stop", 103),
+    ]
+    assert len(matching_engine.trigger_book) == 0
+    assert "stop" not in matching_engine.orders
+    assert matching_engine.order_book.last_trade_price == 103
+
+
+def test_stop_limit_rests_at_its_limit_price():
+    matching_engine = MatchingEngine()
+    matching_engine.add_order(Order(100, 1, SideType.BUY, id="b"))
+    matching_engine.add_order(
+        stop(SideType.SELL, 100, quantity=3, price=99, id="sl", limit=True)
+    )
+    _, trades = matching_engine.add_order(Order(100, 1, SideType.SELL, id="s"))
+    assert [t.order_id for t in trades] == ["b", "s"]
+
+    order = matching_engine.orders["sl"]
+    assert (order.order_type, order.stop_price) == (OrderType.LIMIT, None)
+    assert matching_engine.order_book.best_ask_price_level.price == 99
+    assert matching_engine.order_book.best_ask_price_level.total_quantity == 3
+
+
+def test_cascade_is_deterministic():
+    def run():
+        matching_engine = MatchingEngine()
+        for price in range(90, 100):
+            matching_engine.add_order(Order(price, 1, SideType.BUY, id=f"b{price}"))
+        # each stop's sale trades one tick lower and triggers the next ones
+        for index, stop_price in enumerate((99, 98, 98, 97, 95)):
+            matching_engine.add_order(stop(SideType.SELL, stop_price, id=f"st{index}"))
+        _, trades = matching_engine.add_order(Order(99, 1, SideType.SELL, id="s"))
+        return [(t.order_id, t.price) for t in trades], matching_engine
+
+    trades, matching_engine = run()
+    assert trades == [
+        ("b99", 99),
+        ("s", 99),
+        ("b98", 98),
+        ("st0", 98),
+        ("b97", 97),
+        ("st1", 97),
+        ("b96", 96),
+        ("st2", 96),
+        ("b95", 95),
+        ("st3", 95),
+        ("b94", 94),
+        ("st4", 94),
+    ]
+    assert run()[0] == trades
+    assert len(matching_engine.trigger_book) == 0
+
+
+def test_stop_past_the_last_trade_triggers_at_once():
+    matching_engine = MatchingEngine()
+    trade(matching_engine, 100)
+    matching_engine.add_order(Order(101, 1, SideType.SELL, id="s"))
+    _, trades = matching_engine.add_order(stop(SideType.BUY, 100, id="stop"))
+    assert [(t.order_id, t.price) for t in trades] == [("s", 101), ("stop", 101)]
+
+    # without liquidity the market remainder is dropped
+    _, trades = matching_engine.add_order(stop(SideType.BUY, 100, id="stop2"))
+    assert trades == []
+    assert "stop2" not in matching_engine.orders
+
+
+def test_cancelled_stop_never_triggers():
+    matching_engine = MatchingEngine()
+    order = stop(SideType.SELL, 95, id="stop")
+    matching_engine.add_order(order)
+    matching_engine.cancel_order(CancelOrderData(id="stop"))
+    assert len(matching_engine.trigger_book) == 0
+    matching_engine.add_order(Order(90, 1, SideType.BUY))
+    assert len(trade(matching_engine, 94)) == 2
+    assert matching_engine.order_book.best_bid_price_level.total_quantity == 1
+
+
+def test_stop_price_is_required():
+    with pytest.raises(ValueError):
+        Order(100, 1, SideType.BUY, order_type=OrderType.STOP)
+    with pytest.raises(ValueError):
+        Order(100, 1, SideType.BUY, stop_price=99)
+
+
+def test_release_same_as_scanning_every_stop():
+    rnd = random.Random(5)
+    trigger_book = TriggerBook()
+    pending = []
+    for index in range(3000):
+        if pending and rnd.random() < 0.2:
+            order = pending.pop(rnd.randrange(len(pending)))
+            assert trigger_book.remove(order)
+            assert not trigger_book.remove(order)
+        elif rnd.random() < 0.7:
+            side = rnd.choice([SideType.BUY, SideType.SELL])
+            order = stop(side, rnd.randint(90, 110), id=index)
+            trigger_book.add(order)
+            pending.append(order)
+        else:
+            price = rnd.randint(90, 110)
+            # scan: buys from the lowest stop, sells from the highest, first
+            # added first on a tie
+            buys = [
+                o for o in pending if o.side == SideType.BUY and o.stop_price <= price
+            ]
+            sells = [
+                o for o in pending if o.side == SideType.SELL and o.stop_price >= price
+            ]
+            expected = sorted(buys, key=lambda o: o.stop_price) + sorted(
+                sells, key=lambda o: -o.stop_price
+            )
+            assert trigger_book.release(price) == expected
+            pending = [o for o in pending if o not in expected]
+        assert len(trigger_book) == len(pending)
+
+
+def test_stop_orders_in_fixed_point_journal_and_gateway(tmp_path):
+    matching_engine = FixedPointMatchingEngine(tick_size=0.5, lot_size=1)
+    matching_engine.add_order(Order(100.5, 1, SideType.SELL, id="s"))
+    matching_engine.add_order(Order(101, 1, SideType.SELL, id="s3"))
+    matching_engine.add_order(stop(SideType.BUY, 100.5, id="stop"))
+    assert matching_engine.orders["stop"].stop_price == 201
+    matching_engine.add_order(Order(100, 1, SideType.SELL, id="s2"))
+    _, trades = matching_engine.add_order(Order(100, 1, SideType.BUY, id="b"))
+    assert [(t.order_id, t.price) for t in trades] == [
+        ("s2", 100),
+        ("b", 100),
+    ]
+    _, trades = matching_engine.add_order(Order(100.5, 1, SideType.BUY, id="b2"))
+    # trades of the triggered stop are converted back once, like the others
+    assert [(t.order_id, t.price) for t in trades] == [
+        ("s", 100.5),
+        ("b2", 100.5),
+        ("s3", 101),
+        ("stop", 101),
+    ]
+    assert "stop" not in matching_engine.orders
+
+    order = stop(SideType.SELL, 99.5, quantity=2, price=99, id="x", limit=True)
+    _, decoded = decode_message(encode_add(order)[4:])
+    assert (decoded.order_type, decoded.stop_price, decoded.price) == (
+        OrderType.STOP_LIMIT,
+        99.5,
+        99,
+    )
+
+    journal = Journal(str(tmp_path / "journal"), fsync=False)
+    journal.append_add(order)
+    journal.close()
+    [(record, _)] = list(read_journal(str(tmp_path / "journal")))
+    assert (record.message.order_type, record.message.stop_price) == (
+        OrderType.STOP_LIMIT,
+        99.5,
+    )
+
+
+def test_pending_stops_survive_a_snapshot():
+    matching_engine = MatchingEngine()
+    matching_engine.add_order(
+        stop(SideType.SELL, 100, quantity=2, price=99, id="sl", limit=True)
+    )
+    matching_engine.add_order(stop(SideType.BUY, 105, id="stop"))
+
+    restored, _ = load_snapshot(dump_snapshot(matching_engine))
+    order = restored.orders["sl"]
+    assert (order.order_type, order.stop_price) == (OrderType.STOP_LIMIT, 100)
+    assert len(restored.trigger_book) == 2
+
+    trade(restored, 100)
+    assert restored.order_book.best_ask_price_level.price == 99
+    assert restored.order_book.best_ask_price_level.total_quantity == 2
+    assert len(restored.trigger_book) == 1
+
+
+def test_stops_crossed_inside_a_sweep_are_released():
+    matching_engine = MatchingEngine()
+    trade(matching_engine, 100)
+    matching_engine.add_order(stop(SideType.SELL, 99, id="sell-stop"))
+    matching_engine.add_order(stop(SideType.BUY, 105, id="buy-stop"))
+    matching_engine.add_order(Order(97, 1, SideType.BUY, id="bid"))
+    for price in (98, 101):
+        matching_engine.add_order(Order(price, 1, SideType.SELL, id=f"s{price}"))
+
+    # the sweep prints at 98 then 101, the sell stop at 99 is crossed by the
+    # first trade though the last one is above it
+    _, trades = matching_engine.add_order(Order(101, 2, SideType.BUY, id="b"))
+    assert [(t.order_id, t.price) for t in trades] == [
+        ("s98", 98),
+        ("b", 98),
+        ("s101", 101),
+        ("b", 101),
+        ("bid", 97),
+        ("sell-stop", 97),
+    ]
+    assert "sell-stop" not in matching_engine.orders
+    assert len(matching_engine.trigger_book) == 1  # type: ignore
+
+    # a stop added later is checked against the last trade price, 97, only
+    matching_engine.add_order(stop(SideType.BUY, 100, id="late"))
+    assert "late" in matching_engine.orders
+
+
+def test_snapshot_keeps_the_last_trade_price():
+    matching_engine = MatchingEngine()
+    trade(matching_engine, 100)
+    matching_engine.add_order(Order(101, 1, SideType.SELL, id="s"))
+    matching_engine.add_order(stop(SideType.SELL, 95, id="pending"))
+
+    restored, _ = load_snapshot(dump_snapshot(matching_engine))
+    assert restored.order_book.last_trade_price == 100
+    assert "pending" in restored.orders
+
+    # the last trade is already past this stop, it triggers on both engines
+    for engine in (matching_engine, restored):
+        _, trades = engine.add_order(stop(SideType.BUY, 99, id="stop"))
+        assert [(t.order_id, t.price) for t in trades] == [("s", 101), ("stop", 101)]
+        assert "stop" not in engine.orders
+
+    # a version 3 snapshot has no last trade price and still loads
+    data = dump_snapshot(MatchingEngine())
+    legacy = HEADER.pack(MAGIC, 3, 0) + data[HEADER.size + 1 :]
+    restored, _ = load_snapshot(legacy)
+    assert restored.order_book.last_trade_price is None
@@ -0,0 +1,82 @@
+import io
+
+import pytest
+
+from order_book import MatchingEngine, Order, SideType
+from order_book.trade_sinks import (
+    BinaryTradeSink,
+    CallbackTradeSink,
+    ListTradeSink,
+    RingBufferTradeSink,
+    read_fill_records,
+)
+
+
+def run_orders(matching_engine: MatchingEngine):
+    orders = [
+        Order(price=1, quantity=3, side=SideType.BUY),
+        Order(price=2, quantity=2, side=SideType.BUY),
+        Order(price=1, quantity=4, side=SideType.SELL),
+    ]
+    results = [matching_engine.add_order(order) for order in orders]
+    return orders, results
+
+
+def test_list_trade_sink():
+    default_engine = MatchingEngine()
+    _, results = run_orders(default_engine)
+    default_trades = [trade for _, trades in results for trade in trades]
+
+    trade_sink = ListTradeSink()
+    sink_engine = MatchingEngine(trade_sink=trade_sink)
+    _, results = run_orders(sink_engine)
+
+    assert all(trades == [] for _, trades in results)
+    assert [(t.side, t.price, t.quantity) for t in trade_sink.trades] == [
+        (t.side, t.price, t.quantity) for t in default_trades
+    ]
+
+
+def test_callback_trade_sink():
+    fills = []
+    matching_engine = MatchingEngine(
+        trade_sink=CallbackTradeSink(
+            lambda maker, taker, price, quantity: fills.append(
+                (maker.id, taker.id, price, quantity)
+            )
+        )
+    )
+    orders, _ = run_orders(matching_engine)
+    assert fills == [
+        (orders[1].id, orders[2].id, 2, 2),
+        (orders[0].id, orders[2].id, 1, 2),
+    ]
+
+
+def test_ring_buffer_trade_sink():
+    trade_sink = RingBufferTradeSink(capacity=1)
+    matching_engine = MatchingEngine(trade_sink=trade_sink)
+    orders, _ = run_orders(matching_engine)
+
+    assert len(trade_sink) == 1
+    assert trade_sink.dropped == 1
+    assert list(trade_sink.drain()) == [
+        (orders[0].id, orders[2].id, SideType.SELL, 1, 2),
+    ]
+    assert len(trade_sink) == 0
+
+    with pytest.raises(ValueError):
+        RingBufferTradeSink(capacity=0)
+
+
+def test_binary_trade_sink():
+    stream = io.BytesIO()
+    trade_sink = BinaryTradeSink(stream)
+    matching_engine = MatchingEngine(trade_sink=trade_sink)
+    orders, _ = run_orders(matching_engine)
+    trade_sink.flush()
+
+    assert list(read_fill_records(stream.getvalue())) == [
+        (orders[1].id, orders[2].id, SideType.SELL, 2, 2),
+        (orders[0].id, orders[2].id, SideType.SELL, 1, 2),
+    ]
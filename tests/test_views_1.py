@@ -0,0 +1,136 @@
+import random
+import threading
+from itertools import islice
+
+import pytest
+
+from order_book import (
+    CancelOrderData,
+    MatchingEngine,
+    ModifyOrderData,
+    Order,
+    SideType,
+)
+from order_book.ladder import PriceLadderOrderBook
+from order_book.views import BookView, BookViews
+
+
+def top_levels(matching_engine: MatchingEngine, side: SideType, depth):
+    return tuple(
+        (price_level.price, price_level.total_quantity)
+        for price_level in islice(
+            matching_engine.order_book.best_price_levels(side), depth
+        )
+    )
+
+
+def operations(seed: int, count: int):
+    rnd = random.Random(seed)
+    for index in range(count):
+        action = rnd.random()
+        if index and action < 0.2:
+            yield CancelOrderData(id=rnd.randrange(index))
+        elif index and action < 0.3:
+            yield ModifyOrderData(id=rnd.randrange(index), quantity=rnd.randint(1, 9))
+        else:
+            side = rnd.choice([SideType.BUY, SideType.SELL])
+            yield Order(rnd.randint(80, 120), rnd.randint(1, 9), side, id=index)
+
+
+def apply(matching_engine: MatchingEngine, operation):
+    if isinstance(operation, CancelOrderData):
+        matching_engine.cancel_order(operation)
+    elif isinstance(operation, ModifyOrderData):
+        matching_engine.modify_order(operation)
+    else:
+        matching_engine.add_order(operation)
+
+
+@pytest.mark.parametrize("depth", [3, None])
+@pytest.mark.parametrize("ladder", [False, True])
+def test_view_after_every_operation(depth, ladder):
+    views = BookViews(depth=depth)
+    matching_engine = MatchingEngine(
+        PriceLadderOrderBook(1, 200, 1) if ladder else None, views=views
+    )
+    published = []
+    for operation in operations(seed=1, count=2000):
+        apply(matching_engine, operation)
+        view = views.view
+        assert view.bids == top_levels(matching_engine, SideType.BUY, depth)
+        assert view.asks == top_levels(matching_engine, SideType.SELL, depth)
+        if published and published[-1][0] is not view:
+            assert view.version == published[-1][0].version + 1
+        published.append((view, view.bids, view.asks))
+
+    # views handed out earlier were never changed
+    for view, bids, asks in published:
+        assert (view.bids, view.asks) == (bids, asks)
+
+
+def test_unchanged_side_is_shared():
+    views = BookViews(depth=2)
+    matching_engine = MatchingEngine(views=views)
+    for price in (10, 9, 8):
+        matching_engine.add_order(Order(price, 1, SideType.BUY))
+    matching_engine.add_order(Order(12, 1, SideType.SELL))
+    view = views.view
+    assert view == BookView(4, ((10, 1), (9, 1)), ((12, 1),))
+
+    # below the published depth, nothing to publish
+    matching_engine.add_order(Order(7, 1, SideType.BUY))
+    assert views.view is view
+
+    matching_engine.add_order(Order(11, 2, SideType.SELL))
+    assert views.view.version == 5
+    assert views.view.bids is view.bids
+    assert views.view.asks == ((11, 2), (12, 1))
+
+
+def test_batches_and_bulk_loads_are_published():
+    views = BookViews()
+    matching_engine = MatchingEngine(views=views)
+    assert views.view == BookView(1, (), ())
+    matching_engine.bulk_load([Order(9, 1, SideType.BUY), Order(11, 2, SideType.SELL)])
+    assert views.view == BookView(2, ((9, 1),), ((11, 2),))
+    matching_engine.add_orders([Order(11, 1, SideType.BUY), Order(8, 1, SideType.BUY)])
+    assert views.view == BookView(3, ((9, 1), (8, 1)), ((11, 1),))
+
+    with pytest.raises(ValueError):
+        BookViews(depth=0)
+    views.detach(matching_engine.order_book)
+    assert matching_engine.order_book.level_listeners == []
+
+
+def test_reader_thread_never_sees_a_crossed_book():
+    views = BookViews(depth=5)
+    matching_engine = MatchingEngine(views=views)
+    done = threading.Event()
+    errors = []
+
+    def read():
+        version = 0
+        while not done.is_set():
+            view = views.view
+            bids, asks = view.bids, view.asks
+            if view.version < version:
+                errors.append(("version", view.version, version))
+            if [price for price, _ in bids] != sorted(
+                (price for price, _ in bids), reverse=True
+            ):
+                errors.append(("bids", bids))
+            if [price for price, _ in asks] != sorted(price for price, _ in asks):
+                errors.append(("asks", asks))
+            if bids and asks and bids[0][0] >= asks[0][0]:
+                errors.append(("crossed", view))
+            version = view.version
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    try:
+        for operation in operations(seed=2, count=20000):
+            apply(matching_engine, operation)
+    finally:
+        done.set()
+        reader.join()
+    assert errors == []